@@ -0,0 +1,101 @@
+"""
+Arithmetic drill generation: per-item ladder (the routers before the batch
+engine) vs generators/arithmetic.py.
+
+    python benchmarks/bench_arithmetic.py
+    python benchmarks/bench_arithmetic.py --sizes 10 1000 100000 --repeat 5
+
+Reports the best of `--repeat` runs per (operation, batch size). The batch
+numbers include the string formatting routers return.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pydantic import BaseModel
+
+from generators.arithmetic import generate_arrays, generate_questions
+from generators.seeding import make_np_rng
+
+
+class Question(BaseModel):
+    question: str
+    answer: str
+    explanation: str
+
+
+# ---------------------------------------------------------------------------
+# Reference: the per-question loops the drill routers used to run
+# ---------------------------------------------------------------------------
+def legacy_addition(level, n, rng):
+    questions = []
+    for _ in range(n):
+        if level == 0:
+            a, b = rng.randint(1, 9), rng.randint(1, 9)
+        elif level == 1:
+            a, b = rng.randint(10, 99), rng.randint(10, 99)
+        elif level == 2:
+            a, b, c = rng.randint(10, 99), rng.randint(10, 99), rng.randint(1, 9)
+        else:
+            a, b = rng.randint(50, 150), rng.randint(50, 150)
+        if level == 2:
+            question, answer, explanation = f"{a} + {b} + {c} = ", str(a + b + c), f"Add {a}, {b}, and {c}"
+        else:
+            question, answer, explanation = f"{a} + {b} = ", str(a + b), f"Add {a} and {b}"
+        questions.append(Question(question=question, answer=answer, explanation=explanation))
+    return questions
+
+
+DIVISION_LADDER = [((2, 5), (1, 5)), ((2, 5), (5, 10)), ((2, 10), (5, 15)), ((2, 12), (10, 20)),
+                   ((5, 15), (10, 30)), ((5, 20), (10, 50)), ((5, 30), (10, 60)), ((10, 50), (20, 80)),
+                   ((10, 75), (30, 100)), ((20, 100), (50, 200)), ((20, 100), (50, 200))]
+
+
+def legacy_division(level, n, rng):
+    questions = []
+    for _ in range(n):
+        # the old router walked an if/elif chain; indexing is if anything kinder to it
+        (dlo, dhi), (qlo, qhi) = DIVISION_LADDER[level] if level < len(DIVISION_LADDER) else ((2, 10), (2, 10))
+        divisor, quotient = rng.randint(dlo, dhi), rng.randint(qlo, qhi)
+        dividend = divisor * quotient
+        questions.append(Question(question=f"{dividend} ÷ {divisor} = ", answer=str(quotient),
+                                  explanation=f"Because {dividend} ÷ {divisor} = {quotient} exactly."))
+    return questions
+
+
+LEGACY = {"addition": legacy_addition, "division": legacy_division}
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--level", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'operation':<10} {'n':>8} {'ladder ms':>10} {'batch ms':>10} {'arrays ms':>10} "
+          f"{'items/ms':>10} {'speed-up':>9}")
+    for operation, legacy in LEGACY.items():
+        for n in args.sizes:
+            old = best_of(lambda: legacy(args.level, n, random.Random(1)), args.repeat)
+            new = best_of(lambda: generate_questions(operation, args.level, n, seed=1), args.repeat)
+            arrays = best_of(lambda: generate_arrays(operation, args.level, n, make_np_rng(1)), args.repeat)
+            print(f"{operation:<10} {n:>8} {old * 1e3:>10.3f} {new * 1e3:>10.3f} {arrays * 1e3:>10.3f} "
+                  f"{n / (new * 1e3):>10.0f} {old / new:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+MCQ distractors: the regex-sniffing helpers generate_mcq used to run on the
+answer text vs typed answers (generators/answers.py).
+
+    python benchmarks/bench_distractors.py
+    python benchmarks/bench_distractors.py --items 20000 --repeat 5
+
+Answers are generated up front, so the timings cover distractors only. Reports
+the best of `--repeat` runs per module (all difficulties mixed), plus how often
+the old path offered an option in a different shape from the answer (e.g. a
+bare '£4' against 'Emma gets £9, Liam gets £9').
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from generators.answers import as_answer
+from generators.custom_generators import MODULE_GENERATORS, generate_item
+from generators.mcq_generator import DIFFICULTIES
+from generators.seeding import make_rng
+
+
+# ---------------------------------------------------------------------------
+# Reference: the distractor helpers generate_mcq used before typed answers
+# ---------------------------------------------------------------------------
+def _numeric_distractors(correct_val: int | float, rng: random.Random, count: int = 3) -> list:
+    """Generate plausible numeric wrong answers near the correct value."""
+    distractors = set()
+    offsets = [
+        int(correct_val * 0.5) or 1,
+        int(correct_val * 1.5) or 2,
+        int(correct_val * 0.75) or 1,
+        int(correct_val * 1.25) or 2,
+        correct_val + rng.randint(1, max(2, abs(int(correct_val)) // 5 + 1)),
+        correct_val - rng.randint(1, max(2, abs(int(correct_val)) // 5 + 1)),
+        correct_val + rng.choice([-2, -1, 1, 2]) * rng.randint(2, 10),
+        correct_val * 2,
+    ]
+    for o in offsets:
+        v = int(o) if isinstance(correct_val, int) else round(float(o), 4)
+        if v != correct_val and v not in distractors and v > 0:
+            distractors.add(v)
+        if len(distractors) >= count:
+            break
+
+    # fallback: sequential offsets
+    delta = 1
+    while len(distractors) < count:
+        candidate = correct_val + delta
+        if candidate != correct_val and candidate not in distractors and candidate > 0:
+            distractors.add(candidate)
+        candidate = correct_val - delta
+        if candidate != correct_val and candidate not in distractors and candidate > 0:
+            distractors.add(candidate)
+        delta += 1
+
+    return list(distractors)[:count]
+
+
+def _extract_number(text: str):
+    """Pull the first number (int or float) out of an answer string."""
+    text = text.replace('£', '').replace(',', '').strip()
+    m = re.search(r'-?\d+(\.\d+)?', text)
+    if m:
+        val = m.group()
+        return float(val) if '.' in val else int(val)
+    return None
+
+
+def _fraction_distractors(answer: str, count: int = 3) -> list:
+    """Generate wrong fraction strings."""
+    m = re.match(r'(\d+)/(\d+)', answer.strip())
+    if not m:
+        return []
+    n, d = int(m.group(1)), int(m.group(2))
+    candidates = [
+        f'{n + 1}/{d}', f'{n}/{d + 1}', f'{n - 1}/{d}' if n > 1 else f'{n + 2}/{d}',
+        f'{n * 2}/{d * 2}', f'{d}/{n}', f'{n}/{d - 1}' if d > 2 else f'{n}/{d + 2}',
+    ]
+    seen = set()
+    result = []
+    for c in candidates:
+        if c != answer and c not in seen:
+            seen.add(c)
+            result.append(c)
+        if len(result) >= count:
+            break
+    return result
+
+
+def _ratio_distractors(answer: str, count: int = 3) -> list:
+    """Wrong ratio simplifications."""
+    m = re.match(r'(\d+)\s*:\s*(\d+)', answer.strip())
+    if not m:
+        return []
+    a, b = int(m.group(1)), int(m.group(2))
+    candidates = [
+        f'{a + 1} : {b}', f'{a} : {b + 1}', f'{b} : {a}',
+        f'{a * 2} : {b * 2}', f'{a + 1} : {b + 1}',
+    ]
+    seen = set()
+    result = []
+    for c in candidates:
+        norm = c.replace(' ', '')
+        if norm != answer.replace(' ', '') and norm not in seen:
+            seen.add(norm)
+            result.append(c)
+        if len(result) >= count:
+            break
+    return result
+
+
+def _make_distractors(answer: str, module_id: str, rng: random.Random) -> list:
+    """Return 3 wrong answer strings for a given correct answer."""
+    answer = str(answer).strip()
+
+    # Try fraction pattern first
+    if '/' in answer and not answer.startswith('£'):
+        ds = _fraction_distractors(answer)
+        if ds:
+            return ds
+
+    # Try ratio pattern
+    if ':' in answer:
+        ds = _ratio_distractors(answer)
+        if ds:
+            return ds
+
+    # Try numeric extraction
+    num = _extract_number(answer)
+    if num is not None:
+        wrong_nums = _numeric_distractors(num, rng)
+        prefix = '£' if '£' in answer else ''
+        return [f'{prefix}{int(v) if isinstance(v, float) and v == int(v) else v}' for v in wrong_nums]
+
+    # Text answers (e.g., "Estimate: 120 (exact: 117)") — grab key number
+    nums = re.findall(r'\d+', answer)
+    if nums:
+        base = int(nums[0])
+        wrong = _numeric_distractors(base, rng)
+        return [re.sub(r'\d+', str(int(w)), answer, count=1) for w in wrong[:3]]
+
+    # Last resort: shuffle characters / append noise
+    return [answer + ' (approx)', str(rng.randint(1, 99)), str(rng.randint(100, 500))]
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=5_000, help="answers per module")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'module':<26} {'regex us':>9} {'typed us':>9} {'speed-up':>9} {'regex off-shape':>16}")
+    for module_id in MODULE_GENERATORS:
+        rng = make_rng(1)
+        answers = [as_answer(generate_item(module_id, DIFFICULTIES[i % 3], rng)['answer'])
+                   for i in range(args.items)]
+        texts = [str(a) for a in answers]
+        rng = random.Random(1)
+        old = best_of(lambda: [_make_distractors(t, module_id, rng) for t in texts], args.repeat)
+        new = best_of(lambda: [a.distractors(rng) for a in answers], args.repeat)
+        off_shape = sum(any(type(as_answer(d)) is not type(as_answer(t)) for d in _make_distractors(t, module_id, rng))
+                        for t in texts)
+        print(f"{module_id:<26} {old / args.items * 1e6:>9.2f} {new / args.items * 1e6:>9.2f} "
+              f"{old / new:>8.1f}x {off_shape / args.items:>16.1%}")
+
+
+if __name__ == "__main__":
+    main()
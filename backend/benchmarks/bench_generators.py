@@ -0,0 +1,265 @@
+"""
+Speed and entropy of every question generator, offline (no DB, no server).
+
+For each generator × topic/module × level/difficulty it draws `--draws`
+questions from a seeded rng and reports:
+
+  us_per_q       mean cost of one question (failed draws included)
+  qps            questions per second at that cost
+  error_rate     share of draws that raised
+  distinct_ratio distinct question texts / successful draws
+  draws_to_40    mean draws needed to collect 40 distinct questions (a
+                 paper's worth), walking the draw stream in segments; null
+                 if the generator cannot reach 40 at all
+
+    python benchmarks/bench_generators.py                       # everything, table to stdout
+    python benchmarks/bench_generators.py --only fmc --draws 2000
+    python benchmarks/bench_generators.py --output bench.json
+    python benchmarks/bench_generators.py --compare bench.json  # flag regressions vs a saved run
+
+The JSON records GENERATOR_VERSION and the git commit so runs from different
+commits can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from generators.arithmetic import OPERATIONS, generate_questions as arithmetic_questions
+from generators.custom_generators import MODULE_GENERATORS, generate_question
+from generators.fmc_generator import TOPICS, generate_fmc_problem, items, level_topics, names
+from generators.mcq_generator import DIFFICULTIES, generate_exam, generate_mcq
+from generators.seeding import GENERATOR_VERSION, make_np_rng, make_rng
+from routers.reasoning_routes import (get_flow_chain_questions, get_max_option_questions,
+                                      get_symbolic_shapes_questions)
+from routers.word_problem_routes import generate_problem
+
+PAPER_SIZE = 40
+SEED = 20240601
+
+
+@dataclass
+class Case:
+    generator: str
+    params: dict
+    # rng -> list of questions (one call may yield a batch, e.g. a whole exam)
+    draw: Callable[[random.Random], list]
+    identity: Callable[[object], str] = field(default=lambda q: q["question"])
+
+    @property
+    def name(self) -> str:
+        return " ".join([self.generator] + [f"{k}={v}" for k, v in self.params.items()])
+
+
+# ---------------------------------------------------------------------------
+# Cases
+# ---------------------------------------------------------------------------
+def _fmc_topic_draw(topic_name, level):
+    build = TOPICS[topic_name].build
+
+    def draw(rng):
+        name1, name2, name3 = rng.sample(names, 3)
+        question, _, _ = build(rng, level, name1, name2, name3, rng.choice(items))
+        return [question]
+    return draw
+
+
+def _seeded_batch(fn):
+    """Reasoning routers take a seed and return 10 questions."""
+    return lambda rng: fn(rng.getrandbits(32))
+
+
+def _numpy_batch(operation, level, n=10):
+    return lambda rng: arithmetic_questions(operation, level, n, make_np_rng(rng.getrandbits(32)))
+
+
+def build_cases() -> list[Case]:
+    text = lambda q: q
+    attr = lambda q: q.question
+    cases = []
+    for level in sorted(level_topics):
+        cases.append(Case("fmc", {"level": level}, lambda rng, level=level: [generate_fmc_problem(level, rng)], attr))
+    for level in sorted(level_topics):
+        for topic_name in dict.fromkeys(level_topics[level]):
+            if topic_name in TOPICS:
+                cases.append(Case("fmc_topic", {"topic": topic_name, "level": level},
+                                  _fmc_topic_draw(topic_name, level), text))
+    for module_id in MODULE_GENERATORS:
+        for difficulty in DIFFICULTIES:
+            cases.append(Case("custom", {"module": module_id, "difficulty": difficulty},
+                              lambda rng, m=module_id, d=difficulty: [generate_question(m, d, rng)]))
+    for module_id in MODULE_GENERATORS:
+        for difficulty in DIFFICULTIES:
+            cases.append(Case("mcq", {"module": module_id, "difficulty": difficulty},
+                              lambda rng, m=module_id, d=difficulty: [generate_mcq(m, d, rng)]))
+    for difficulty in DIFFICULTIES + ["mixed"]:
+        cases.append(Case("exam", {"difficulty": difficulty},
+                          lambda rng, d=difficulty: generate_exam(50, d, rng)))
+    for op in ("addition", "subtraction", "multiplication", "division"):
+        for level in range(1, 4):
+            cases.append(Case("word_problem", {"operation": op, "level": level},
+                              lambda rng, op=op, level=level: [generate_problem(op, level, rng)],
+                              lambda q: q[0]))
+    for fn in (get_flow_chain_questions, get_symbolic_shapes_questions, get_max_option_questions):
+        cases.append(Case("reasoning", {"route": fn.__name__}, _seeded_batch(fn), attr))
+    for op, spec in OPERATIONS.items():
+        for level in sorted(spec.levels) + [max(spec.levels) + 1]:
+            cases.append(Case("arithmetic", {"operation": op, "level": level}, _numpy_batch(op, level)))
+    return cases
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+def draws_to_collect(stream: list, k: int = PAPER_SIZE) -> Optional[float]:
+    """
+    Mean number of draws to see `k` distinct values, walking `stream` in
+    consecutive segments (None entries are failed draws). None if no segment
+    ever reaches `k`.
+    """
+    lengths, seen, start = [], set(), 0
+    for i, ident in enumerate(stream):
+        if ident is None:
+            continue
+        seen.add(ident)
+        if len(seen) == k:
+            lengths.append(i + 1 - start)
+            seen, start = set(), i + 1
+    return round(sum(lengths) / len(lengths), 1) if lengths else None
+
+
+def measure(case: Case, draws: int, seed: int = SEED) -> dict:
+    rng = make_rng(seed)
+    stream: list = []
+    errors = 0
+    start = time.perf_counter()
+    while len(stream) < draws:
+        try:
+            batch = case.draw(rng)
+        except Exception:
+            errors += 1
+            stream.append(None)
+            continue
+        stream.extend(case.identity(q) for q in batch)
+    elapsed = time.perf_counter() - start
+
+    ok = [s for s in stream if s is not None]
+    us = elapsed / len(stream) * 1e6
+    return {
+        "generator": case.generator,
+        **case.params,
+        "draws": len(stream),
+        "us_per_q": round(us, 2),
+        "qps": round(1e6 / us),
+        "error_rate": round(errors / len(stream), 4),
+        "distinct_ratio": round(len(set(ok)) / len(ok), 4) if ok else 0.0,
+        "draws_to_40": draws_to_collect(stream),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(draws: int, only: Optional[str] = None) -> dict:
+    cases = [c for c in build_cases() if not only or only in c.name]
+    return {
+        "meta": {
+            "generator_version": GENERATOR_VERSION,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "draws": draws,
+            "seed": SEED,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": [measure(case, draws) for case in cases],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+METRICS = ("draws", "us_per_q", "qps", "error_rate", "distinct_ratio", "draws_to_40")
+
+
+def _case_items(row: dict) -> list:
+    return [(k, v) for k, v in row.items() if k not in METRICS]
+
+
+def _key(row: dict) -> tuple:
+    return tuple((k, str(v)) for k, v in _case_items(row))
+
+
+def _label(row: dict) -> str:
+    return " ".join(str(v) if k == "generator" else f"{k}={v}" for k, v in _case_items(row))
+
+
+def print_table(report: dict) -> None:
+    print(f"{'case':<58} {'us/q':>9} {'qps':>10} {'err':>6} {'distinct':>8} {'to 40':>7}")
+    for row in report["results"]:
+        to_40 = "-" if row["draws_to_40"] is None else f"{row['draws_to_40']:.0f}"
+        print(f"{_label(row)[:58]:<58} {row['us_per_q']:>9.2f} {row['qps']:>10} "
+              f"{row['error_rate']:>6.1%} {row['distinct_ratio']:>8.3f} {to_40:>7}")
+
+
+def compare(report: dict, baseline: dict, slower: float = 1.25) -> list[str]:
+    """Rows that got `slower`x slower, lost entropy, started failing or can no longer fill a paper."""
+    before = {_key(row): row for row in baseline["results"]}
+    findings = []
+    for row in report["results"]:
+        old = before.get(_key(row))
+        if old is None:
+            continue
+        label = _label(row)
+        if row["us_per_q"] > old["us_per_q"] * slower:
+            findings.append(f"{label}: {old['us_per_q']} -> {row['us_per_q']} us/q")
+        if row["distinct_ratio"] < old["distinct_ratio"] - 0.05:
+            findings.append(f"{label}: distinct {old['distinct_ratio']} -> {row['distinct_ratio']}")
+        if row["error_rate"] > old["error_rate"] + 0.01:
+            findings.append(f"{label}: errors {old['error_rate']:.1%} -> {row['error_rate']:.1%}")
+        if old["draws_to_40"] is not None and row["draws_to_40"] is None:
+            findings.append(f"{label}: can no longer produce {PAPER_SIZE} distinct questions")
+    return findings
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--draws", type=int, default=10_000, help="questions drawn per case")
+    parser.add_argument("--only", help="run only cases whose name contains this text, e.g. 'fmc_topic'")
+    parser.add_argument("--output", help="write the results as JSON to this path")
+    parser.add_argument("--compare", help="JSON from an earlier run; exit 1 if anything regressed")
+    args = parser.parse_args(argv)
+
+    report = run(args.draws, args.only)
+    print_table(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        findings = compare(report, baseline)
+        print(f"\nvs {args.compare} (commit {baseline['meta'].get('commit')}): "
+              f"{len(findings) or 'no'} regression(s)")
+        for line in findings:
+            print(f"  {line}")
+        return 1 if findings else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
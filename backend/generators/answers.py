@@ -0,0 +1,212 @@
+"""
+Typed answers for the module generators.
+
+A generator returns one of these instead of a bare string. `str(answer)` is
+the text pupils see, so free-answer papers print exactly what they did
+before; `answer.distractors(rng)` gives the wrong MCQ options.
+
+Each type lists a fixed set of plausible wrong values for itself (off by one,
+place-value slips, swapped parts, an unsimplified ratio, ...) and ends the
+list with a tail that can never repeat or equal the answer. Distractors are
+then one pass over that list: no regex sniffing of the answer text, no
+retry loops, and `count` unique wrong options every time.
+"""
+import random
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from itertools import zip_longest
+from typing import Iterator, Union
+
+
+class Answer:
+    def candidates(self, rng: random.Random, count: int) -> Iterator[str]:
+        """Wrong answers, most plausible first; must hold `count` that differ from the answer."""
+        raise NotImplementedError
+
+    def distractors(self, rng: random.Random, count: int = 3) -> list[str]:
+        correct = str(self)
+        wrong: list[str] = []
+        for candidate in self.candidates(rng, count):
+            if candidate != correct and candidate not in wrong:
+                wrong.append(candidate)
+                if len(wrong) == count:
+                    break
+        return wrong
+
+
+def _rotated(options: tuple, rng: random.Random) -> tuple:
+    # one draw picks where to start, so different items lead with different slips
+    k = int(rng.random() * len(options))
+    return options[k:] + options[:k]
+
+
+def _near_misses(value: int, rng: random.Random, step: int = 1) -> tuple:
+    """Slips a pupil might make around `value`, in multiples of `step`."""
+    spread = max(2, abs(value) // (5 * step) + 1)
+    jitter = (2 + int(rng.random() * (spread - 1))) * step
+    return _rotated((value + step, value - step, value + 10 * step, value - 10 * step,
+                     value + jitter, value - jitter, value * 2, value + value // 2), rng)
+
+
+@dataclass(frozen=True)
+class Integer(Answer):
+    value: int
+    step: int = 1                 # granularity of plausible slips, e.g. 10 for estimates
+
+    def __str__(self):
+        return str(self.value)
+
+    def wrong_values(self, rng: random.Random, count: int) -> list[int]:
+        value = self.value
+        misses = [v for v in _near_misses(value, rng, self.step) if v > 0 or value <= 0]
+        # always enough: distinct and never the answer
+        return misses + [value + i * self.step for i in range(2, count + 2)]
+
+    def candidates(self, rng, count):
+        return map(str, self.wrong_values(rng, count))
+
+
+@dataclass(frozen=True)
+class Money(Integer):
+    def __str__(self):
+        return f'£{self.value}'
+
+    def candidates(self, rng, count):
+        return (f'£{v}' for v in self.wrong_values(rng, count))
+
+
+@dataclass(frozen=True)
+class Decimal(Answer):
+    value: float
+    places: int = 4
+
+    def __str__(self):
+        return str(round(self.value, self.places))
+
+    def candidates(self, rng, count):
+        v = self.value
+        misses = _rotated((v * 10, v / 10, v + 0.1, v - 0.1, v + 0.01, v - 0.01, v + 0.05, v - 0.05), rng)
+        for m in misses + tuple(v + 0.1 * i for i in range(2, count + 2)):
+            if m > 0:
+                yield str(round(m, self.places))
+
+
+@dataclass(frozen=True)
+class FractionAnswer(Answer):
+    numerator: int
+    denominator: int              # kept as written: 6/15 is not shown as 2/5
+
+    def __str__(self):
+        return f'{self.numerator}/{self.denominator}'
+
+    def candidates(self, rng, count):
+        n, d = self.numerator, self.denominator
+        for a, b in _rotated(((n + 1, d), (n, d + 1), (n - 1, d), (d, n), (n, d - 1), (n + 1, d + 1)), rng):
+            # an equal-valued fraction would be a second right answer
+            if a > 0 and b > 0 and a * d != b * n:
+                yield f'{a}/{b}'
+        yield from (f'{n + i}/{d}' for i in range(2, count + 2))
+
+
+@dataclass(frozen=True)
+class Ratio(Answer):
+    left: int
+    right: int
+
+    def __str__(self):
+        return f'{self.left} : {self.right}'
+
+    def candidates(self, rng, count):
+        a, b = self.left, self.right
+        for x, y in _rotated(((b, a), (a + 1, b), (a, b + 1), (a * 2, b * 2), (a + 1, b + 1)), rng):
+            yield f'{x} : {y}'
+        yield from (f'{a + i} : {b}' for i in range(2, count + 2))
+
+
+SIGNS = ('<', '=', '>')
+MIRRORED = {'<': '>', '=': '=', '>': '<'}
+
+
+@dataclass(frozen=True)
+class Comparison(Answer):
+    left: str
+    sign: str                     # '<' | '=' | '>'
+    right: str
+
+    def __str__(self):
+        return f'{self.left} {self.sign} {self.right}'
+
+    def candidates(self, rng, count):
+        # every sign either way round, minus the ones that are true
+        left, right, sign = self.left, self.right, self.sign
+        yield from (f'{left} {s} {right}' for s in SIGNS if s != sign)
+        yield from (f'{right} {s} {left}' for s in SIGNS if s != MIRRORED[sign])
+
+
+@dataclass(frozen=True)
+class Compound(Answer):
+    """Several answers inside one sentence, e.g. 'Emma gets £12, Liam gets £18'."""
+    template: str                 # str.format(*parts)
+    parts: tuple
+
+    def __str__(self):
+        return self.template.format(*self.parts)
+
+    def candidates(self, rng, count):
+        shown = [str(p) for p in self.parts]
+        if len(shown) == 2 and shown[0] != shown[1]:
+            yield self.template.format(shown[1], shown[0])
+        # change one part at a time, taking turns between parts
+        for wrong in zip_longest(*(part.candidates(rng, count) for part in self.parts)):
+            for index, value in enumerate(wrong):
+                if value is not None:
+                    yield self.template.format(*shown[:index], value, *shown[index + 1:])
+
+
+@dataclass(frozen=True)
+class Text(Answer):
+    """Untyped answer text; only for answers no generator has typed yet."""
+    value: str
+
+    def __str__(self):
+        return self.value
+
+    def candidates(self, rng, count):
+        yield f'{self.value} (approx)'
+        yield from (str(rng.randint(1, 500)) for _ in range(count))
+        yield from (f'{self.value} ({i})' for i in range(count))
+
+
+# ---------------------------------------------------------------------------
+# Parsing answers that arrive as plain values
+# ---------------------------------------------------------------------------
+_PATTERNS = (
+    (re.compile(r'(\d+)/(\d+)'), lambda m: FractionAnswer(int(m[1]), int(m[2]))),
+    (re.compile(r'(\d+)\s*:\s*(\d+)'), lambda m: Ratio(int(m[1]), int(m[2]))),
+    (re.compile(r'£(\d+)'), lambda m: Money(int(m[1]))),
+    (re.compile(r'-?\d+'), lambda m: Integer(int(m[0]))),
+    (re.compile(r'-?\d+\.\d+'), lambda m: Decimal(float(m[0]))),
+)
+
+AnswerLike = Union[Answer, int, float, Fraction, str]
+
+
+def as_answer(value: AnswerLike) -> Answer:
+    """Type a plain answer. Anything already typed is returned as is."""
+    if isinstance(value, Answer):
+        return value
+    if isinstance(value, bool):
+        return Text(str(value))
+    if isinstance(value, int):
+        return Integer(value)
+    if isinstance(value, float):
+        return Decimal(value)
+    if isinstance(value, Fraction):
+        return FractionAnswer(value.numerator, value.denominator)
+    text = str(value).strip()
+    for pattern, build in _PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            return build(match)
+    return Text(text)
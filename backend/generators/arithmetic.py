@@ -0,0 +1,143 @@
+"""
+Batch generator for the arithmetic drills (addition, subtraction,
+multiplication, division).
+
+Each operation's levels are data: a tuple of inclusive operand ranges plus an
+explanation template. A batch of N questions is a single NumPy draw of shape
+(N, operands) and one vectorised answer computation. The only per-item work
+left is formatting the strings, so a 10,000-question worksheet costs about as
+much as the old ladder spent on a few hundred.
+
+Operands come from `numpy.random.Generator`, so a (GENERATOR_VERSION, seed,
+operation, level, n) tuple always gives the same batch.
+"""
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from generators.seeding import make_np_rng
+
+
+@dataclass(frozen=True)
+class Level:
+    ranges: tuple                 # ((lo, hi), ...) inclusive, one per drawn operand
+    explanation: str              # str.format(*shown_operands, answer=answer)
+
+
+@dataclass(frozen=True)
+class Operation:
+    symbol: str
+    levels: dict                  # level -> Level
+    default: Level                # any level not in the table
+    # (drawn operands (n, k)) -> (operands shown in the question (n, m), answers (n,))
+    combine: Callable[[np.ndarray], tuple]
+    equals: str = " = "
+
+    def level(self, level: int) -> Level:
+        return self.levels.get(level, self.default)
+
+
+def _sum(ops):
+    return ops, ops.sum(axis=1)
+
+
+def _difference(ops):
+    # larger number first so the answer is never negative
+    shown = -np.sort(-ops, axis=1)
+    return shown, shown[:, 0] - shown[:, 1]
+
+
+def _product(ops):
+    return ops, ops.prod(axis=1)
+
+
+def _division(ops):
+    # draw (divisor, quotient) and show dividend ÷ divisor, so it always divides exactly
+    divisor, quotient = ops[:, 0], ops[:, 1]
+    return np.stack([divisor * quotient, divisor], axis=1), quotient
+
+
+ONE_DIGIT, TWO_DIGIT, THREE_DIGIT = (1, 9), (10, 99), (50, 150)
+
+OPERATIONS = {
+    "addition": Operation(
+        symbol="+",
+        levels={
+            0: Level((ONE_DIGIT, ONE_DIGIT), "Add {0} and {1}"),
+            1: Level((TWO_DIGIT, TWO_DIGIT), "Add {0} and {1}"),
+            2: Level((TWO_DIGIT, TWO_DIGIT, ONE_DIGIT), "Add {0}, {1}, and {2}"),
+        },
+        default=Level((THREE_DIGIT, THREE_DIGIT), "Add {0} and {1}"),
+        combine=_sum,
+    ),
+    "subtraction": Operation(
+        symbol="-",
+        levels={
+            0: Level((ONE_DIGIT, ONE_DIGIT), "Subtract {1} from {0}"),
+            1: Level((TWO_DIGIT, TWO_DIGIT), "Subtract {1} from {0}"),
+        },
+        default=Level((THREE_DIGIT, THREE_DIGIT), "Subtract {1} from {0}"),
+        combine=_difference,
+        equals=" =",
+    ),
+    "multiplication": Operation(
+        symbol="×",
+        levels={
+            0: Level((ONE_DIGIT, ONE_DIGIT), "Multiply {0} and {1}."),
+            1: Level((TWO_DIGIT, TWO_DIGIT), "Multiply {0} and {1}."),
+            2: Level((TWO_DIGIT, TWO_DIGIT, ONE_DIGIT), "Multiply {0}, {1}, and {2}."),
+        },
+        default=Level((THREE_DIGIT, THREE_DIGIT), "Multiply {0} and {1} carefully."),
+        combine=_product,
+    ),
+    "division": Operation(
+        symbol="÷",
+        # (divisor range, quotient range)
+        levels={
+            level: Level(ranges, "Because {0} ÷ {1} = {answer} exactly.")
+            for level, ranges in {
+                0: ((2, 5), (1, 5)),
+                1: ((2, 5), (5, 10)),
+                2: ((2, 10), (5, 15)),
+                3: ((2, 12), (10, 20)),
+                4: ((5, 15), (10, 30)),
+                5: ((5, 20), (10, 50)),
+                6: ((5, 30), (10, 60)),
+                7: ((10, 50), (20, 80)),
+                8: ((10, 75), (30, 100)),
+                9: ((20, 100), (50, 200)),
+                10: ((20, 100), (50, 200)),
+            }.items()
+        },
+        default=Level(((2, 10), (2, 10)), "Because {0} ÷ {1} = {answer} exactly."),
+        combine=_division,
+    ),
+}
+
+
+def generate_arrays(operation: str, level: int, n: int,
+                    rng: Optional[np.random.Generator] = None) -> tuple[np.ndarray, np.ndarray]:
+    """(operands shown in each question, answers) for `n` questions, without any string work."""
+    spec = OPERATIONS[operation]
+    ranges = np.asarray(spec.level(level).ranges, dtype=np.int64)
+    rng = rng if rng is not None else make_np_rng()
+    drawn = rng.integers(ranges[:, 0], ranges[:, 1], size=(n, len(ranges)), endpoint=True)
+    return spec.combine(drawn)
+
+
+def generate_questions(operation: str, level: int, n: int,
+                       seed: Union[int, np.random.Generator, None] = None) -> list[dict]:
+    """`n` {question, answer, explanation} dicts for an arithmetic drill."""
+    spec = OPERATIONS[operation]
+    rng = seed if isinstance(seed, np.random.Generator) else make_np_rng(seed)
+    shown, answers = generate_arrays(operation, level, n, rng)
+    # stringify column by column; formatting is now most of the cost
+    rows = list(zip(*(map(str, column) for column in shown.T.tolist())))
+    answer_text = list(map(str, answers.tolist()))
+    joiner, equals = f" {spec.symbol} ", spec.equals
+    explain = spec.level(level).explanation.format
+    return [
+        {"question": joiner.join(row) + equals, "answer": answer, "explanation": explain(*row, answer=answer)}
+        for row, answer in zip(rows, answer_text)
+    ]
@@ -1,148 +1,30 @@
 """
 MCQ wrapper around custom_generators.
-Takes a free-answer question and adds 3 plausible wrong answers,
-returning A/B/C/D options with a shuffled correct answer.
+Takes a free-answer question and adds 3 plausible wrong answers (from the
+answer's type, see generators/answers.py), returning A/B/C/D options with a
+shuffled correct answer.
 """
 import random
-import re
-from generators.custom_generators import generate_question, MODULE_GENERATORS
+from collections import Counter
+from typing import Callable, Optional
+from generators.answers import as_answer
+from generators.custom_generators import generate_item, MODULE_GENERATORS
+from generators.seeding import resolve_rng
 
 MODULES = list(MODULE_GENERATORS.keys())
 DIFFICULTIES = ['easy', 'medium', 'hard']
-
-
-# ---------------------------------------------------------------------------
-# Distractor helpers
-# ---------------------------------------------------------------------------
-
-def _numeric_distractors(correct_val: int | float, count: int = 3) -> list:
-    """Generate plausible numeric wrong answers near the correct value."""
-    distractors = set()
-    offsets = [
-        int(correct_val * 0.5) or 1,
-        int(correct_val * 1.5) or 2,
-        int(correct_val * 0.75) or 1,
-        int(correct_val * 1.25) or 2,
-        correct_val + random.randint(1, max(2, abs(int(correct_val)) // 5 + 1)),
-        correct_val - random.randint(1, max(2, abs(int(correct_val)) // 5 + 1)),
-        correct_val + random.choice([-2, -1, 1, 2]) * random.randint(2, 10),
-        correct_val * 2,
-    ]
-    for o in offsets:
-        v = int(o) if isinstance(correct_val, int) else round(float(o), 4)
-        if v != correct_val and v not in distractors and v > 0:
-            distractors.add(v)
-        if len(distractors) >= count:
-            break
-
-    # fallback: sequential offsets
-    delta = 1
-    while len(distractors) < count:
-        candidate = correct_val + delta
-        if candidate != correct_val and candidate not in distractors and candidate > 0:
-            distractors.add(candidate)
-        candidate = correct_val - delta
-        if candidate != correct_val and candidate not in distractors and candidate > 0:
-            distractors.add(candidate)
-        delta += 1
-
-    return list(distractors)[:count]
-
-
-def _extract_number(text: str):
-    """Pull the first number (int or float) out of an answer string."""
-    text = text.replace('£', '').replace(',', '').strip()
-    m = re.search(r'-?\d+(\.\d+)?', text)
-    if m:
-        val = m.group()
-        return float(val) if '.' in val else int(val)
-    return None
-
-
-def _fraction_distractors(answer: str, count: int = 3) -> list:
-    """Generate wrong fraction strings."""
-    m = re.match(r'(\d+)/(\d+)', answer.strip())
-    if not m:
-        return []
-    n, d = int(m.group(1)), int(m.group(2))
-    candidates = [
-        f'{n + 1}/{d}', f'{n}/{d + 1}', f'{n - 1}/{d}' if n > 1 else f'{n + 2}/{d}',
-        f'{n * 2}/{d * 2}', f'{d}/{n}', f'{n}/{d - 1}' if d > 2 else f'{n}/{d + 2}',
-    ]
-    seen = set()
-    result = []
-    for c in candidates:
-        if c != answer and c not in seen:
-            seen.add(c)
-            result.append(c)
-        if len(result) >= count:
-            break
-    return result
-
-
-def _ratio_distractors(answer: str, count: int = 3) -> list:
-    """Wrong ratio simplifications."""
-    m = re.match(r'(\d+)\s*:\s*(\d+)', answer.strip())
-    if not m:
-        return []
-    a, b = int(m.group(1)), int(m.group(2))
-    candidates = [
-        f'{a + 1} : {b}', f'{a} : {b + 1}', f'{b} : {a}',
-        f'{a * 2} : {b * 2}', f'{a + 1} : {b + 1}',
-    ]
-    seen = set()
-    result = []
-    for c in candidates:
-        norm = c.replace(' ', '')
-        if norm != answer.replace(' ', '') and norm not in seen:
-            seen.add(norm)
-            result.append(c)
-        if len(result) >= count:
-            break
-    return result
-
-
-def _make_distractors(answer: str, module_id: str) -> list:
-    """Return 3 wrong answer strings for a given correct answer."""
-    answer = str(answer).strip()
-
-    # Try fraction pattern first
-    if '/' in answer and not answer.startswith('£'):
-        ds = _fraction_distractors(answer)
-        if ds:
-            return ds
-
-    # Try ratio pattern
-    if ':' in answer:
-        ds = _ratio_distractors(answer)
-        if ds:
-            return ds
-
-    # Try numeric extraction
-    num = _extract_number(answer)
-    if num is not None:
-        wrong_nums = _numeric_distractors(num)
-        prefix = '£' if '£' in answer else ''
-        return [f'{prefix}{int(v) if isinstance(v, float) and v == int(v) else v}' for v in wrong_nums]
-
-    # Text answers (e.g., "Estimate: 120 (exact: 117)") — grab key number
-    nums = re.findall(r'\d+', answer)
-    if nums:
-        base = int(nums[0])
-        wrong = _numeric_distractors(base)
-        return [re.sub(r'\d+', str(int(w)), answer, count=1) for w in wrong[:3]]
-
-    # Last resort: shuffle characters / append noise
-    return [answer + ' (approx)', str(random.randint(1, 99)), str(random.randint(100, 500))]
+MIXED_SPLIT = {'easy': 0.3, 'medium': 0.4, 'hard': 0.3}
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-def generate_mcq(module_id: str, difficulty: str = 'medium') -> dict:
+def generate_mcq(module_id: str, difficulty: str = 'medium',
+                 rng: Optional[random.Random] = None) -> dict:
     """
     Generate one MCQ question for the given module.
+    Pass a seeded `rng` to make the output reproducible.
     Returns:
       {
         module_id, question, options: {A,B,C,D},
@@ -150,15 +32,14 @@ def generate_mcq(module_id: str, difficulty: str = 'medium') -> dict:
         correct_answer, explanation
       }
     """
-    q = generate_question(module_id, difficulty)
-    correct = str(q['answer']).strip()
-    distractors = _make_distractors(correct, module_id)
+    rng = resolve_rng(rng)
+    q = generate_item(module_id, difficulty, rng)
+    answer = as_answer(q['answer'])
+    correct = str(answer)
 
-    # Build pool: 1 correct + 3 distractors, shuffle
-    pool = [correct] + distractors[:3]
-    while len(pool) < 4:
-        pool.append(str(random.randint(1, 100)))
-    random.shuffle(pool)
+    # Build pool: 1 correct + 3 distractors (always unique), shuffle
+    pool = [correct] + answer.distractors(rng, 3)
+    rng.shuffle(pool)
 
     labels = ['A', 'B', 'C', 'D']
     options = {labels[i]: str(pool[i]) for i in range(4)}
@@ -174,32 +55,61 @@ def generate_mcq(module_id: str, difficulty: str = 'medium') -> dict:
     }
 
 
-def generate_exam(num_questions: int = 50, difficulty: str = 'mixed') -> list[dict]:
-    """
-    Generate a full exam of `num_questions` MCQ items drawn from all 8 modules.
-    difficulty='mixed' gives roughly 30% easy, 40% medium, 30% hard.
-    Returns list of question dicts with question_number and question_id fields added.
-    """
-    per_module = num_questions // len(MODULES)
-    remainder = num_questions % len(MODULES)
-
-    diff_weights = (
-        ['easy'] * 3 + ['medium'] * 4 + ['hard'] * 3
-        if difficulty == 'mixed'
-        else [difficulty] * 10
-    )
+def _quotas(total: int, split: dict) -> dict:
+    """Whole-number counts in proportion to `split`, summing to `total` (largest remainder)."""
+    exact = {key: total * share for key, share in split.items()}
+    counts = {key: int(value) for key, value in exact.items()}
+    by_remainder = sorted(split, key=lambda key: exact[key] - counts[key], reverse=True)
+    for key in by_remainder[:total - sum(counts.values())]:
+        counts[key] += 1
+    return counts
 
-    questions = []
-    for i, mod in enumerate(MODULES):
-        count = per_module + (1 if i < remainder else 0)
-        for _ in range(count):
-            d = random.choice(diff_weights)
-            questions.append(generate_mcq(mod, d))
 
-    random.shuffle(questions)
+def exam_blueprint(num_questions: int = 50, difficulty: str = 'mixed',
+                   rng: Optional[random.Random] = None) -> list[tuple[str, str]]:
+    """
+    (module_id, difficulty) for every slot of an exam. Modules are spread as
+    evenly as possible; 'mixed' hits the 30/40/30 easy/medium/hard split
+    exactly, with the difficulties dealt across modules at random.
+    """
+    rng = resolve_rng(rng)
+    per_module, remainder = divmod(num_questions, len(MODULES))
+    modules = [mod for i, mod in enumerate(MODULES) for _ in range(per_module + (1 if i < remainder else 0))]
+    if difficulty == 'mixed':
+        levels = [d for d, count in _quotas(num_questions, MIXED_SPLIT).items() for _ in range(count)]
+        rng.shuffle(levels)
+    else:
+        levels = [difficulty] * num_questions
+    return list(zip(modules, levels))
+
+
+def assemble_exam(draw: Callable[[str, str, int], list[dict]], num_questions: int = 50,
+                  difficulty: str = 'mixed', rng: Optional[random.Random] = None) -> list[dict]:
+    """
+    Fill an exam_blueprint with items from `draw(module_id, difficulty, count)`,
+    shuffle them and number them. `draw` may generate fresh items or take
+    them from a pre-built pool; items are copied, never modified in place.
+    """
+    rng = resolve_rng(rng)
+    cells = Counter(exam_blueprint(num_questions, difficulty, rng))
+    questions = [dict(q) for (mod, d), count in cells.items() for q in draw(mod, d, count)]
+    rng.shuffle(questions)
 
     for idx, q in enumerate(questions):
         q['question_number'] = idx + 1
         q['question_id'] = f'q{idx + 1}'
 
     return questions
+
+
+def generate_exam(num_questions: int = 50, difficulty: str = 'mixed',
+                  rng: Optional[random.Random] = None) -> list[dict]:
+    """
+    Generate a full exam of `num_questions` MCQ items drawn from all 8 modules.
+    difficulty='mixed' gives 30% easy, 40% medium, 30% hard.
+    Pass a seeded `rng` to make the exam reproducible.
+    Returns list of question dicts with question_number and question_id fields added.
+    """
+    rng = resolve_rng(rng)
+    return assemble_exam(lambda mod, d, count: [generate_mcq(mod, d, rng) for _ in range(count)],
+                         num_questions, difficulty, rng)
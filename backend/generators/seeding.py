@@ -0,0 +1,41 @@
+"""
+Seed helpers shared by the question generators.
+
+Every generator takes an optional `rng` (a `random.Random`). A generated paper
+is then fully described by (GENERATOR_VERSION, seed, params): replaying the same
+seed through the same generator version gives byte-identical questions.
+Bump GENERATOR_VERSION whenever a change alters generator output.
+"""
+import random
+import secrets
+from typing import Optional
+
+import numpy as np
+
+# 2: arithmetic drills draw from numpy (generators/arithmetic.py)
+# 3: FMC number puzzles sample from precomputed solution tables
+# 4: mock exams follow an exact module/difficulty blueprint
+# 5: MCQ distractors come from typed answers (generators/answers.py)
+GENERATOR_VERSION = 5
+
+# Used when a caller does not pass its own rng (equivalent to the module-level
+# `random` functions the generators used before)
+_shared_rng = random.Random()
+
+
+def new_seed() -> int:
+    """A fresh 32-bit seed, small enough to store next to a paper."""
+    return secrets.randbits(32)
+
+
+def make_rng(seed: Optional[int] = None) -> random.Random:
+    return random.Random(seed)
+
+
+def make_np_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """NumPy counterpart of make_rng for the vectorised batch generators."""
+    return np.random.default_rng(seed)
+
+
+def resolve_rng(rng: Optional[random.Random] = None) -> random.Random:
+    return rng if rng is not None else _shared_rng
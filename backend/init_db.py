@@ -1,5 +1,5 @@
 from database import engine
-from model import Base
+from migrations import migrate
 from sqlalchemy.exc import OperationalError
 import time
 import crud, models, schemas
@@ -8,8 +8,8 @@ from database import SessionLocal, engine
 
 def init_db(retries=10, delay=3):
 
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database initialized and tables created.")
+    applied = migrate(engine)
+    print(f"✅ Database migrated ({len(applied)} migration(s) applied).")
             
 
 if __name__ == "__main__":
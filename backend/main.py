@@ -5,17 +5,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from model import Base, Question, QuizSession, User, UserScore, LevelAttempt
 from database import engine, get_db
 from fastapi.responses import JSONResponse, FileResponse
-from fastapi import FastAPI, Depends, Request   
+from fastapi import FastAPI, Depends, Request, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from fastapi import FastAPI, UploadFile, File, Form, Depends
 from sqlalchemy.orm import Session
 import shutil
 import pandas as pd
 import crud
-from utils.pdf_parser import extract_answers_from_pdf
 from init_db import init_db
 from admin_views import register_admin_views
 from routers.fmc_routes import generate_fmc_problem
+from services.render_pool import render_pool
+from services.ocr_jobs import ocr_jobs, register_finaliser, stage_upload
+from services.write_buffer import write_buffer
+from utils.pagination import NEXT_CURSOR_HEADER, PageParams, list_response
 from fastapi.responses import HTMLResponse
 from fastapi.responses import RedirectResponse
 from pathlib import Path
@@ -25,13 +29,6 @@ logger = logging.getLogger(__name__)
 
 
 from fastapi.staticfiles import StaticFiles
-# Initialize DB
-try:
-    init_db()
-    Base.metadata.create_all(bind=engine)
-except Exception as e:
-    logger.error(f"DB init failed: {e}", exc_info=True)
-
 UPLOAD_FOLDER = "uploaded_papers"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
@@ -40,9 +37,11 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 from routers import (word_problem_routes, user_routes, attempt_routes,
     quiz_routes, sudoku_routes, addition_routes, subtraction_routes,
     multiplication_routes, division_routes, submit_score, fmc_routes,
-    reasoning_routes, auth_routes, progress_routes, results, generator_paper, generate_paper_excel)
+    reasoning_routes, auth_routes, progress_routes, results, generator_paper, generate_paper_excel, leaderboard)
 from routers.custom_paper_routes import router as custom_paper_router
-from routers.mock_test_routes import router as mock_test_router
+from routers.grammar_paper_routes import router as grammar_paper_router
+from routers.mock_test_routes import MCQ_POOL_KEYS, mcq_item_pool, router as mock_test_router
+from routers.ocr_job_routes import router as ocr_job_router, job_accepted
 
 # Create FastAPI app
 app = FastAPI()
@@ -115,6 +114,49 @@ def custom_home():
     """
 
 
+@app.on_event("startup")
+def migrate_database():
+    # first startup hook, so the others see the current schema
+    try:
+        init_db()
+    except Exception as e:
+        logger.error(f"DB init failed: {e}", exc_info=True)
+
+
+@app.on_event("startup")
+def start_write_buffer():
+    write_buffer.start()
+
+
+@app.on_event("startup")
+def start_render_pool():
+    # Spawn and warm the PDF render workers before the first download
+    render_pool.start()
+
+
+@app.on_event("startup")
+def prime_mcq_pool():
+    # fill every (module, difficulty) cell before the first /test/generate
+    mcq_item_pool.prime(MCQ_POOL_KEYS)
+
+
+@app.on_event("startup")
+def resume_ocr_jobs():
+    try:
+        ocr_jobs.resume_pending()
+    except Exception as e:
+        logger.error(f"Could not resume OCR jobs: {e}", exc_info=True)
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    render_pool.shutdown()
+    ocr_jobs.shutdown()
+    mcq_item_pool.stop()
+    # last, so rows queued by requests that finished during shutdown are written too
+    write_buffer.shutdown()
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled Error: {exc}", exc_info=True)
@@ -137,6 +179,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Paper-Token", NEXT_CURSOR_HEADER],
 )
 
 
@@ -157,14 +200,39 @@ app.include_router(attempt_routes.router)
 app.include_router(user_routes.router)
 app.include_router(attempt_routes.router)
 app.include_router(results.router)
+app.include_router(leaderboard.router)
 app.include_router(generator_paper.router)
 app.include_router(generate_paper_excel.router)
 app.include_router(custom_paper_router, prefix="/paper")
 app.include_router(mock_test_router, prefix="/test")
+app.include_router(grammar_paper_router, prefix="/grammar")
+app.include_router(ocr_job_router)
 
 
-@app.post("/upload-paper/")
-async def upload_and_process_paper(
+def finalise_uploaded_paper(db: Session, job, answers: list) -> dict:
+    """OCR finaliser for /upload-paper/: write the answers spreadsheet."""
+    params = job.params_json
+    data = [
+        {
+            "User": params["username"],
+            "Operation": params["operation"],
+            "Level": params["level"],
+            "Sublevel": params["sublevel"],
+            "Question": a["question_number"],
+            "Answer": a["answer"]
+        }
+        for a in answers
+    ]
+    excel_path = Path(UPLOAD_FOLDER) / f"{params['username']}_answers.xlsx"
+    pd.DataFrame(data).to_excel(excel_path, index=False)
+    return {"answers": answers, "excel_path": str(excel_path)}
+
+
+register_finaliser("upload-paper", finalise_uploaded_paper, keep_input=True)
+
+
+@app.post("/upload-paper/", status_code=202)
+def upload_and_process_paper(
     student_name: str = Form(...),
 
     operation: str = Form("FMC"),
@@ -179,48 +247,31 @@ async def upload_and_process_paper(
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user_id: int = int(user.id)
-    username: str = str(user.username)
-
-    # 2️⃣ Save uploaded file
-    filename = file.filename or "uploaded.pdf"
-    file_path = Path(UPLOAD_FOLDER) / filename
-
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    # 2️⃣ Read the spooled upload once. Plain def, so this, the user lookup and
+    #    create_job's commit all run on the threadpool, not the event loop
+    try:
+        file_path, pages_total = stage_upload(file.file, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # 3️⃣ Extract answers from PDF
-    answers = extract_answers_from_pdf(str(file_path))
+    # 3️⃣ OCR runs in the background; poll or stream /ocr/jobs/{job_id}
+    job = ocr_jobs.create_job(db, "upload-paper", file_path, {
+        "user_id": int(user.id),
+        "username": str(user.username),
+        "operation": operation,
+        "level": level,
+        "sublevel": sublevel,
+    }, pages_total=pages_total)
+    return job_accepted(job)
 
-    data = []
-    for q_num, answer in answers:
-        crud.save_answer(db, user_id, username, operation, level, sublevel, q_num, answer)
-        # Prepare data for Excel    
-
-
-        data.append({
-            "User": username,
-            "Operation": operation,
-            "Level": level,
-            "Sublevel": sublevel,
-            "Question": q_num,
-            "Answer": answer
-        })
-
-    # 5️⃣ Save Excel
-    df = pd.DataFrame(data)
-    excel_path = Path(UPLOAD_FOLDER) / f"{username}_answers.xlsx"
-    df.to_excel(excel_path, index=False)
+@app.get("/debug/sessions")
+def get_sessions(response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    return list_response(db, select(QuizSession), (QuizSession.id,), response, page)
 
-    return FileResponse(
-        str(excel_path),
-        filename=f"{username}_answers.xlsx",
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
 
-@app.get("/debug/sessions")
-def get_sessions(db: Session = Depends(get_db)):
-    return db.query(QuizSession).all()
+@app.get("/debug/write-buffer")
+def get_write_buffer_stats():
+    return write_buffer.stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,123 @@
+"""
+Maintenance commands. Run from backend/ with the app's DATABASE_URL set.
+
+    python manage.py migrate                               # apply pending schema migrations
+    python manage.py migrate --list
+    python manage.py seed-grammar                          # papers 1-10, PDFs pre-rendered
+    python manage.py seed-grammar --papers 500 --workers 8
+    python manage.py seed-grammar --start 11 --papers 90 --no-render
+    python manage.py backfill-stars                        # rebuild star totals from level_attempts
+    python manage.py rebuild-leaderboards                  # recompute leaderboard points from level_attempts
+    python manage.py retire-generator 4                    # drop stored questions of generator version 4
+"""
+import argparse
+import logging
+import sys
+
+
+def migrate(args) -> int:
+    from database import engine
+    from migrations import applied_versions, discover, migrate as apply_migrations
+
+    if args.list:
+        done = applied_versions(engine)
+        for version, name in discover():
+            print(f"[{'x' if version in done else ' '}] {name}")
+        return 0
+    applied = apply_migrations(engine, target=args.to)
+    print(f"applied {len(applied)} migration(s)" + (f": {', '.join(applied)}" if applied else ""))
+    return 0
+
+
+def seed_grammar(args) -> int:
+    from database import SessionLocal
+    from routers.grammar_paper_routes import prerender_paper_pdfs
+    from services.grammar_seeding import seed_grammar_papers
+    from services.render_pool import render_pool
+
+    numbers = range(args.start, args.start + args.papers)
+    with SessionLocal() as db:
+        prerender = None
+        if not args.no_render:
+            prerender = lambda created: print(f"pre-rendered {prerender_paper_pdfs(db, created)} PDF(s)")
+        try:
+            created = seed_grammar_papers(db, numbers, workers=args.workers, batch_size=args.batch_size,
+                                          prerender=prerender)
+        finally:
+            render_pool.shutdown()
+    print(f"seeded {len(created)} paper(s)" + (f": {created[0]}-{created[-1]}" if created else ""))
+    return 0
+
+
+def backfill_stars(args) -> int:
+    from database import SessionLocal
+    from services.ninja_stars import backfill_level_stars
+
+    with SessionLocal() as db:
+        updated = backfill_level_stars(db, batch_size=args.batch_size)
+    print(f"recomputed stars for {updated} user(s)")
+    return 0
+
+
+def rebuild_leaderboards(args) -> int:
+    from database import SessionLocal
+    from services.leaderboards import rebuild_leaderboards as rebuild
+
+    with SessionLocal() as db:
+        written = rebuild(db, batch_size=args.batch_size)
+    print(f"wrote {written} leaderboard row(s)")
+    return 0
+
+
+def retire_generator(args) -> int:
+    from database import SessionLocal
+    from services.generator_retirement import retire_generator_version
+
+    with SessionLocal() as db:
+        try:
+            cleared = retire_generator_version(db, args.version)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+    print(f"dropped the stored questions of {cleared} paper(s) built by generator version {args.version}")
+    return 0
+
+
+def main(argv=None) -> int:
+    from services.grammar_seeding import GRAMMAR_SEED_BATCH, GRAMMAR_SEED_WORKERS
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    mig = commands.add_parser("migrate", help="apply pending schema migrations")
+    mig.add_argument("--to", type=int, default=None, help="stop after this version")
+    mig.add_argument("--list", action="store_true", help="show applied and pending migrations")
+    mig.set_defaults(run=migrate)
+
+    seed = commands.add_parser("seed-grammar", help="create missing grammar papers and warm their PDF cache")
+    seed.add_argument("--start", type=int, default=1, help="first paper number")
+    seed.add_argument("--papers", type=int, default=10, help="how many consecutive paper numbers")
+    seed.add_argument("--workers", type=int, default=GRAMMAR_SEED_WORKERS, help="generator processes")
+    seed.add_argument("--batch-size", type=int, default=GRAMMAR_SEED_BATCH, help="papers per INSERT/commit")
+    seed.add_argument("--no-render", action="store_true", help="skip pre-rendering the PDFs")
+    seed.set_defaults(run=seed_grammar)
+
+    stars = commands.add_parser("backfill-stars", help="rebuild per-level star totals and every user's stars")
+    stars.add_argument("--batch-size", type=int, default=1000, help="users per UPDATE")
+    stars.set_defaults(run=backfill_stars)
+
+    boards = commands.add_parser("rebuild-leaderboards", help="recompute every leaderboard from level attempts")
+    boards.add_argument("--batch-size", type=int, default=1000, help="rows per INSERT")
+    boards.set_defaults(run=rebuild_leaderboards)
+
+    retire = commands.add_parser("retire-generator", help="drop the stored questions of an old generator version")
+    retire.add_argument("version", type=int, help="generator version to retire (older than the current one)")
+    retire.set_defaults(run=retire_generator)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
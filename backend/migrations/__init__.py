@@ -0,0 +1,144 @@
+"""
+Versioned schema migrations.
+
+Each module here named vNNN_<name>.py is one migration with an
+`upgrade(conn)` function. `migrate(engine)` runs the pending ones in version
+order, each in its own transaction together with its row in
+schema_migrations, so a migration is either recorded as applied or not at all.
+The app applies them on startup (init_db), and `python manage.py migrate`
+runs them by hand.
+
+v001 is the baseline: create_all over the current models, which creates a
+whole fresh database and adds only the missing tables to one that predates
+this package. Later migrations must therefore leave a schema that already
+has their change alone: use `ensure_index`, `ensure_column`,
+`ensure_nullable` and the inspector rather than bare CREATE/ALTER. That also covers two app instances migrating at once.
+MySQL commits DDL straight away, so the loser of such a race may re-run a
+migration before it finds that version already recorded.
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from datetime import datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+schema_migrations = Table(
+    "schema_migrations", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+_MODULE_NAME = re.compile(r"v(\d+)_(\w+)")
+
+
+def discover() -> list[tuple[int, str]]:
+    """(version, module name) of every migration, oldest first."""
+    found = []
+    for module in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.fullmatch(module.name)
+        if match:
+            found.append((int(match[1]), module.name))
+    return sorted(found)
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    schema_migrations.create(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return set(conn.scalars(select(schema_migrations.c.version)))
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> list[str]:
+    """Apply every pending migration up to `target` (default: all). Returns the names applied."""
+    done = applied_versions(engine)
+    applied = []
+    for version, name in discover():
+        if version in done or (target is not None and version > target):
+            continue
+        module = importlib.import_module(f"{__name__}.{name}")
+        try:
+            with engine.begin() as conn:
+                module.upgrade(conn)
+                conn.execute(schema_migrations.insert().values(
+                    version=version, name=name, applied_at=datetime.utcnow()))
+        except IntegrityError:
+            # another instance recorded this version while we were running it
+            logger.info(f"[migrate] {name} was applied concurrently")
+            continue
+        logger.info(f"[migrate] applied {name}")
+        applied.append(name)
+    return applied
+
+
+# ---------------------------------------------------------------------------
+# Helpers for idempotent migrations
+# ---------------------------------------------------------------------------
+def index_names(conn: Connection, table: str) -> set[str]:
+    """Names of the table's indexes and unique constraints (MySQL reports the latter as both)."""
+    inspector = inspect(conn)
+    names = {ix["name"] for ix in inspector.get_indexes(table)}
+    names |= {uq["name"] for uq in inspector.get_unique_constraints(table) if uq["name"]}
+    return names
+
+
+def ensure_index(conn: Connection, table: str, name: str, columns: Sequence[str], unique: bool = False) -> bool:
+    """Create index `name` on `table` unless it already exists. Returns whether it was created."""
+    if name in index_names(conn, table):
+        return False
+    # reflect into a throwaway MetaData so the models' tables are left untouched
+    reflected = Table(table, MetaData(), autoload_with=conn)
+    Index(name, *(reflected.c[column] for column in columns), unique=unique).create(conn)
+    return True
+
+
+def ensure_column(conn: Connection, table: str, column: Column) -> bool:
+    """Add `column` (a model column, e.g. `OCRJob.__table__.c.owner`) unless `table` already has it.
+    Returns whether it was added."""
+    if column.name in {c["name"] for c in inspect(conn).get_columns(table)}:
+        return False
+    spec = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f"ALTER TABLE {conn.dialect.identifier_preparer.quote(table)} ADD COLUMN {spec}")
+    return True
+
+
+def ensure_nullable(conn: Connection, table: Table, column: str) -> bool:
+    """Drop NOT NULL from `table.c[column]` (`table` is a model table whose column is already
+    nullable) unless the database column allows NULL. Returns whether it was changed."""
+    if next(c for c in inspect(conn).get_columns(table.name) if c["name"] == column)["nullable"]:
+        return False
+    quote = conn.dialect.identifier_preparer.quote
+    if conn.dialect.name == "sqlite":
+        _rebuild_sqlite_table(conn, table)
+    elif conn.dialect.name == "mysql":
+        spec = CreateColumn(table.c[column]).compile(dialect=conn.dialect)
+        conn.exec_driver_sql(f"ALTER TABLE {quote(table.name)} MODIFY COLUMN {spec}")
+    else:
+        conn.exec_driver_sql(f"ALTER TABLE {quote(table.name)} ALTER COLUMN {quote(column)} DROP NOT NULL")
+    return True
+
+
+def _rebuild_sqlite_table(conn: Connection, table: Table) -> None:
+    # SQLite cannot change a column in place: copy the rows into a table built from the model and swap it in.
+    # The new table is created under a temporary name so foreign keys in other tables keep naming this one.
+    quote = conn.dialect.identifier_preparer.quote
+    staging_name = f"{table.name}_rebuild"
+    staging_meta = MetaData()
+    staging_meta.reflect(conn, only=sorted({fk.column.table.name for fk in table.foreign_keys}))
+    staging = table.to_metadata(staging_meta, name=staging_name)
+    staging.indexes.clear()   # index names are per database; they are recreated once the old table is gone
+    staging.create(conn)
+
+    shared = ", ".join(quote(c["name"]) for c in inspect(conn).get_columns(table.name) if c["name"] in table.c)
+    conn.execute(text(f"INSERT INTO {quote(staging_name)} ({shared}) SELECT {shared} FROM {quote(table.name)}"))
+    conn.execute(text(f"DROP TABLE {quote(table.name)}"))
+    conn.execute(text(f"ALTER TABLE {quote(staging_name)} RENAME TO {quote(table.name)}"))
+    for index in table.indexes:
+        ensure_index(conn, table.name, index.name, [c.name for c in index.columns], unique=index.unique)
@@ -0,0 +1,9 @@
+"""Every table the models declared when migrations were introduced."""
+from sqlalchemy.engine import Connection
+
+from model import Base
+
+
+def upgrade(conn: Connection) -> None:
+    # checkfirst: a database created by the old create_all-at-startup keeps its tables
+    Base.metadata.create_all(conn)
@@ -0,0 +1,17 @@
+"""Composite indexes for the per-user lookups every page load makes."""
+from sqlalchemy.engine import Connection
+
+from migrations import ensure_index
+
+HOT_PATH_INDEXES = (
+    # table, index, columns
+    ("generated_problems", "ix_generated_problems_user_created", ("user_name", "created_at")),
+    ("mock_test_results", "ix_mock_test_results_user_submitted", ("user_id", "submitted_at")),
+    ("user_progress", "ix_user_progress_user_operation", ("user_name", "operation")),
+    ("quiz_sessions", "ix_quiz_sessions_user_operation_start", ("user_id", "operation", "start_time")),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    for table, name, columns in HOT_PATH_INDEXES:
+        ensure_index(conn, table, name, columns)
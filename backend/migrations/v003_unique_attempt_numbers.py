@@ -0,0 +1,43 @@
+"""
+Unique (user_id, operation, level, number) on level_attempts and user_scores.
+
+Before attempt_counters, two concurrent submissions could get the same
+number. For each duplicate, this keeps the earliest row (lowest id) on the
+number and moves the rest past the key's highest number. It then drops that
+key's counter, so the next submission reseeds it from the new MAX.
+"""
+from sqlalchemy import MetaData, Table, delete, func, select, update
+from sqlalchemy.engine import Connection
+
+from migrations import ensure_index
+
+NUMBERED = (
+    # table, number column, series in attempt_counters, unique index
+    ("level_attempts", "attempt_number", "level_attempts", "uq_level_attempts_attempt_number"),
+    ("user_scores", "set_number", "user_scores", "uq_user_scores_set_number"),
+)
+
+
+def _renumber_duplicates(conn: Connection, table: Table, number, counters: Table, series: str) -> None:
+    key = (table.c.user_id, table.c.operation, table.c.level)
+    duplicates = conn.execute(
+        select(*key, number).group_by(*key, number).having(func.count() > 1)
+    ).all()
+    for user_id, operation, level, duplicated in duplicates:
+        same_key = (table.c.user_id == user_id, table.c.operation == operation, table.c.level == level)
+        highest = conn.scalar(select(func.max(number)).where(*same_key))
+        ids = conn.scalars(select(table.c.id).where(*same_key, number == duplicated).order_by(table.c.id)).all()
+        for offset, row_id in enumerate(ids[1:], start=1):
+            conn.execute(update(table).where(table.c.id == row_id).values({number.name: highest + offset}))
+        conn.execute(delete(counters).where(
+            counters.c.series == series, counters.c.user_id == user_id,
+            counters.c.operation == operation, counters.c.level == level))
+
+
+def upgrade(conn: Connection) -> None:
+    metadata = MetaData()
+    counters = Table("attempt_counters", metadata, autoload_with=conn)
+    for table_name, column, series, index in NUMBERED:
+        table = Table(table_name, metadata, autoload_with=conn)
+        _renumber_duplicates(conn, table, table.c[column], counters, series)
+        ensure_index(conn, table_name, index, ("user_id", "operation", "level", column), unique=True)
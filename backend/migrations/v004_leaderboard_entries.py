@@ -0,0 +1,8 @@
+"""Persisted leaderboard points, one row per (board, user)."""
+from sqlalchemy.engine import Connection
+
+from model import LeaderboardEntry
+
+
+def upgrade(conn: Connection) -> None:
+    LeaderboardEntry.__table__.create(conn, checkfirst=True)
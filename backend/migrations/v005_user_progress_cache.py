@@ -0,0 +1,8 @@
+"""Cached per-user progress summaries."""
+from sqlalchemy.engine import Connection
+
+from model import UserProgressCache
+
+
+def upgrade(conn: Connection) -> None:
+    UserProgressCache.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,9 @@
+"""Owner of an OCR job, so only one worker process resumes it."""
+from sqlalchemy.engine import Connection
+
+from migrations import ensure_column
+from model import OCRJob
+
+
+def upgrade(conn: Connection) -> None:
+    ensure_column(conn, "ocr_jobs", OCRJob.__table__.c.owner)
@@ -0,0 +1,14 @@
+"""Seed and generator version of custom papers and mock tests, which are rebuilt from them on read."""
+from sqlalchemy.engine import Connection
+
+from migrations import ensure_column, ensure_nullable
+from model import CustomPaper, MockTest
+
+
+def upgrade(conn: Connection) -> None:
+    for model, columns in ((CustomPaper, ("seed", "generator_version")),
+                           (MockTest, ("seed", "generator_version", "params_json"))):
+        table = model.__table__
+        for column in columns:
+            ensure_column(conn, table.name, table.c[column])
+        ensure_nullable(conn, table, "questions_json")
@@ -0,0 +1,11 @@
+"""Seed and generator version of FMC paper sets."""
+from sqlalchemy.engine import Connection
+
+from migrations import ensure_column
+from model import FMCPaperSet
+
+
+def upgrade(conn: Connection) -> None:
+    table = FMCPaperSet.__table__
+    for column in ("seed", "generator_version"):
+        ensure_column(conn, table.name, table.c[column])
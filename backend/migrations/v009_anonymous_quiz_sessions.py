@@ -0,0 +1,9 @@
+"""Quiz sessions without a user, so answer keys of anonymous FMC papers are stored too."""
+from sqlalchemy.engine import Connection
+
+from migrations import ensure_nullable
+from model import QuizSession
+
+
+def upgrade(conn: Connection) -> None:
+    ensure_nullable(conn, QuizSession.__table__, "user_id")
@@ -1,7 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, TIMESTAMP, UniqueConstraint, Index
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, JSON, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, Boolean, ForeignKey, JSON, TIMESTAMP, LargeBinary, Float, BigInteger
 
 Base = declarative_base()
 
@@ -47,6 +47,7 @@ class UserAnswer(Base):
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (Index("ix_user_progress_user_operation", "user_name", "operation"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     ninja_stars = Column(Integer, default=0)
@@ -59,6 +60,8 @@ class UserProgress(Base):
 
 class UserScore(Base):
     __tablename__ = "user_scores"
+    # also serves every (user_id, operation, level) lookup
+    __table_args__ = (UniqueConstraint("user_id", "operation", "level", "set_number", name="uq_user_scores_set_number"),)
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     operation = Column(String(50), nullable=False)
@@ -126,6 +129,8 @@ class FMCQuestionSave(Base):
 
 class LevelAttempt(Base):
     __tablename__ = "level_attempts"
+    # also serves every (user_id, operation, level) lookup
+    __table_args__ = (UniqueConstraint("user_id", "operation", "level", "attempt_number", name="uq_level_attempts_attempt_number"),)
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user_name = Column(String(255), nullable=False)
@@ -139,6 +144,7 @@ class LevelAttempt(Base):
 
 class GeneratedProblem(Base):
     __tablename__ = "generated_problems"
+    __table_args__ = (Index("ix_generated_problems_user_created", "user_name", "created_at"),)
     id = Column(Integer, primary_key=True, index=True)
     user_name = Column(String(255), nullable=False)
     question = Column(Text, nullable=False)
@@ -157,6 +163,8 @@ class FMCPaperSet(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     level = Column(Integer)
     show_answers = Column(Boolean, default=False)
+    seed = Column(BigInteger, nullable=True)
+    generator_version = Column(Integer, nullable=True)
     questions_json = Column(JSON)  # 🔥 all 10 questions as one JSON blob
     created_at = Column(TIMESTAMP, default=datetime.utcnow)
 
@@ -171,7 +179,9 @@ class CustomPaper(Base):
     module_id      = Column(String(100), nullable=False)
     difficulty     = Column(String(20), nullable=False)
     num_questions  = Column(Integer, nullable=False)
-    questions_json = Column(JSON, nullable=False)
+    seed           = Column(BigInteger, nullable=True)
+    generator_version = Column(Integer, nullable=True)
+    questions_json = Column(JSON, nullable=True)    # kept until generator_version is retired
     created_at     = Column(TIMESTAMP, default=datetime.utcnow)
 
     user = relationship("User", back_populates="custom_papers")
@@ -201,8 +211,9 @@ class UploadedFile(Base):
 
 class QuizSession(Base):
     __tablename__ = "quiz_sessions"
+    __table_args__ = (Index("ix_quiz_sessions_user_operation_start", "user_id", "operation", "start_time"),)
     id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)   # NULL for papers served anonymously
     operation = Column(String(50), nullable=False)
     level = Column(Integer, nullable=False)
     session_id = Column(String(100), unique=True, nullable=False)
@@ -220,7 +231,10 @@ class MockTest(Base):
     id             = Column(Integer, primary_key=True)
     test_id        = Column(String(255), unique=True, nullable=False)
     user_id        = Column(Integer, ForeignKey("users.id"), nullable=False)
-    questions_json = Column(JSON, nullable=False)   # includes correct_option (server-side only)
+    seed           = Column(BigInteger, nullable=True)
+    generator_version = Column(Integer, nullable=True)
+    params_json    = Column(JSON, nullable=True)    # difficulty and the pooled items' seeds
+    questions_json = Column(JSON, nullable=True)    # includes correct_option; kept until generator_version is retired
     created_at     = Column(TIMESTAMP, default=datetime.utcnow)
 
     user    = relationship("User", back_populates="mock_tests")
@@ -229,6 +243,7 @@ class MockTest(Base):
 
 class MockTestResult(Base):
     __tablename__ = "mock_test_results"
+    __table_args__ = (Index("ix_mock_test_results_user_submitted", "user_id", "submitted_at"),)
     id           = Column(Integer, primary_key=True)
     test_id      = Column(String(255), ForeignKey("mock_tests.test_id"), nullable=False)
     user_id      = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -243,10 +258,10 @@ class MockTestResult(Base):
 
 
 class GrammarPaper(Base):
-    """10 fixed, seeded grammar-school style exam papers (shared across all users)."""
+    """Fixed, seeded grammar-school style exam papers (shared across all users)."""
     __tablename__ = "grammar_papers"
     id             = Column(Integer, primary_key=True)
-    paper_number   = Column(Integer, unique=True, nullable=False)   # 1–10
+    paper_number   = Column(Integer, unique=True, nullable=False)   # also the generation seed
     title          = Column(String(100), nullable=False)
     difficulty     = Column(String(20), default="mixed")
     questions_json = Column(JSON, nullable=False)    # 50 MCQ items incl. correct_option
@@ -262,4 +277,75 @@ class QuizResponse(Base):
     correct_answer = Column(String(10), nullable=False)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
-    session = relationship("QuizSession", back_populates="responses")
\ No newline at end of file
+    session = relationship("QuizSession", back_populates="responses")
+
+class OCRJob(Base):
+    """A background OCR run over an uploaded answer sheet; page results are saved as they finish."""
+    __tablename__ = "ocr_jobs"
+    id                = Column(Integer, primary_key=True)
+    job_id            = Column(String(64), unique=True, nullable=False)
+    kind              = Column(String(50), nullable=False)      # 'upload-paper' | 'grammar-check'
+    status            = Column(String(20), nullable=False, default="queued")   # queued | running | done | failed
+    owner             = Column(String(100), nullable=True)      # process that claimed it, see services/ocr_jobs.py
+    file_path         = Column(String(500), nullable=False)
+    params_json       = Column(JSON, nullable=False)            # kind-specific inputs
+    pages_total       = Column(Integer, default=0)
+    pages_done        = Column(Integer, default=0)
+    page_results_json = Column(JSON, nullable=False)            # [{page, answers}, ...] in completion order
+    result_json       = Column(JSON, nullable=True)
+    error             = Column(Text, nullable=True)
+    created_at        = Column(TIMESTAMP, default=datetime.utcnow)
+    updated_at        = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UserSeenFilter(Base):
+    """Bloom filters of the questions a user was recently served, one row per (user, scope)."""
+    __tablename__ = "user_seen_filters"
+    user_id       = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    scope         = Column(String(50), primary_key=True)           # 'fmc', ...
+    current_bits  = Column(LargeBinary, nullable=False)            # generation being filled
+    previous_bits = Column(LargeBinary, nullable=True)             # last full generation
+    current_count = Column(Integer, nullable=False, default=0)
+    updated_at    = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UserLevelStars(Base):
+    """Running totals of a user's passed level attempts, one row per (user, level); see services/ninja_stars.py."""
+    __tablename__ = "user_level_stars"
+    user_id         = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    level           = Column(Integer, primary_key=True)
+    passed_attempts = Column(Integer, nullable=False, default=0)
+    performance_sum = Column(Float, nullable=False, default=0.0)      # sum of score / total_questions
+
+
+class AttemptCounter(Base):
+    """Last number handed out per (series, user, operation, level); see services/attempt_counters.py."""
+    __tablename__ = "attempt_counters"
+    series      = Column(String(50), primary_key=True)          # numbered table: 'level_attempts' | 'user_scores'
+    user_id     = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    operation   = Column(String(50), primary_key=True)
+    level       = Column(Integer, primary_key=True)
+    last_number = Column(Integer, nullable=False, default=0)
+
+
+class LeaderboardEntry(Base):
+    """A user's points on one leaderboard (operation, level, period); see services/leaderboards.py."""
+    __tablename__ = "leaderboard_entries"
+    operation    = Column(String(50), primary_key=True)
+    level        = Column(Integer, primary_key=True)               # -1: all levels of the operation
+    period       = Column(String(10), primary_key=True)            # 'daily' | 'weekly' | 'all-time'
+    period_start = Column(Date, primary_key=True)                  # 1970-01-01 for all-time
+    user_id      = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    user_name    = Column(String(255), nullable=False)
+    points       = Column(Integer, nullable=False, default=0)
+    attempts     = Column(Integer, nullable=False, default=0)
+
+
+class UserProgressCache(Base):
+    """A user's per-(operation, level) attempt summary, rebuilt when stale; see services/progress.py."""
+    __tablename__ = "user_progress_cache"
+    user_id       = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    version       = Column(Integer, nullable=False, default=0)      # bumped by every attempt insert
+    built_version = Column(Integer, nullable=False, default=-1)     # version summary_json was built at
+    summary_json  = Column(JSON, nullable=False)                    # [{operation, level, attempts, best_score}, ...]
+    built_at      = Column(TIMESTAMP, default=datetime.utcnow, onupdate=datetime.utcnow)
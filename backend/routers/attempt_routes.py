@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from model import LevelAttempt
+from model import LevelAttempt, User
 from database import get_db
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 import models, schemas
+from services.attempt_counters import next_attempt_number
+from services.attempts import record_level_attempt
+from utils.pagination import PageParams, list_response
 from schemas import LevelAttempt as LevelAttemptSchema 
 
 
@@ -21,30 +25,35 @@ class AttemptInput(BaseModel):
 
 @router.post("/record")
 def record_attempt(data: AttemptInput, db: Session = Depends(get_db)):
-    # Count current number of attempts for this level
-    existing_attempts = db.query(LevelAttempt).filter_by(
-        user_name=data.user_name,
-        operation=data.operation,
-        level=data.level
-    ).count()
+    user = db.query(User).filter_by(username=data.user_name).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
 
     new_attempt = LevelAttempt(
+        user_id=user.id,
         user_name=data.user_name,
         operation=data.operation,
         level=data.level,
-        attempt_number=existing_attempts + 1,
+        attempt_number=next_attempt_number(db, user.id, data.operation, data.level),
         score=data.score,
         total_questions=data.total_questions,
         is_passed=data.is_passed,
         timestamp=datetime.utcnow()
     )
-    db.add(new_attempt)
+    record_level_attempt(db, new_attempt)
     db.commit()
     return {
         "message": "Attempt recorded",
         "attempt_number": new_attempt.attempt_number
     }
 
-@router.get("/attempts/stats", response_model=List[schemas.LevelAttempt])
-def get_all_attempts(db: Session = Depends(get_db)):
-    return db.query(models.LevelAttempt).all()
\ No newline at end of file
+@router.get("/stats", response_model=List[schemas.LevelAttempt])
+def get_all_attempts(response: Response, user_name: Optional[str] = None, operation: Optional[str] = None,
+                     page: PageParams = Depends(), db: Session = Depends(get_db)):
+    """Every user's attempts, newest first; the admin dashboard filters here rather than in the browser."""
+    stmt = select(LevelAttempt)
+    if user_name:
+        stmt = stmt.where(func.lower(LevelAttempt.user_name).contains(user_name.lower(), autoescape=True))
+    if operation:
+        stmt = stmt.where(LevelAttempt.operation == operation)
+    return list_response(db, stmt, (LevelAttempt.id,), response, page, descending=True)
\ No newline at end of file
@@ -9,22 +9,26 @@ import base64
 import io
 import os
 from datetime import datetime
+from typing import Callable
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
 from jinja2 import Template
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from database import get_db
+from database import get_async_db
 from generators.custom_generators import generate_question
+from generators.seeding import GENERATOR_VERSION, make_rng, new_seed
 from model import CustomPaper
+from services.render_cache import content_key, serve_cached_pdf
+from services.render_pool import render_pool
 
 router = APIRouter()
 
 FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "https://www.autodidact.uk")
-PAPERS_DIR = "generated_papers"
 
 MODULE_NAMES = {
     "four-operations":          "Four Operations",
@@ -39,95 +43,11 @@ MODULE_NAMES = {
 
 
 # ---------------------------------------------------------------------------
-# Pydantic request model
-# ---------------------------------------------------------------------------
-class GeneratePaperRequest(BaseModel):
-    user_id: int
-    module_id: str
-    num_questions: int = 10
-    difficulty: str = "medium"
-
-
-# ---------------------------------------------------------------------------
-# Helper: generate QR code as base64 PNG data-URI
-# ---------------------------------------------------------------------------
-def _qr_data_uri(content: str) -> str:
-    import qrcode
-    qr = qrcode.QRCode(box_size=6, border=2)
-    qr.add_data(content)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0)
-    b64 = base64.b64encode(buf.read()).decode()
-    return f"data:image/png;base64,{b64}"
-
-
-# ---------------------------------------------------------------------------
-# Helper: render HTML → PDF via WeasyPrint
-# ---------------------------------------------------------------------------
-def _html_to_pdf(html: str, path: str) -> None:
-    from weasyprint import HTML
-    os.makedirs(PAPERS_DIR, exist_ok=True)
-    HTML(string=html).write_pdf(path)
-
-
+# PDF templates (compiled once). Bump a *_VERSION when its markup changes so
+# cached PDFs rendered from the old markup are no longer served.
 # ---------------------------------------------------------------------------
-# POST /paper/custom/generate
-# ---------------------------------------------------------------------------
-@router.post("/custom/generate")
-def generate_custom_paper(req: GeneratePaperRequest, db: Session = Depends(get_db)):
-    if req.module_id not in MODULE_NAMES:
-        raise HTTPException(status_code=400, detail=f"Unknown module_id: {req.module_id}")
-    if req.num_questions not in (5, 10, 15, 20):
-        raise HTTPException(status_code=400, detail="num_questions must be 5, 10, 15 or 20")
-    if req.difficulty not in ("easy", "medium", "hard"):
-        raise HTTPException(status_code=400, detail="difficulty must be easy, medium or hard")
-
-    paper_id = f"cp_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{uuid4().hex[:8]}"
-
-    questions = []
-    for i in range(req.num_questions):
-        q = generate_question(req.module_id, req.difficulty)
-        q["question_number"] = i + 1
-        q["question_id"] = f"{paper_id}_q{i + 1}"
-        questions.append(q)
-
-    paper = CustomPaper(
-        paper_id=paper_id,
-        user_id=req.user_id,
-        module_id=req.module_id,
-        difficulty=req.difficulty,
-        num_questions=req.num_questions,
-        questions_json=questions,
-    )
-    db.add(paper)
-    db.commit()
-    db.refresh(paper)  # populate paper.id from DB
-
-    return {
-        "id": paper.id,
-        "paper_id": paper_id,
-        "module": MODULE_NAMES[req.module_id],
-        "difficulty": req.difficulty,
-        "num_questions": req.num_questions,
-        "questions": questions,
-    }
-
-
-# ---------------------------------------------------------------------------
-# GET /paper/custom/{paper_id}/question-pdf
-# ---------------------------------------------------------------------------
-@router.get("/custom/{paper_id}/question-pdf")
-def download_question_pdf(paper_id: str, db: Session = Depends(get_db)):
-    paper = db.query(CustomPaper).filter_by(paper_id=paper_id).first()
-    if not paper:
-        raise HTTPException(status_code=404, detail="Paper not found")
-
-    module_name = MODULE_NAMES.get(paper.module_id, paper.module_id)
-
-    html = Template("""
+QUESTION_TEMPLATE_VERSION = 1
+QUESTION_TEMPLATE = Template("""
 <!DOCTYPE html>
 <html>
 <head>
@@ -170,34 +90,10 @@ def download_question_pdf(paper_id: str, db: Session = Depends(get_db)):
   <div class="footer">autodidact.uk &mdash; {{ paper_id }}</div>
 </body>
 </html>
-""").render(
-        module_name=module_name,
-        difficulty=paper.difficulty,
-        num_questions=paper.num_questions,
-        paper_id=paper_id,
-        questions=paper.questions_json,
-    )
+""")
 
-    filename = f"{paper_id}_questions.pdf"
-    path = os.path.join(PAPERS_DIR, filename)
-    _html_to_pdf(html, path)
-    return FileResponse(path, filename=filename, media_type="application/pdf")
-
-
-# ---------------------------------------------------------------------------
-# GET /paper/custom/{paper_id}/answer-sheet-pdf
-# ---------------------------------------------------------------------------
-@router.get("/custom/{paper_id}/answer-sheet-pdf")
-def download_answer_sheet_pdf(paper_id: str, db: Session = Depends(get_db)):
-    paper = db.query(CustomPaper).filter_by(paper_id=paper_id).first()
-    if not paper:
-        raise HTTPException(status_code=404, detail="Paper not found")
-
-    module_name = MODULE_NAMES.get(paper.module_id, paper.module_id)
-    qr_url = f"{FRONTEND_BASE_URL}/submit-answers?paperId={paper_id}"
-    qr_img = _qr_data_uri(qr_url)
-
-    html = Template("""
+ANSWER_SHEET_TEMPLATE_VERSION = 1
+ANSWER_SHEET_TEMPLATE = Template("""
 <!DOCTYPE html>
 <html>
 <head>
@@ -267,16 +163,166 @@ def download_answer_sheet_pdf(paper_id: str, db: Session = Depends(get_db)):
   </div>
 </body>
 </html>
-""").render(
-        module_name=module_name,
-        difficulty=paper.difficulty,
-        num_questions=paper.num_questions,
+""")
+
+
+# ---------------------------------------------------------------------------
+# Pydantic request model
+# ---------------------------------------------------------------------------
+class GeneratePaperRequest(BaseModel):
+    user_id: int
+    module_id: str
+    num_questions: int = 10
+    difficulty: str = "medium"
+
+
+# ---------------------------------------------------------------------------
+# Helper: generate QR code as base64 PNG data-URI
+# ---------------------------------------------------------------------------
+def _qr_data_uri(content: str) -> str:
+    import qrcode
+    qr = qrcode.QRCode(box_size=6, border=2)
+    qr.add_data(content)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    buf.seek(0)
+    b64 = base64.b64encode(buf.read()).decode()
+    return f"data:image/png;base64,{b64}"
+
+
+# ---------------------------------------------------------------------------
+# Helper: render HTML → PDF via WeasyPrint
+# ---------------------------------------------------------------------------
+async def _render_pdf(build_html: Callable[[], str], path: str) -> None:
+    # templating and the QR code are quick, but CPU work all the same; WeasyPrint runs in the render workers
+    html = await run_in_threadpool(build_html)
+    await render_pool.render_html(html, path)
+
+
+# ---------------------------------------------------------------------------
+# Helper: build a paper's questions from its seed
+# ---------------------------------------------------------------------------
+def build_custom_questions(paper_id: str, module_id: str, difficulty: str,
+                           num_questions: int, seed: int) -> list[dict]:
+    """Same (GENERATOR_VERSION, seed, params) always rebuilds the same questions."""
+    rng = make_rng(seed)
+    questions = []
+    for i in range(num_questions):
+        q = generate_question(module_id, difficulty, rng)
+        q["question_number"] = i + 1
+        q["question_id"] = f"{paper_id}_q{i + 1}"
+        questions.append(q)
+    return questions
+
+
+def paper_questions(paper: CustomPaper) -> list[dict]:
+    """
+    Rebuild a stored paper's questions from its seed. Papers from an older
+    generator version (or from before seeds were kept) are served as stored,
+    until `python manage.py retire-generator` drops their questions.
+    """
+    if paper.seed is not None and paper.generator_version == GENERATOR_VERSION:
+        return build_custom_questions(paper.paper_id, paper.module_id, paper.difficulty, paper.num_questions,
+                                      paper.seed)
+    if paper.questions_json is None:
+        raise HTTPException(status_code=410, detail=f"Generator version {paper.generator_version} has been retired; "
+                                                    "generate a new paper")
+    return paper.questions_json
+
+
+# ---------------------------------------------------------------------------
+# POST /paper/custom/generate
+# ---------------------------------------------------------------------------
+@router.post("/custom/generate")
+async def generate_custom_paper(req: GeneratePaperRequest, db: AsyncSession = Depends(get_async_db)):
+    if req.module_id not in MODULE_NAMES:
+        raise HTTPException(status_code=400, detail=f"Unknown module_id: {req.module_id}")
+    if req.num_questions not in (5, 10, 15, 20):
+        raise HTTPException(status_code=400, detail="num_questions must be 5, 10, 15 or 20")
+    if req.difficulty not in ("easy", "medium", "hard"):
+        raise HTTPException(status_code=400, detail="difficulty must be easy, medium or hard")
+
+    paper_id = f"cp_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{uuid4().hex[:8]}"
+
+    seed = new_seed()
+    questions = build_custom_questions(paper_id, req.module_id, req.difficulty, req.num_questions, seed)
+
+    paper = CustomPaper(
         paper_id=paper_id,
-        questions=paper.questions_json,
-        qr_img=qr_img,
+        user_id=req.user_id,
+        module_id=req.module_id,
+        difficulty=req.difficulty,
+        num_questions=req.num_questions,
+        seed=seed,
+        generator_version=GENERATOR_VERSION,
+        questions_json=questions,
     )
+    db.add(paper)
+    await db.commit()
+    await db.refresh(paper)  # populate paper.id from DB
+
+    return {
+        "id": paper.id,
+        "paper_id": paper_id,
+        "module": MODULE_NAMES[req.module_id],
+        "difficulty": req.difficulty,
+        "num_questions": req.num_questions,
+        "seed": seed,
+        "generator_version": GENERATOR_VERSION,
+        "questions": questions,
+    }
+
+
+# ---------------------------------------------------------------------------
+# GET /paper/custom/{paper_id}/question-pdf
+# ---------------------------------------------------------------------------
+@router.get("/custom/{paper_id}/question-pdf")
+async def download_question_pdf(paper_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    paper = await db.scalar(select(CustomPaper).filter_by(paper_id=paper_id))
+    if not paper:
+        raise HTTPException(status_code=404, detail="Paper not found")
+
+    module_name = MODULE_NAMES.get(paper.module_id, paper.module_id)
+
+    context = {
+        "module_name": module_name,
+        "difficulty": paper.difficulty,
+        "num_questions": paper.num_questions,
+        "paper_id": paper_id,
+        "questions": paper_questions(paper),
+    }
+    key = content_key("custom/question", QUESTION_TEMPLATE_VERSION, context)
+
+    async def render(path: str) -> None:
+        await _render_pdf(lambda: QUESTION_TEMPLATE.render(**context), path)
+
+    return await serve_cached_pdf(request, key, f"{paper_id}_questions.pdf", render)
+
+
+# ---------------------------------------------------------------------------
+# GET /paper/custom/{paper_id}/answer-sheet-pdf
+# ---------------------------------------------------------------------------
+@router.get("/custom/{paper_id}/answer-sheet-pdf")
+async def download_answer_sheet_pdf(paper_id: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    paper = await db.scalar(select(CustomPaper).filter_by(paper_id=paper_id))
+    if not paper:
+        raise HTTPException(status_code=404, detail="Paper not found")
+
+    module_name = MODULE_NAMES.get(paper.module_id, paper.module_id)
+    context = {
+        "module_name": module_name,
+        "difficulty": paper.difficulty,
+        "num_questions": paper.num_questions,
+        "paper_id": paper_id,
+        "questions": paper_questions(paper),
+        "qr_url": f"{FRONTEND_BASE_URL}/submit-answers?paperId={paper_id}",
+    }
+    key = content_key("custom/answer-sheet", ANSWER_SHEET_TEMPLATE_VERSION, context)
+
+    async def render(path: str) -> None:
+        await _render_pdf(lambda: ANSWER_SHEET_TEMPLATE.render(**context, qr_img=_qr_data_uri(context["qr_url"])),
+                          path)
 
-    filename = f"{paper_id}_answer_sheet.pdf"
-    path = os.path.join(PAPERS_DIR, filename)
-    _html_to_pdf(html, path)
-    return FileResponse(path, filename=filename, media_type="application/pdf")
+    return await serve_cached_pdf(request, key, f"{paper_id}_answer_sheet.pdf", render)
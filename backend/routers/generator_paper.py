@@ -7,7 +7,9 @@ import os
 import json
 from fastapi import APIRouter, Query, Depends, HTTPException
 from fastapi.responses import StreamingResponse
-from database import get_db
+from database import get_async_db, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from model import User, FMCQuestionSave, FMCPaperSet
 from utils.generate_pdf import create_pdf, create_pdf_stream
 from utils.generate_excel import create_excel, create_excel_stream
@@ -16,11 +18,12 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from utils.paper_generator import generate_paper_pdf
 from uuid import uuid4
-from typing import List
+from typing import List, Optional
 from routers.fmc_routes import generate_fmc_problem
+from generators.seeding import make_rng
 from fastapi.responses import FileResponse
 from jinja2 import Template
-from weasyprint import HTML
+from services.render_pool import render_pool
 
 
 router = APIRouter(prefix="/paper", tags=["Paper"])
@@ -39,22 +42,27 @@ def get_paper_json(user_id: int, level: int, sublevel: str = 'C', db: Session =
         raise HTTPException(status_code=404, detail="Paper not found")
 
     return paper.questions_json
+def fmc_paper_problems(paper_id: str, level: int, rng, count: int = 10) -> list[dict]:
+    questions = []
+    for i in range(count):
+        q_dict = generate_fmc_problem(level, rng).dict()
+        q_dict["question_id"] = f"{paper_id}_{i}"
+        questions.append(q_dict)
+    return questions
+
+
 @router.get("/fmc/generate-paper-pdf")
-def generate_and_download_paper(
+async def generate_and_download_paper(
     user_id: int,
     level: int,
     show_answers: bool = False,
-    db: Session = Depends(get_db)
+    seed: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    
+    rng = make_rng(seed)
     paper_id = f"paper_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{uuid4().hex[:6]}"
-    questions = []
-
-    for i in range(10):
-        q = generate_fmc_problem(level)
-        q_dict = q.dict()
-        q_dict["question_id"] = f"{paper_id}_{i}"
-        questions.append(q_dict)
+    # generation is CPU-bound; keep it off the event loop like the render below
+    questions = await run_in_threadpool(fmc_paper_problems, paper_id, level, rng)
 
     # ✅ Save entire paper as one JSON record
     paper = FMCQuestionSave(
@@ -65,7 +73,7 @@ def generate_and_download_paper(
         is_exam_ready=show_answers
     )
     db.add(paper)
-    db.commit()
+    await db.commit()
 
     # ✅ HTML template to render as PDF
     html_template = """
@@ -101,7 +109,7 @@ def generate_and_download_paper(
     filename = f"{paper_id}_{'with_answers' if show_answers else 'student'}.pdf"
     pdf_path = f"generated_papers/{filename}"
     os.makedirs("generated_papers", exist_ok=True)
-    HTML(string=html_content).write_pdf(pdf_path)
+    await render_pool.render_html(html_content, pdf_path)
 
     return FileResponse(pdf_path, filename=filename, media_type="application/pdf")
 
@@ -1,7 +1,7 @@
 """
 Grammar School Paper endpoints.
   GET  /grammar/papers             → list all seeded papers
-  GET  /grammar/papers/seed        → seed 10 fixed papers (idempotent)
+  GET  /grammar/papers/seed        → seed papers 1..count in the background (idempotent)
   GET  /grammar/papers/{n}/questions        → questions without correct_option
   GET  /grammar/papers/{n}/answers          → questions with correct_option + explanation
   GET  /grammar/papers/{n}/question-pdf     → WeasyPrint PDF (questions only)
@@ -13,30 +13,40 @@ Grammar School Paper endpoints.
 
   POST /grammar/papers/{n}/check-upload
     Body: multipart file (PDF or image)
-    → OCR extract answers → score + full review
+    → 202 + OCR job id; poll /ocr/jobs/{job_id} for the score + full review
 """
 import base64
 import io
+import logging
 import os
-import shutil
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, UploadFile, File
 from jinja2 import Template
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from database import get_db
-from generators.mcq_generator import generate_exam
+from database import get_async_db, get_db
 from model import GrammarPaper
-from utils.pdf_parser import extract_answers_from_pdf
+from services.grammar_seeding import missing_paper_numbers, seed_grammar_papers
+from services.render_cache import content_key, render_cache, serve_cached_pdf
+from services.render_pool import render_pool
+from routers.ocr_job_routes import job_accepted
+from services.ocr_jobs import ocr_jobs, register_finaliser, stage_upload
+from utils.omr import GRAMMAR_SHEET, read_sheet_page
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 FRONTEND_BASE_URL = os.getenv("FRONTEND_BASE_URL", "https://www.autodidact.uk")
-PAPERS_DIR = "generated_papers"
 NUM_FIXED_PAPERS = 10
-QUESTIONS_PER_PAPER = 50
+MAX_SEEDED_PAPERS = int(os.getenv("MAX_SEEDED_PAPERS", "1000"))
+LOW_CONFIDENCE = 0.5   # OMR confidence below which a question is flagged for review
 
 MODULE_LABELS = {
     'four-operations':          'Four Operations',
@@ -50,6 +60,119 @@ MODULE_LABELS = {
 }
 
 
+# ---------------------------------------------------------------------------
+# PDF templates (compiled once). Bump a *_VERSION when its markup changes so
+# cached PDFs rendered from the old markup are no longer served.
+# ---------------------------------------------------------------------------
+QUESTION_TEMPLATE_VERSION = 1
+QUESTION_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+  body { font-family: Arial, sans-serif; margin: 40px; color: #222; }
+  h1   { font-size: 20px; text-align: center; margin-bottom: 4px; }
+  .meta { text-align: center; font-size: 13px; color: #555; margin-bottom: 20px; }
+  .student-info { display: flex; gap: 40px; margin-bottom: 26px; font-size: 13px; }
+  .student-info span { border-bottom: 1px solid #888; min-width: 180px; display: inline-block; }
+  .question { margin-bottom: 18px; }
+  .question p { margin: 0 0 4px; font-size: 14px; }
+  .options { display: flex; flex-wrap: wrap; gap: 4px 24px; font-size: 13px; margin-left: 10px; }
+  .option { padding: 2px 0; }
+  .work-space { border: 1px solid #ddd; height: 28px; margin-top: 4px; border-radius: 3px; }
+  .footer { margin-top: 40px; font-size: 11px; color: #aaa; text-align: center; }
+</style>
+</head>
+<body>
+  <h1>{{ title }}</h1>
+  <div class="meta">Grammar School Entrance Examination &nbsp;|&nbsp; 50 Questions &nbsp;|&nbsp; 60 Minutes</div>
+
+  <div class="student-info">
+    <label>Name: <span>&nbsp;</span></label>
+    <label>Date: <span>&nbsp;</span></label>
+    <label>Score: <span>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;</span> / 50</label>
+  </div>
+
+  <ol>
+  {% for q in questions %}
+    <li class="question">
+      <p>{{ q.question }}</p>
+      <div class="options">
+        {% for lbl, val in q.options.items() %}
+        <span class="option">{{ lbl }}) {{ val }}</span>
+        {% endfor %}
+      </div>
+      <div class="work-space"></div>
+    </li>
+  {% endfor %}
+  </ol>
+
+  <div class="footer">autodidact.uk &mdash; {{ title }}</div>
+</body>
+</html>
+""")
+
+ANSWER_SHEET_TEMPLATE_VERSION = 2   # v2: absolute mm layout + registration marks for OMR
+ANSWER_SHEET_TEMPLATE = Template("""
+<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<style>
+  @page { size: A4; margin: 0; }
+  body { font-family: Arial, sans-serif; margin: 0; color: #222; }
+  .abs { position: absolute; }
+  .mark { position: absolute; width: {{ sheet.mark_mm }}mm; height: {{ sheet.mark_mm }}mm; background: #000; }
+  .title-block { left: 25mm; top: 22mm; width: 125mm; }
+  .title-block h1 { font-size: 18px; margin: 0 0 4px; }
+  .title-block .meta { font-size: 12px; color: #555; }
+  .qr-block { left: 157mm; top: 22mm; width: 28mm; text-align: center; }
+  .qr-block img { width: 28mm; height: 28mm; }
+  .qr-block p { font-size: 9px; color: #888; margin: 2px 0 0; }
+  .student-info { left: 25mm; top: 52mm; font-size: 13px; }
+  .student-info label { margin-right: 30px; }
+  .student-info span { border-bottom: 1px solid #888; min-width: 160px; display: inline-block; }
+  .q-num { position: absolute; width: 10mm; font-size: 12px; font-weight: bold;
+           line-height: {{ sheet.bubble_mm }}mm; text-align: right; }
+  .bubble { position: absolute; box-sizing: border-box; width: {{ sheet.bubble_mm }}mm; height: {{ sheet.bubble_mm }}mm;
+            border: 0.3mm solid #888; border-radius: 50%; font-size: 9px; color: #aaa;
+            line-height: {{ sheet.bubble_mm - 0.6 }}mm; text-align: center; }
+  .footer { left: 0; top: 283mm; width: 210mm; font-size: 11px; color: #aaa; text-align: center; }
+</style>
+</head>
+<body>
+  {% for x, y in sheet.mark_origins() %}
+  <div class="mark" style="left: {{ x }}mm; top: {{ y }}mm;"></div>
+  {% endfor %}
+
+  <div class="abs title-block">
+    <h1>{{ title }} — Answer Sheet</h1>
+    <div class="meta">50 Questions &nbsp;|&nbsp; Fill in one bubble per question with a dark pen</div>
+  </div>
+  <div class="abs qr-block">
+    <img src="{{ qr_img }}" alt="QR">
+    <p>Scan to submit online</p>
+  </div>
+
+  <div class="abs student-info">
+    <label>Name: <span>&nbsp;</span></label>
+    <label>Date: <span>&nbsp;</span></label>
+  </div>
+
+  {% for row in sheet.template_rows() %}
+  <div class="q-num" style="left: {{ row.x }}mm; top: {{ row.y }}mm;">{{ row.number }}</div>
+  {% for b in row.bubbles %}
+  <div class="bubble" style="left: {{ b.x }}mm; top: {{ b.y }}mm;">{{ b.label }}</div>
+  {% endfor %}
+  {% endfor %}
+
+  <div class="abs footer">autodidact.uk &mdash; {{ title }}</div>
+</body>
+</html>
+""")
+
+
 # ---------------------------------------------------------------------------
 # Pydantic models
 # ---------------------------------------------------------------------------
@@ -73,10 +196,10 @@ def _qr_data_uri(content: str) -> str:
     return f"data:image/png;base64,{base64.b64encode(buf.read()).decode()}"
 
 
-def _html_to_pdf(html: str, path: str) -> None:
-    from weasyprint import HTML
-    os.makedirs(PAPERS_DIR, exist_ok=True)
-    HTML(string=html).write_pdf(path)
+async def _render_pdf(build_html: Callable[[], str], path: str) -> None:
+    # templating and the QR code are quick, but CPU work all the same; WeasyPrint runs in the render workers
+    html = await run_in_threadpool(build_html)
+    await render_pool.render_html(html, path)
 
 
 def _strip_answer(q: dict) -> dict:
@@ -127,28 +250,80 @@ def _score_answers(questions: list, submitted: dict) -> dict:
     }
 
 
+# ---------------------------------------------------------------------------
+# PDFs: (cache key, HTML builder) per paper, shared by the download routes and seeding
+# ---------------------------------------------------------------------------
+def question_pdf(paper: GrammarPaper) -> tuple[str, Callable[[], str]]:
+    context = {'title': paper.title, 'questions': [_strip_answer(q) for q in paper.questions_json]}
+    return (content_key('grammar/question', QUESTION_TEMPLATE_VERSION, context),
+            lambda: QUESTION_TEMPLATE.render(**context))
+
+
+def answer_sheet_pdf(paper: GrammarPaper) -> tuple[str, Callable[[], str]]:
+    context = {
+        'title': paper.title,
+        'sheet': GRAMMAR_SHEET,   # bubble positions are shared with the OMR reader
+        'qr_url': f"{FRONTEND_BASE_URL}/test-papers/{paper.paper_number}/submit",
+    }
+    return (content_key('grammar/answer-sheet', ANSWER_SHEET_TEMPLATE_VERSION, context),
+            lambda: ANSWER_SHEET_TEMPLATE.render(**context, qr_img=_qr_data_uri(context['qr_url'])))
+
+
+async def _serve_pdf(request: Request, pdf: tuple[str, Callable[[], str]], filename: str):
+    key, build_html = pdf
+
+    async def render(path: str) -> None:
+        await _render_pdf(build_html, path)
+
+    return await serve_cached_pdf(request, key, filename, render)
+
+
+def prerender_paper_pdfs(db: Session, numbers: list[int]) -> int:
+    """
+    Render the question and answer-sheet PDFs of the given papers into the
+    render cache, so the first download is a cache hit. At most one render per
+    render worker is in flight, so this never trips the pool's 503 admission
+    limit for interactive users. Returns how many PDFs are now cached.
+    """
+    papers = db.query(GrammarPaper).filter(GrammarPaper.paper_number.in_(numbers)).all()
+    jobs = [pdf(paper) for paper in papers for pdf in (question_pdf, answer_sheet_pdf)]
+
+    def render(job) -> bool:
+        key, build_html = job
+        try:
+            render_cache.get_or_create(key, lambda path: render_pool.render_html_blocking(build_html(), path))
+            return True
+        except Exception as e:
+            logger.warning(f"[grammar-seed] pre-render failed for {key}: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=render_pool.workers) as executor:
+        return sum(executor.map(render, jobs))
+
+
+def _seed_in_background(db: Session, numbers: list[int], render: bool) -> None:
+    # the request's session is closed by now; use a fresh one on the same engine
+    with Session(bind=db.get_bind()) as session:
+        prerender = (lambda created: prerender_paper_pdfs(session, created)) if render else None
+        seed_grammar_papers(session, numbers, prerender=prerender)
+
+
 # ---------------------------------------------------------------------------
 # GET /grammar/papers/seed
 # ---------------------------------------------------------------------------
-@router.get('/papers/seed')
-def seed_papers(db: Session = Depends(get_db)):
-    """Generate and store 10 fixed grammar papers. Idempotent — skips existing ones."""
-    created = []
-    for n in range(1, NUM_FIXED_PAPERS + 1):
-        existing = db.query(GrammarPaper).filter_by(paper_number=n).first()
-        if existing:
-            continue
-        questions = generate_exam(QUESTIONS_PER_PAPER, 'mixed')
-        paper = GrammarPaper(
-            paper_number=n,
-            title=f"Grammar School Paper {n}",
-            difficulty="mixed",
-            questions_json=questions,
-        )
-        db.add(paper)
-        created.append(n)
-    db.commit()
-    return {'created': created, 'message': f'{len(created)} paper(s) seeded.'}
+@router.get('/papers/seed', status_code=202)
+def seed_papers(background_tasks: BackgroundTasks, db: Session = Depends(get_db),
+                count: int = Query(NUM_FIXED_PAPERS, ge=1, le=MAX_SEEDED_PAPERS), render: bool = True):
+    """
+    Seed grammar papers 1..count. Idempotent — skips existing ones. Each paper
+    is seeded with its paper number, so it can always be regenerated.
+    Generation, insertion and PDF pre-rendering run after the response; for
+    large runs use `python manage.py seed-grammar`.
+    """
+    missing = missing_paper_numbers(db, range(1, count + 1))
+    if missing:
+        background_tasks.add_task(_seed_in_background, db, missing, render)
+    return {'scheduled': missing, 'message': f'{len(missing)} paper(s) scheduled for seeding.'}
 
 
 # ---------------------------------------------------------------------------
@@ -203,160 +378,24 @@ def get_answers(n: int, db: Session = Depends(get_db)):
 # GET /grammar/papers/{n}/question-pdf
 # ---------------------------------------------------------------------------
 @router.get('/papers/{n}/question-pdf')
-def download_question_pdf(n: int, db: Session = Depends(get_db)):
-    from fastapi.responses import FileResponse
-    paper = db.query(GrammarPaper).filter_by(paper_number=n).first()
+async def download_question_pdf(n: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    paper = await db.scalar(select(GrammarPaper).filter_by(paper_number=n))
     if not paper:
         raise HTTPException(status_code=404, detail=f'Paper {n} not found.')
 
-    questions = [_strip_answer(q) for q in paper.questions_json]
-
-    html = Template("""
-<!DOCTYPE html>
-<html>
-<head>
-<meta charset="utf-8">
-<style>
-  body { font-family: Arial, sans-serif; margin: 40px; color: #222; }
-  h1   { font-size: 20px; text-align: center; margin-bottom: 4px; }
-  .meta { text-align: center; font-size: 13px; color: #555; margin-bottom: 20px; }
-  .student-info { display: flex; gap: 40px; margin-bottom: 26px; font-size: 13px; }
-  .student-info span { border-bottom: 1px solid #888; min-width: 180px; display: inline-block; }
-  .question { margin-bottom: 18px; }
-  .question p { margin: 0 0 4px; font-size: 14px; }
-  .options { display: flex; flex-wrap: wrap; gap: 4px 24px; font-size: 13px; margin-left: 10px; }
-  .option { padding: 2px 0; }
-  .work-space { border: 1px solid #ddd; height: 28px; margin-top: 4px; border-radius: 3px; }
-  .footer { margin-top: 40px; font-size: 11px; color: #aaa; text-align: center; }
-</style>
-</head>
-<body>
-  <h1>{{ title }}</h1>
-  <div class="meta">Grammar School Entrance Examination &nbsp;|&nbsp; 50 Questions &nbsp;|&nbsp; 60 Minutes</div>
-
-  <div class="student-info">
-    <label>Name: <span>&nbsp;</span></label>
-    <label>Date: <span>&nbsp;</span></label>
-    <label>Score: <span>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;</span> / 50</label>
-  </div>
-
-  <ol>
-  {% for q in questions %}
-    <li class="question">
-      <p>{{ q.question }}</p>
-      <div class="options">
-        {% for lbl, val in q.options.items() %}
-        <span class="option">{{ lbl }}) {{ val }}</span>
-        {% endfor %}
-      </div>
-      <div class="work-space"></div>
-    </li>
-  {% endfor %}
-  </ol>
-
-  <div class="footer">autodidact.uk &mdash; {{ title }}</div>
-</body>
-</html>
-""").render(title=paper.title, questions=questions)
-
-    filename = f"Grammar_Paper_{n}_questions.pdf"
-    path = os.path.join(PAPERS_DIR, filename)
-    _html_to_pdf(html, path)
-    return FileResponse(path, filename=filename, media_type="application/pdf")
+    return await _serve_pdf(request, question_pdf(paper), f"Grammar_Paper_{n}_questions.pdf")
 
 
 # ---------------------------------------------------------------------------
 # GET /grammar/papers/{n}/answer-sheet-pdf
 # ---------------------------------------------------------------------------
 @router.get('/papers/{n}/answer-sheet-pdf')
-def download_answer_sheet_pdf(n: int, db: Session = Depends(get_db)):
-    from fastapi.responses import FileResponse
-    paper = db.query(GrammarPaper).filter_by(paper_number=n).first()
+async def download_answer_sheet_pdf(n: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    paper = await db.scalar(select(GrammarPaper).filter_by(paper_number=n))
     if not paper:
         raise HTTPException(status_code=404, detail=f'Paper {n} not found.')
 
-    qr_url = f"{FRONTEND_BASE_URL}/test-papers/{n}/submit"
-    qr_img = _qr_data_uri(qr_url)
-
-    html = Template("""
-<!DOCTYPE html>
-<html>
-<head>
-<meta charset="utf-8">
-<style>
-  body { font-family: Arial, sans-serif; margin: 40px; color: #222; }
-  .header { display: flex; justify-content: space-between; align-items: flex-start; }
-  .title-block h1 { font-size: 20px; margin-bottom: 4px; }
-  .title-block .meta { font-size: 12px; color: #555; }
-  .qr-block { text-align: right; }
-  .qr-block img { width: 110px; height: 110px; }
-  .qr-block p { font-size: 10px; color: #888; margin: 4px 0 0; }
-  .student-info { display: flex; gap: 40px; margin: 20px 0; font-size: 13px; }
-  .student-info span { border-bottom: 1px solid #888; min-width: 200px; display: inline-block; }
-  table { width: 100%; border-collapse: collapse; margin-top: 8px; }
-  th { background: #f0f0f0; padding: 6px 8px; font-size: 12px; border: 1px solid #ccc; }
-  td { padding: 8px; border: 1px solid #ccc; font-size: 12px; vertical-align: middle; }
-  .q-num  { width: 50px; text-align: center; font-weight: bold; }
-  .bubble-row { display: flex; gap: 14px; }
-  .bubble { display: inline-flex; align-items: center; justify-content: center;
-            width: 22px; height: 22px; border: 1px solid #999; border-radius: 50%;
-            font-size: 11px; font-weight: bold; }
-  .tick-box { width: 60px; text-align: center; }
-  .footer { margin-top: 30px; font-size: 11px; color: #aaa; text-align: center; }
-</style>
-</head>
-<body>
-  <div class="header">
-    <div class="title-block">
-      <h1>{{ title }} — Answer Sheet</h1>
-      <div class="meta">50 Questions &nbsp;|&nbsp; Circle one bubble per question</div>
-    </div>
-    <div class="qr-block">
-      <img src="{{ qr_img }}" alt="QR">
-      <p>Scan to submit online</p>
-    </div>
-  </div>
-
-  <div class="student-info">
-    <label>Name: <span>&nbsp;</span></label>
-    <label>Date: <span>&nbsp;</span></label>
-  </div>
-
-  <table>
-    <thead>
-      <tr>
-        <th class="q-num">Q</th>
-        <th>Circle your answer</th>
-        <th class="tick-box">&#10003; / &#10007;</th>
-      </tr>
-    </thead>
-    <tbody>
-    {% for q in questions %}
-      <tr>
-        <td class="q-num">{{ loop.index }}</td>
-        <td>
-          <div class="bubble-row">
-            <span class="bubble">A</span>
-            <span class="bubble">B</span>
-            <span class="bubble">C</span>
-            <span class="bubble">D</span>
-          </div>
-        </td>
-        <td class="tick-box">&nbsp;</td>
-      </tr>
-    {% endfor %}
-    </tbody>
-  </table>
-
-  <div class="footer">autodidact.uk &mdash; {{ title }}</div>
-</body>
-</html>
-""").render(title=paper.title, questions=paper.questions_json, qr_img=qr_img)
-
-    filename = f"Grammar_Paper_{n}_answer_sheet.pdf"
-    path = os.path.join(PAPERS_DIR, filename)
-    _html_to_pdf(html, path)
-    return FileResponse(path, filename=filename, media_type="application/pdf")
+    return await _serve_pdf(request, answer_sheet_pdf(paper), f"Grammar_Paper_{n}_answer_sheet.pdf")
 
 
 # ---------------------------------------------------------------------------
@@ -373,22 +412,30 @@ def check_typed(n: int, req: CheckTypedRequest, db: Session = Depends(get_db)):
 # ---------------------------------------------------------------------------
 # POST /grammar/papers/{n}/check-upload
 # ---------------------------------------------------------------------------
-@router.post('/papers/{n}/check-upload')
-async def check_upload(n: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+@router.post('/papers/{n}/check-upload', status_code=202)
+def check_upload(n: int, file: UploadFile = File(...), db: Session = Depends(get_db)):
+    # Plain def: the upload is already spooled by the time we run, and the
+    # lookup, the file write and create_job's commit all block, so the whole
+    # handler runs on the threadpool rather than the event loop.
     paper = db.query(GrammarPaper).filter_by(paper_number=n).first()
     if not paper:
         raise HTTPException(status_code=404, detail=f'Paper {n} not found.')
 
-    # Save uploaded file to a temp path
-    suffix = os.path.splitext(file.filename or "upload.pdf")[1] or ".pdf"
-    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
-        shutil.copyfileobj(file.file, tmp)
-        tmp_path = tmp.name
-
+    # OCR runs in the background; the graded result lands on /ocr/jobs/{job_id}
     try:
-        extracted = extract_answers_from_pdf(tmp_path)   # [{question_number, answer}, ...]
-    finally:
-        os.unlink(tmp_path)
+        path, pages_total = stage_upload(file.file, file.filename)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = ocr_jobs.create_job(db, 'grammar-check', path, {'paper_number': n}, pages_total=pages_total)
+    return job_accepted(job)
+
+
+def _finalise_check_upload(db: Session, job, extracted: list) -> dict:
+    """OCR finaliser: grade the extracted answers against the paper."""
+    n = job.params_json['paper_number']
+    paper = db.query(GrammarPaper).filter_by(paper_number=n).first()
+    if not paper:
+        raise ValueError(f'Paper {n} not found.')
 
     # Convert extracted list to {q1: 'A', q2: 'B', ...} keyed by question_id
     submitted: dict[str, str] = {}
@@ -400,5 +447,11 @@ async def check_upload(n: int, file: UploadFile = File(...), db: Session = Depen
 
     result = _score_answers(paper.questions_json, submitted)
     result['ocr_extracted'] = len(submitted)
-    result['ocr_note'] = 'Some answers may not have been detected if handwriting was unclear.'
+    result['low_confidence'] = [item['question_number'] for item in extracted
+                                if item.get('confidence', 1.0) < LOW_CONFIDENCE]
+    result['ocr_note'] = 'Questions listed in low_confidence were faint, blank or had more than one bubble filled.'
     return result
+
+
+# Answer sheets are read by bubble OMR rather than full-page Tesseract
+register_finaliser('grammar-check', _finalise_check_upload, page_reader=read_sheet_page)
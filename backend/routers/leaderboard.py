@@ -1,21 +1,24 @@
-from fastapi import APIRouter
-from sqlalchemy import desc
-from database import SessionLocal, UserScore
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from database import get_db
+from services.leaderboards import ALL_LEVELS, leaderboards
 
 router = APIRouter()
 
+Period = Literal["daily", "weekly", "all-time"]
+
+
 @router.get("/leaderboard")
-def get_leaderboard(operation: str = "addition"):
-    db = SessionLocal()
-    results = db.query(UserScore).filter_by(operation=operation, is_completed=True).order_by(desc(UserScore.created_at)).limit(10).all()
-    db.close()
-    return [
-        {
-            "name": row.user_name,
-            "level": row.level,
-            "score": row.score,
-            "set": row.set_number,
-            "date": row.created_at
-        }
-        for row in results
-    ]
+def get_leaderboard(operation: str = "addition", level: int = ALL_LEVELS, period: Period = "all-time",
+                    limit: int = Query(10, ge=1, le=100), db: Session = Depends(get_db)):
+    """Top players by points; level -1 ranks all levels of the operation together."""
+    return leaderboards.top(db, operation, level, period, limit)
+
+
+@router.get("/leaderboard/rank/{user_id}")
+def get_rank(user_id: int, operation: str = "addition", level: int = ALL_LEVELS, period: Period = "all-time",
+             db: Session = Depends(get_db)):
+    return {"user_id": user_id, **leaderboards.rank(db, user_id, operation, level, period)}
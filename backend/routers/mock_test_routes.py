@@ -1,25 +1,44 @@
 """
 Grammar-school mock exam endpoints.
   POST /test/generate          → create 50-question MCQ exam
+  GET  /test/pool/stats        → depth and hit/miss counters per (module, difficulty)
   GET  /test/{test_id}         → fetch questions (no correct_option sent to client)
   POST /test/{test_id}/submit  → score and persist result
   GET  /test/results/{user_id} → list past results for a user
+
+A test is stored as (generator_version, seed, params) and is rebuilt from
+them on read. Pooled items are each generated from their own seed, so params
+record the seeds drawn for every blueprint cell; the exam seed drives the
+blueprint and the shuffle. Rebuilding replays both. The questions are stored
+as well, for when GENERATOR_VERSION has moved on, until that version is
+retired (`python manage.py retire-generator`).
 """
+import os
 from datetime import datetime
+from itertools import product
+from typing import Optional
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
-from database import get_db
-from generators.mcq_generator import generate_exam
+from database import get_async_db
+from generators.mcq_generator import DIFFICULTIES, MODULES, assemble_exam, generate_mcq
+from generators.seeding import GENERATOR_VERSION, make_rng, new_seed
 from model import MockTest, MockTestResult
+from services.question_pool import QuestionPool
+from services.seen_filter import SeenSet, load_seen, save_seen
 
 router = APIRouter()
 
 NUM_QUESTIONS = 50
 TIME_LIMIT_SECONDS = 3600  # 60 minutes
+MCQ_POOL_TARGET = int(os.getenv("MCQ_POOL_TARGET", "60"))
+MCQ_POOL_LOW_WATER = int(os.getenv("MCQ_POOL_LOW_WATER", "25"))
+SEEN_SCOPE = 'mock_test'
 
 MODULE_LABELS = {
     'four-operations':          'Four Operations',
@@ -33,6 +52,83 @@ MODULE_LABELS = {
 }
 
 
+# ---------------------------------------------------------------------------
+# Item pool: validated MCQs per (module, difficulty), topped up in the background
+# ---------------------------------------------------------------------------
+def _is_valid_item(q: dict) -> bool:
+    options = q.get('options') or {}
+    return (bool(q.get('question')) and len(set(options.values())) == 4
+            and options.get(q.get('correct_option')) == q.get('correct_answer'))
+
+
+def seeded_mcq(module_id: str, difficulty: str, seed: int) -> dict:
+    return {**generate_mcq(module_id, difficulty, make_rng(seed)), 'seed': seed}
+
+
+mcq_item_pool = QuestionPool(
+    'mcq',
+    lambda key: seeded_mcq(*key, new_seed()),
+    target_size=MCQ_POOL_TARGET,
+    low_water=MCQ_POOL_LOW_WATER,
+    identity=lambda q: q['question'],
+    validate=_is_valid_item,
+)
+MCQ_POOL_KEYS = list(product(MODULES, DIFFICULTIES))
+
+
+def _cell(module_id: str, level: str) -> str:
+    return f'{module_id}/{level}'
+
+
+def build_exam(difficulty: str, seen: Optional[SeenSet] = None,
+               seed: Optional[int] = None) -> tuple[list[dict], dict]:
+    """
+    Assemble an exam from the pool, skipping questions in `seen` while the pool
+    has others. Returns the questions and the params that `rebuild_exam` needs
+    to rebuild them from `seed`.
+    """
+    seed = new_seed() if seed is None else seed
+    # some modules ignore difficulty, so two cells can hold the same question
+    chosen: set = set()
+    item_seeds: dict[str, list[int]] = {}
+
+    def exclude(q: dict) -> bool:
+        return q['question'] in chosen or (seen is not None and q['question'] in seen)
+
+    def draw(module_id: str, level: str, count: int) -> list[dict]:
+        key = (module_id, level)
+        items = mcq_item_pool.take(key, count, exclude=exclude)
+        chosen.update(q['question'] for q in items)
+        if len(items) < count:
+            # the user has seen nearly everything in this cell: repeats beat a short exam
+            items += mcq_item_pool.generate_unique(key, count - len(items), chosen)
+        item_seeds[_cell(module_id, level)] = [q['seed'] for q in items]
+        return items
+
+    questions = assemble_exam(draw, NUM_QUESTIONS, difficulty, make_rng(seed))
+    return questions, {'difficulty': difficulty, 'num_questions': NUM_QUESTIONS, 'items': item_seeds}
+
+
+def rebuild_exam(seed: int, params: dict) -> list[dict]:
+    """The questions `build_exam` returned for this seed and params."""
+    item_seeds = {cell: iter(seeds) for cell, seeds in params['items'].items()}
+
+    def draw(module_id: str, level: str, count: int) -> list[dict]:
+        seeds = item_seeds.get(_cell(module_id, level), iter(()))
+        return [seeded_mcq(module_id, level, item_seed) for item_seed, _ in zip(seeds, range(count))]
+
+    return assemble_exam(draw, params['num_questions'], params['difficulty'], make_rng(seed))
+
+
+def exam_questions(test: MockTest) -> list[dict]:
+    """A stored test's questions, correct_option included: rebuilt while its generator version is current."""
+    if test.seed is not None and test.generator_version == GENERATOR_VERSION:
+        return rebuild_exam(test.seed, test.params_json)
+    if test.questions_json is None:
+        raise HTTPException(status_code=410, detail=f'Generator version {test.generator_version} has been retired')
+    return test.questions_json
+
+
 # ---------------------------------------------------------------------------
 # Request models
 # ---------------------------------------------------------------------------
@@ -48,53 +144,72 @@ class SubmitExamRequest(BaseModel):
 
 
 # ---------------------------------------------------------------------------
-# Helper: strip correct_option before sending to client
+# Helper: strip correct_option, and the item seed that would reveal it, before sending to client
 # ---------------------------------------------------------------------------
 def _sanitise(q: dict) -> dict:
-    return {k: v for k, v in q.items() if k != 'correct_option'}
+    return {k: v for k, v in q.items() if k not in ('correct_option', 'seed')}
 
 
 # ---------------------------------------------------------------------------
 # POST /test/generate
 # ---------------------------------------------------------------------------
 @router.post('/generate')
-def generate_test(req: GenerateExamRequest, db: Session = Depends(get_db)):
+async def generate_test(req: GenerateExamRequest, db: AsyncSession = Depends(get_async_db)):
     if req.difficulty not in ('easy', 'medium', 'hard', 'mixed'):
         raise HTTPException(status_code=400, detail='difficulty must be easy | medium | hard | mixed')
 
     test_id = f"mt_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{uuid4().hex[:8]}"
-    questions = generate_exam(NUM_QUESTIONS, req.difficulty)
+    seen = await db.run_sync(load_seen, req.user_id, SEEN_SCOPE)
+    # normally a handful of pool pops; a dry cell generates inline, so keep it off the event loop
+    seed = new_seed()
+    questions, params = await run_in_threadpool(build_exam, req.difficulty, seen, seed)
+    seen.update(q['question'] for q in questions)
+    await db.run_sync(save_seen, req.user_id, SEEN_SCOPE, seen)
 
     test = MockTest(
         test_id=test_id,
         user_id=req.user_id,
+        seed=seed,
+        generator_version=GENERATOR_VERSION,
+        params_json=params,
         questions_json=questions,   # stored with correct_option
     )
     db.add(test)
-    db.commit()
+    await db.commit()
 
     # Return questions WITHOUT the correct_option
     return {
         'test_id': test_id,
         'num_questions': NUM_QUESTIONS,
         'time_limit_seconds': TIME_LIMIT_SECONDS,
+        'seed': seed,
+        'generator_version': GENERATOR_VERSION,
         'questions': [_sanitise(q) for q in questions],
     }
 
 
+# ---------------------------------------------------------------------------
+# GET /test/pool/stats
+# ---------------------------------------------------------------------------
+@router.get('/pool/stats')
+def get_pool_stats():
+    return mcq_item_pool.stats()
+
+
 # ---------------------------------------------------------------------------
 # GET /test/{test_id}   (resume / reload)
 # ---------------------------------------------------------------------------
 @router.get('/{test_id}')
-def get_test(test_id: str, db: Session = Depends(get_db)):
-    test = db.query(MockTest).filter_by(test_id=test_id).first()
+async def get_test(test_id: str, db: AsyncSession = Depends(get_async_db)):
+    test = await db.scalar(select(MockTest).filter_by(test_id=test_id))
     if not test:
         raise HTTPException(status_code=404, detail='Test not found')
+    questions = await run_in_threadpool(exam_questions, test)
     return {
         'test_id': test_id,
-        'num_questions': len(test.questions_json),
+        'num_questions': len(questions),
         'time_limit_seconds': TIME_LIMIT_SECONDS,
-        'questions': [_sanitise(q) for q in test.questions_json],
+        'questions': [_sanitise(q) for q in questions],
     }
 
 
@@ -102,12 +217,12 @@ def get_test(test_id: str, db: Session = Depends(get_db)):
 # POST /test/{test_id}/submit
 # ---------------------------------------------------------------------------
 @router.post('/{test_id}/submit')
-def submit_test(test_id: str, req: SubmitExamRequest, db: Session = Depends(get_db)):
-    test = db.query(MockTest).filter_by(test_id=test_id).first()
+async def submit_test(test_id: str, req: SubmitExamRequest, db: AsyncSession = Depends(get_async_db)):
+    test = await db.scalar(select(MockTest).filter_by(test_id=test_id))
     if not test:
         raise HTTPException(status_code=404, detail='Test not found')
 
-    questions = test.questions_json
+    questions = await run_in_threadpool(exam_questions, test)
     score = 0
     breakdown: dict[str, dict] = {}
     review = []
@@ -151,8 +266,8 @@ def submit_test(test_id: str, req: SubmitExamRequest, db: Session = Depends(get_
         answers_json=req.answers,
     )
     db.add(result)
-    db.commit()
-    db.refresh(result)
+    await db.commit()
+    await db.refresh(result)
 
     return {
         'result_id': result.id,
@@ -170,14 +285,13 @@ def submit_test(test_id: str, req: SubmitExamRequest, db: Session = Depends(get_
 # GET /test/results/{user_id}
 # ---------------------------------------------------------------------------
 @router.get('/results/{user_id}')
-def get_user_results(user_id: int, db: Session = Depends(get_db)):
-    results = (
-        db.query(MockTestResult)
+async def get_user_results(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    results = (await db.scalars(
+        select(MockTestResult)
         .filter_by(user_id=user_id)
         .order_by(MockTestResult.submitted_at.desc())
         .limit(20)
-        .all()
-    )
+    )).all()
     return [
         {
             'result_id': r.id,
@@ -0,0 +1,86 @@
+"""
+OCR job endpoints (uploads are OCR'd in the background — see services/ocr_jobs.py).
+  GET /ocr/jobs/{job_id}         → status, answers per finished page, final result
+  GET /ocr/jobs/{job_id}/stream  → NDJSON: one line per page as it finishes, then the outcome
+  GET /ocr/jobs/{job_id}/excel   → answers spreadsheet of a finished /upload-paper/ job
+"""
+import asyncio
+import json
+import os
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from model import OCRJob
+from services.ocr_jobs import UNFINISHED, ocr_jobs
+
+router = APIRouter(prefix="/ocr", tags=["OCR"])
+
+STREAM_POLL_SECONDS = float(os.getenv("OCR_STREAM_POLL_SECONDS", "0.5"))
+
+
+def job_accepted(job: OCRJob) -> JSONResponse:
+    """202 response returned by the upload endpoints."""
+    return JSONResponse(status_code=202, content={
+        "job_id": job.job_id,
+        "status": job.status,
+        "status_url": f"/ocr/jobs/{job.job_id}",
+        "stream_url": f"/ocr/jobs/{job.job_id}/stream",
+    })
+
+
+def _get_or_404(job_id: str) -> dict:
+    snapshot = ocr_jobs.get(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="OCR job not found")
+    return snapshot
+
+
+# ---------------------------------------------------------------------------
+# GET /ocr/jobs/{job_id}
+# ---------------------------------------------------------------------------
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    return _get_or_404(job_id)
+
+
+# ---------------------------------------------------------------------------
+# GET /ocr/jobs/{job_id}/stream
+# ---------------------------------------------------------------------------
+@router.get("/jobs/{job_id}/stream")
+async def stream_job(job_id: str):
+    snapshot = await run_in_threadpool(_get_or_404, job_id)
+
+    async def events():
+        nonlocal snapshot
+        sent = set()
+        while True:
+            for page in snapshot["pages"]:
+                if page["page"] not in sent:
+                    sent.add(page["page"])
+                    yield json.dumps({"event": "page", "pages_total": snapshot["pages_total"], **page}) + "\n"
+            if snapshot["status"] not in UNFINISHED:
+                yield json.dumps({"event": snapshot["status"], "result": snapshot["result"],
+                                  "error": snapshot["error"]}) + "\n"
+                return
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+            snapshot = await run_in_threadpool(_get_or_404, job_id)
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+# ---------------------------------------------------------------------------
+# GET /ocr/jobs/{job_id}/excel
+# ---------------------------------------------------------------------------
+@router.get("/jobs/{job_id}/excel")
+def download_job_excel(job_id: str):
+    snapshot = _get_or_404(job_id)
+    excel_path = (snapshot["result"] or {}).get("excel_path")
+    if snapshot["status"] != "done" or not excel_path or not os.path.exists(excel_path):
+        raise HTTPException(status_code=409, detail=f"No spreadsheet for job in status {snapshot['status']!r}")
+    return FileResponse(
+        excel_path,
+        filename=os.path.basename(excel_path),
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
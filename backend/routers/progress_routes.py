@@ -35,38 +35,13 @@ def update_progress(user_name: str, operation: str, level: int, passed: bool, db
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional
-from model import UserProgress, LevelAttempt
+from model import UserProgress
+from services.progress import by_level, progress_summary
 
 router = APIRouter()
 
 @router.get("/progress/{user_id}")
 def get_progress(user_id: int, operation: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(LevelAttempt).filter(LevelAttempt.user_id == user_id)
-    if operation:
-        query = query.filter(LevelAttempt.operation == operation)
-
-    attempts = query.all()
-
-    progress_summary = []
-    levels = {}
-
-    for attempt in attempts:
-        level = attempt.level
-        if level not in levels:
-            levels[level] = {
-                "attempts": 0,
-                "best_score": 0
-            }
-        levels[level]["attempts"] += 1
-        levels[level]["best_score"] = max(levels[level]["best_score"], attempt.score)
-
-    for level, data in levels.items():
-        progress_summary.append({
-            "level": level,
-            "attempts": data["attempts"],
-            "best_score": data["best_score"]
-        })
-
     return {
-        "progress": progress_summary
+        "progress": by_level(progress_summary(db, user_id), operation)
     }
@@ -1,20 +1,28 @@
 from fastapi import APIRouter, FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Dict
+from typing import List, Dict, Optional
 from pydantic import BaseModel
 import random
 from datetime import datetime
-from database import get_db
+from database import get_db, get_async_db
 from model import LevelAttempt, User, QuizSession, FMCPaperSet, FMCPaperSet
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 from uuid import uuid4
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 import os, json
 from reportlab.pdfgen import canvas
 
 from model import FMCQuestionSave
 from routers.fmc_routes import generate_fmc_problem
+from generators.seeding import GENERATOR_VERSION, make_rng, new_seed
+from services.attempt_counters import next_attempt_number
+from services.attempts import record_level_attempt
+from services.render_pool import render_pool
+from utils.generate_pdf import draw_fmc_paper
 from openpyxl import Workbook
 from fastapi.responses import StreamingResponse
 from io import BytesIO
@@ -85,11 +93,6 @@ def submit_result(result: QuizResult):
     return {"status": "ok"}
 
 
-@router.get("/leaderboard")
-def get_leaderboard():
-    return sorted(quiz_results, key=lambda r: r["score"], reverse=True)
-
-
 class AnswerSubmission(BaseModel):
     name: str
     question_index: int
@@ -102,13 +105,14 @@ def submit_answer(data: AnswerSubmission):
     return {"status": "ok"}
 
 @router.post("/record-attempt")
-def record_attempt(user_id: int, operation: str, level: int, score: int, total_questions: int, db: Session = Depends(get_db)):
-    attempt_number = db.query(LevelAttempt).filter_by(user_id=user_id, level=level, operation=operation).count() + 1
+async def record_attempt(user_id: int, operation: str, level: int, score: int, total_questions: int, db: AsyncSession = Depends(get_async_db)):
+    attempt_number = await db.run_sync(next_attempt_number, user_id, operation, level)
     is_passed = score == total_questions
+    user = await db.get(User, user_id)
 
     level_attempt = LevelAttempt(
         user_id=user_id,
-        user_name=db.query(User).filter(User.id == user_id).first().username,
+        user_name=user.username,
         operation=operation,
         level=level,
         attempt_number=attempt_number,
@@ -116,21 +120,21 @@ def record_attempt(user_id: int, operation: str, level: int, score: int, total_q
         total_questions=total_questions,
         is_passed=is_passed
     )
-    db.add(level_attempt)
-    db.commit()
+    await db.run_sync(record_level_attempt, level_attempt)
+    await db.commit()
 
     return {"message": "Level attempt recorded", "attempt_number": attempt_number}
 
+
 @router.post("/submit-challenge/")
-def submit_challenge(user_id: int, operation: str, level: int, score: int, total_questions: int, db: Session = Depends(get_db)):
+async def submit_challenge(user_id: int, operation: str, level: int, score: int, total_questions: int, db: AsyncSession = Depends(get_async_db)):
     # Fetch user info
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         return {"error": "User not found"}
 
-    # Check if user already attempted this level
-    previous_attempts = db.query(LevelAttempt).filter_by(user_id=user_id, operation=operation, level=level).count()
-    attempt_number = previous_attempts + 1
+    # Number this attempt for the level
+    attempt_number = await db.run_sync(next_attempt_number, user_id, operation, level)
 
     # Define passing condition (example: 80% needed to pass)
     passing_score = 0.8 * total_questions
@@ -151,9 +155,9 @@ def submit_challenge(user_id: int, operation: str, level: int, score: int, total
         is_passed=is_passed
     )
 
-    db.add(level_attempt)
-    db.commit()
-    db.refresh(level_attempt)
+    await db.run_sync(record_level_attempt, level_attempt)
+    await db.commit()
+    await db.refresh(level_attempt)
 
     return {
         "message": "Challenge submitted successfully!",
@@ -164,26 +168,22 @@ def submit_challenge(user_id: int, operation: str, level: int, score: int, total
 
 
 @router.post("/level-attempt/")
-def save_level_attempt(
+async def save_level_attempt(
     
     user_id: int,
     operation: str,
     level: int,
     score: int,
     total_questions: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    logger.info("Saving attempt for user_id=1, level=2, etc...")
-
-    print(f"🔍 Fetching user with ID = {user_id}")
-    user = db.query(User).filter(User.id == user_id).first()
-    print(f"✅ User found: {user.username if user else 'None'}")
+    logger.info(f"Saving attempt for user_id={user_id}, level={level}")
 
+    user = await db.get(User, user_id)
     if not user:
         return {"error": "User not found"}
 
-    previous_attempts = db.query(LevelAttempt).filter_by(user_id=user_id, operation=operation, level=level).count()
-    attempt_number = previous_attempts + 1
+    attempt_number = await db.run_sync(next_attempt_number, user_id, operation, level)
 
     is_passed = score >= (0.8 * total_questions)
 
@@ -198,10 +198,9 @@ def save_level_attempt(
         is_passed=is_passed
     )
    
-    db.add(level_attempt)
-    db.commit()
-    db.refresh(level_attempt)
-    update_ninja_stars_and_title(user_id, db)
+    await db.run_sync(record_level_attempt, level_attempt)
+    await db.commit()
+    await db.refresh(level_attempt)
 
     return {
         "message": "Level attempt saved successfully!",
@@ -210,49 +209,8 @@ def save_level_attempt(
         "is_passed": is_passed
     }
 
-# for updating the ninja stars and title
-def update_ninja_stars_and_title(user_id: int, db: Session):
-    attempts = db.query(LevelAttempt).filter(LevelAttempt.user_id == user_id).all()
-
-    level_weights = {i: (i + 1) * 0.1 for i in range(10)}  # 0.1 to 1.0
-    total_weight = 0
-    weighted_score = 0
-
-    for a in attempts:
-        if a.is_passed:
-            weight = level_weights.get(a.level, 0)
-            total_weight += weight
-            performance = a.score / a.total_questions
-            weighted_score += performance * weight
-
-    if total_weight == 0:
-        average_score = 0
-    else:
-        average_score = weighted_score / total_weight
-
-    # Convert average score to stars (out of 5)
-    ninja_stars = round(average_score * 5)
-
-    # Award title
-    if ninja_stars >= 5:
-        title = "Math Ninja 🥇"
-    elif ninja_stars >= 3:
-        title = "Confident Solver 🥈"
-    elif ninja_stars >= 1:
-        title = "Basic Learner 🥉"
-    else:
-        title = "Getting Started"
-
-    # Update user table
-    user = db.query(User).filter_by(id=user_id).first()
-    if user:
-        user.ninja_stars = ninja_stars
-        user.awarded_title = title
-        db.commit()
-
-
 @router.post("/start-session")
-def start_quiz_session(user_id: int, username: str, operation: str, level: int, db: Session = Depends(get_db)):
+async def start_quiz_session(user_id: int, username: str, operation: str, level: int, db: AsyncSession = Depends(get_async_db)):
     # Create unique session ID
     session_id = str(uuid4())
     
@@ -268,8 +226,8 @@ def start_quiz_session(user_id: int, username: str, operation: str, level: int,
     )
 
     db.add(session_entry)
-    db.commit()
-    db.refresh(session_entry)
+    await db.commit()
+    await db.refresh(session_entry)
 
     return {
         "message": "Session started",
@@ -277,55 +235,45 @@ def start_quiz_session(user_id: int, username: str, operation: str, level: int,
         "session_db_id": session_entry.id
     }
 
+
+def fmc_paper_questions(level: int, rng: random.Random, count: int = 20) -> list[dict]:
+    questions = []
+    for i in range(count):
+        q = generate_fmc_problem(level, rng)
+        questions.append({
+            "number": i + 1,
+            "question": q.question,
+            "answer": q.answer,
+            "explanation": q.explanation,
+        })
+    return questions
+
+
 @router.get("/fmc/generate-paper-pdf")
-def generate_paper_pdf(user_id: int, level: int, show_answers: bool = False, db: Session = Depends(get_db)):
+async def generate_paper_pdf(user_id: int, level: int, show_answers: bool = False, seed: Optional[int] = None, db: AsyncSession = Depends(get_async_db)):
+    seed = new_seed() if seed is None else seed
+    rng = make_rng(seed)
     paper_id = f"paper_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid4().hex[:4]}"
     filename = f"{paper_id}_{'teacher' if show_answers else 'student'}.pdf"
     pdf_path = os.path.join("generated_papers", filename)
     os.makedirs("generated_papers", exist_ok=True)
 
-    c = canvas.Canvas(pdf_path)
-    y = 800
-    c.drawString(50, y, f"Maths Challenge Paper ID: {paper_id}")
-    y -= 40
-    questions = []
-    for i in range(20):
-        q = generate_fmc_problem(level)
-        c.drawString(50, y, f"{i+1}. {q.question}")
-        y -= 30
-        if show_answers:
-            c.drawString(70, y, f"Answer: {q.answer}")
-            y -= 20
-        answer = getattr(q, "answer", "N/A")
-        question = getattr(q, "question", "No question")
-        explanation = getattr(q, "explanation", "")
-
-        question_entry = {
-        "number": i + 1,
-        "question": q.question,
-        "answer": q.answer,
-        "explanation": q.explanation,
-        }
-        questions.append(question_entry)
-    
-        paper_set = FMCPaperSet(
+    # generation is CPU-bound; keep it off the event loop like the drawing below
+    questions = await run_in_threadpool(fmc_paper_questions, level, rng)
+
+    db.add(FMCPaperSet(
         paper_id=paper_id,
         user_id=user_id,
         level=level,
         show_answers=show_answers,
+        seed=seed,
+        generator_version=GENERATOR_VERSION,
         questions_json=questions,
-        )
-        db.add(paper_set)
+    ))
+    await db.commit()
+    await render_pool.run(draw_fmc_paper, pdf_path, paper_id, questions, show_answers)
+    logger.info(f"Paper {paper_id} saved and PDF created: {pdf_path}")
 
-        if y < 100:
-            c.showPage()
-            y = 800
-    
-    print("✅ Saved question:", question)
-    db.commit()
-    print("✅ Paper saved and PDF created:", pdf_path)
-
-    c.save()
     return FileResponse(path=pdf_path, filename=filename, media_type="application/pdf")
 
 
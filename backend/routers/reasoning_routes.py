@@ -1,9 +1,10 @@
 # reasoning_routes.py
 
 from fastapi import APIRouter
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 import random
+from generators.seeding import make_rng
 from routers import reasoning_routes
 
 
@@ -15,13 +16,14 @@ class Question(BaseModel):
     explanation: str
 
 @router.get("/reasoning/flow-logic", response_model=List[Question])
-def get_flow_chain_questions():
+def get_flow_chain_questions(seed: Optional[int] = None):
+    rng = make_rng(seed)
     questions = []
     for _ in range(10):
-        start = random.randint(1, 9)
+        start = rng.randint(1, 9)
         multiplier = 0
-        subtractor = random.randint(1, 5)
-        final = random.randint(1, 10)
+        subtractor = rng.randint(1, 5)
+        final = rng.randint(1, 10)
         temp = start * multiplier
         missing = final + subtractor - temp
         question = f"{start} → × {multiplier} → + ? → - {subtractor} = {final}"
@@ -31,12 +33,13 @@ def get_flow_chain_questions():
     return questions
 
 @router.get("/reasoning/shapes", response_model=List[Question])
-def get_symbolic_shapes_questions():
+def get_symbolic_shapes_questions(seed: Optional[int] = None):
+    rng = make_rng(seed)
     questions = []
     for _ in range(10):
-        triangle = random.randint(1, 9)
-        pentagon = random.randint(1, triangle)
-        hexagon = random.randint(1, 9)
+        triangle = rng.randint(1, 9)
+        pentagon = rng.randint(1, triangle)
+        hexagon = rng.randint(1, 9)
         trapezium = 4
         q_text = (
             f"🟥 - 🟩 = {triangle - pentagon}\n"
@@ -52,10 +55,11 @@ def get_symbolic_shapes_questions():
     return questions
 
 @router.get("/reasoning/max-option", response_model=List[Question])
-def get_max_option_questions():
+def get_max_option_questions(seed: Optional[int] = None):
+    rng = make_rng(seed)
     questions = []
     for _ in range(10):
-        a, b, c = random.sample(range(1, 5), 3)
+        a, b, c = rng.sample(range(1, 5), 3)
         options = {
             "A": a + b - c,
             "B": b - a + c,
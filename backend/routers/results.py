@@ -1,8 +1,10 @@
 # routes/results.py
 from fastapi import APIRouter, Depends
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from model import QuizSession, LevelAttempt, LevelAttempt, User
 from database import get_db
+from services.progress import progress_summary
 from datetime import datetime
 from uuid import uuid4
 
@@ -34,7 +36,12 @@ def get_user_progress(user_id: int, db: Session = Depends(get_db)):
     if not user:
         return {"message": "User not found", "attempts": []}
     
-    attempts = db.query(LevelAttempt).filter(LevelAttempt.user_id == user_id).all()
+    attempts = db.execute(
+        select(LevelAttempt.operation, LevelAttempt.level, LevelAttempt.attempt_number, LevelAttempt.score,
+               LevelAttempt.total_questions, LevelAttempt.timestamp)
+        .where(LevelAttempt.user_id == user_id)
+        .order_by(LevelAttempt.id)
+    )
 
     attempt_data = [
         {
@@ -43,7 +50,7 @@ def get_user_progress(user_id: int, db: Session = Depends(get_db)):
             "attempt_number": a.attempt_number,
             "score": a.score,
             "total_questions": a.total_questions,
-            "date": a.timestamp.strftime("%Y-%m-%d %H:%M")
+            "date": a.timestamp.strftime("%Y-%m-%d %H:%M") if a.timestamp else None
         }
         for a in attempts
     ]
@@ -51,7 +58,9 @@ def get_user_progress(user_id: int, db: Session = Depends(get_db)):
     return {
         "ninja_stars": user.ninja_stars,
         "awarded_title": user.awarded_title,
-        "attempts": attempt_data
+        "attempts": attempt_data,
+        # one row per (operation, level), from the cached read model
+        "summary": progress_summary(db, user_id)
     }
 
 @router.post("/start-session")
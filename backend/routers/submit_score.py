@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Depends, HTTPException
 from pydantic import BaseModel
-from database import SessionLocal
-from model import UserScore
+from sqlalchemy.orm import Session
+from database import get_db
+from model import User, UserScore
+from services.attempt_counters import next_set_number
 
 router = APIRouter()
 
@@ -13,26 +15,21 @@ class ScoreSubmission(BaseModel):
     total_questions: int
 
 @router.post("/submit-score")
-def submit_score(payload: ScoreSubmission):
-    db = SessionLocal()
-
-    # Get existing attempts to calculate next set number
-    prev_attempts = db.query(UserScore).filter_by(
-        user_name=payload.user_name,
-        operation=payload.operation,
-        level=payload.level
-    ).count()
+def submit_score(payload: ScoreSubmission, db: Session = Depends(get_db)):
+    user = db.query(User).filter_by(username=payload.user_name).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
 
+    set_number = next_set_number(db, user.id, payload.operation, payload.level)
     new_score = UserScore(
-        user_name=payload.user_name,
+        user_id=user.id,
         operation=payload.operation,
         level=payload.level,
-        set_number=prev_attempts + 1,
+        set_number=set_number,
         score=payload.score,
         total_questions=payload.total_questions,
         is_completed=(payload.score == payload.total_questions)
     )
     db.add(new_score)
     db.commit()
-    db.close()
-    return {"message": "Score submitted", "set_number": prev_attempts + 1}
+    return {"message": "Score submitted", "set_number": set_number}
@@ -1,7 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
 from pydantic import BaseModel
-from typing import List
-import random
+from typing import List, Optional
+from generators.arithmetic import generate_questions
 
 router = APIRouter()
 
@@ -11,21 +11,5 @@ class Question(BaseModel):
     explanation: str
 
 @router.get("/subtraction/questions", response_model=List[Question])
-def get_subtraction_questions(level: int = 0):
-    questions = []
-
-    for _ in range(10):
-        if level == 0:
-            a, b = sorted([random.randint(1, 9), random.randint(1, 9)], reverse=True)
-        elif level == 1:
-            a, b = sorted([random.randint(10, 99), random.randint(10, 99)], reverse=True)
-        else:
-            a, b = sorted([random.randint(50, 150), random.randint(50, 150)], reverse=True)
-
-        question = f"{a} - {b} ="
-        answer = str(a - b)
-        explanation = f"Subtract {b} from {a}"
-        
-        questions.append(Question(question=question, answer=answer, explanation=explanation))
-
-    return questions
+def get_subtraction_questions(level: int = 0, seed: Optional[int] = Query(None, ge=0)):
+    return generate_questions("subtraction", level, 10, seed)
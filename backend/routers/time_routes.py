@@ -4,6 +4,8 @@ from datetime import datetime
 from database import get_db
 from models import QuizSession, LevelAttempt
 from pydantic import BaseModel
+from services.attempt_counters import next_attempt_number
+from services.attempts import record_level_attempt
 
 router = APIRouter()
 
@@ -30,25 +32,18 @@ def submit_time_quiz(data: TimeQuizSubmission, db: Session = Depends(get_db)):
     db.commit()
     db.refresh(session)
 
-    # Count previous attempts
-    existing_attempts = db.query(LevelAttempt).filter_by(
-        user_id=data.user_id,
-        operation="time",
-        level=0
-    ).count()
-
     # Create a LevelAttempt
     level_attempt = LevelAttempt(
         user_id=data.user_id,
         user_name=data.user_name,
         operation="time",
         level=0,
-        attempt_number=existing_attempts + 1,
+        attempt_number=next_attempt_number(db, data.user_id, "time", 0),
         score=data.score,
         total_questions=data.total_questions,
         is_passed=data.score >= data.total_questions  # only 100% passes
     )
-    db.add(level_attempt)
+    record_level_attempt(db, level_attempt)
     db.commit()
 
     return {"message": "✅ Time Quiz saved!", "quiz_session_id": session.id}
@@ -1,4 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from passlib.hash import bcrypt
@@ -8,7 +9,11 @@ from sqlalchemy.orm import Session
 from fastapi import APIRouter, HTTPException, Depends
 from passlib.hash import bcrypt
 from fastapi import FastAPI
+from datetime import datetime
 from model import User, UserProgress, UserLog
+from services.progress import progress_summary
+from services.write_buffer import write_buffer
+from utils.pagination import PageParams, list_response, row_dict
 
 
 router = APIRouter()
@@ -19,22 +24,13 @@ def get_user_profile(user_id: int, db: Session = Depends(get_db)):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    progress = db.query(UserProgress).filter(UserProgress.user_id == user_id).all()
     return {
         "userid": user.id,
         "username": user.username,
         "email": user.email,
         "ninja_stars": user.ninja_stars,
         "awarded_title": "Math Explorer",
-        "progress": [
-            {
-                "operation": p.operation,
-                "level": p.level,
-                "attempts": p.attempts,
-                "best_score": p.best_score
-            }
-            for p in progress
-        ]
+        "progress": progress_summary(db, user_id)
     }
 
 
@@ -66,10 +62,9 @@ def update_user(user_id: int, payload: dict, db: Session = Depends(get_db)):
     db.commit()
     return {"message": "User updated successfully"}
 
-def log_user_action(db: Session, user_id: int, action: str):
-    log = UserLog(user_id=user_id, action=action)
-    db.add(log)
-    db.commit()
+def log_user_action(user_id: int, action: str):
+    # audit trail only, so it rides the write-behind buffer instead of a commit of its own
+    write_buffer.add(UserLog, user_id=user_id, action=action, timestamp=datetime.utcnow())
 
 @router.delete("/user/delete/{user_id}")
 def delete_user(user_id: int, db: Session = Depends(get_db)):
@@ -79,7 +74,7 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
 
     user.is_active = False
     db.commit()
-    log_user_action(db, user_id, "deactivated")
+    log_user_action(user_id, "deactivated")
 
     return {"message": "User deactivated successfully"}
 
@@ -91,18 +86,18 @@ def reactivate_user(user_id: int, db: Session = Depends(get_db)):
 
     user.is_active = True
     db.commit()
-    log_user_action(db, user_id, "reactivated")
+    log_user_action(user_id, "reactivated")
 
     return {"message": f"✅ User {user.id} reactivated"}
 
 
 @router.get("/admin/inactive-users")
-def get_inactive_users(db: Session = Depends(get_db)):
-    users = db.query(User).filter(User.is_active == False).all()
-    return users
+def get_inactive_users(response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    return list_response(db, select(User).where(User.is_active == False), (User.id,), response, page,
+                         serialise=lambda user: row_dict(user, exclude=("password",)))
 
 
 @router.get("/admin/user-logs")
-def get_user_logs(db: Session = Depends(get_db)):
-    logs = db.query(UserLog).order_by(UserLog.timestamp.desc()).all()
-    return logs
+def get_user_logs(response: Response, page: PageParams = Depends(), db: Session = Depends(get_db)):
+    # newest first; ids follow insertion order, so this matches timestamp order on the primary key
+    return list_response(db, select(UserLog), (UserLog.id,), response, page, descending=True)
@@ -1,40 +1,44 @@
 from fastapi import APIRouter, Query
+from typing import Optional
 import random
+from generators.seeding import make_rng, resolve_rng
+from datetime import datetime
 from model import GeneratedProblem
-from database import SessionLocal
+from services.write_buffer import write_buffer
 
 router = APIRouter()
 
 names = ["Ava", "Liam", "Zoe", "Noah", "Emma", "Ethan"]
 items = ["apples", "books", "coins", "stickers", "pencils"]
 
-def generate_problem(op, level):
+def generate_problem(op, level, rng: Optional[random.Random] = None):
+    rng = resolve_rng(rng)
     if op == "addition":
-        a, b = random.randint(5, 10 + level), random.randint(1, 5 + level)
-        name1, name2 = random.sample(names, 2)
-        item = random.choice(items)
+        a, b = rng.randint(5, 10 + level), rng.randint(1, 5 + level)
+        name1, name2 = rng.sample(names, 2)
+        item = rng.choice(items)
         q = f"{name1} had {a} {item}. {name2} gave {name1} {b} more. How many does {name1} have now?"
         ans = a + b
     elif op == "subtraction":
-        total = random.randint(10 + level, 20 + level * 2)
-        taken = random.randint(1, total - 1)
-        name = random.choice(names)
-        item = random.choice(items)
+        total = rng.randint(10 + level, 20 + level * 2)
+        taken = rng.randint(1, total - 1)
+        name = rng.choice(names)
+        item = rng.choice(items)
         q = f"{name} had {total} {item}. They gave away {taken}. How many are left?"
         ans = total - taken
     elif op == "multiplication":
-        count = random.randint(2, 4 + level)
-        times = random.randint(2, 3 + level)
-        name = random.choice(names)
-        item = random.choice(items)
+        count = rng.randint(2, 4 + level)
+        times = rng.randint(2, 3 + level)
+        name = rng.choice(names)
+        item = rng.choice(items)
         q = f"{name} has {count} boxes of {item}, each with {times} items. How many in total?"
         ans = count * times
     elif op == "division":
-        result = random.randint(2 + level, 10 + level)
-        divisor = random.randint(1 + level, 5 + level)
+        result = rng.randint(2 + level, 10 + level)
+        divisor = rng.randint(1 + level, 5 + level)
         dividend = result * divisor
-        name = random.choice(names)
-        item = random.choice(items)
+        name = rng.choice(names)
+        item = rng.choice(items)
         q = f"{name} has {dividend} {item}, shared equally among {divisor} friends. How many each?"
         ans = result
     return q, str(ans)
@@ -44,22 +48,25 @@ def get_word_problems(
     user_name: str = "guest",
     operation: str = "addition",
     difficulty: int = 1,
-    count: int = 10
+    count: int = 10,
+    seed: Optional[int] = None
 ):
-    session = SessionLocal()
+    rng = make_rng(seed)
+    created_at = datetime.utcnow()
     result = []
     for _ in range(count):
-        op = random.choice(["addition", "subtraction", "multiplication", "division"]) if operation == "mixed" else operation
-        question, answer = generate_problem(op, difficulty)
-        db_problem = GeneratedProblem(
+        op = rng.choice(["addition", "subtraction", "multiplication", "division"]) if operation == "mixed" else operation
+        question, answer = generate_problem(op, difficulty, rng)
+        # history only; written in the next batched flush rather than on this GET
+        write_buffer.add(
+            GeneratedProblem,
             user_name=user_name,
             question=question,
             answer=answer,
             operation=op,
-            level=difficulty
+            level=difficulty,
+            attempted=False,
+            created_at=created_at,
         )
-        session.add(db_problem)
         result.append({"question": question, "answer": answer})
-    session.commit()
-    session.close()
     return {"problems": result}
@@ -0,0 +1,82 @@
+"""
+Answer keys for issued question papers.
+
+Each paper served by /fmc/questions is registered under a token. Its answer key
+(already normalised) is stored in QuizSession.question_data, with a NULL user
+for anonymous papers, and read through a TTL-bounded in-process cache — so
+grading is a key lookup plus one array comparison, even after a restart or on
+another worker.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from uuid import uuid4
+
+import numpy as np
+
+ANSWER_KEY_TTL_SECONDS = int(os.getenv("ANSWER_KEY_TTL_SECONDS", "7200"))
+ANSWER_KEY_MAX_ENTRIES = int(os.getenv("ANSWER_KEY_MAX_ENTRIES", "20000"))
+
+
+def normalise_answer(answer: str) -> str:
+    return str(answer).strip().lower()
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    level: int
+    answers: np.ndarray      # normalised answers, in question order
+    user_id: Optional[int] = None
+
+    def grade(self, submitted: list[str]) -> np.ndarray:
+        """Boolean array, one entry per question; unanswered questions are wrong."""
+        given = np.full(len(self.answers), "", dtype=object)
+        n = min(len(submitted), len(self.answers))
+        given[:n] = [normalise_answer(a) for a in submitted[:n]]
+        return given == self.answers
+
+    def to_json(self) -> dict:
+        return {"level": self.level, "answers": self.answers.tolist()}
+
+    @classmethod
+    def from_answers(cls, level: int, answers: list[str], user_id: Optional[int] = None) -> "AnswerKey":
+        return cls(level, np.array([normalise_answer(a) for a in answers], dtype=object), user_id)
+
+
+class AnswerKeyCache:
+    def __init__(self, ttl_seconds: int = ANSWER_KEY_TTL_SECONDS, max_entries: int = ANSWER_KEY_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, AnswerKey]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_token() -> str:
+        return uuid4().hex
+
+    def put(self, token: str, key: AnswerKey) -> None:
+        with self._lock:
+            self._entries[token] = (time.monotonic() + self.ttl_seconds, key)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, token: str) -> Optional[AnswerKey]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, key = entry
+            if expires_at < time.monotonic():
+                del self._entries[token]
+                return None
+            return key
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+answer_key_cache = AnswerKeyCache()
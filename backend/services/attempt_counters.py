@@ -0,0 +1,56 @@
+"""
+Per-(user, operation, level) numbering for attempts and score sets.
+
+LevelAttempt.attempt_number and UserScore.set_number used to be COUNT(*) + 1
+over the user's rows. That scans on every write, and two concurrent
+submissions could both get the same number. attempt_counters now stores the
+last number handed out per (series, user, operation, level). Taking the next
+one is a single-row UPDATE ... SET last_number = last_number + 1 in the
+caller's transaction. The row lock makes concurrent writers queue, and a
+rollback returns the number. The unique constraints on the numbered tables
+are a final check.
+
+A counter row is created the first time its key is used, starting from the
+highest number already in the numbered table, so existing histories carry on
+without a backfill.
+"""
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from model import AttemptCounter, LevelAttempt, UserScore
+
+
+def _next_number(db: Session, numbered, user_id: int, operation: str, level: int) -> int:
+    series = numbered.class_.__tablename__
+    key = (AttemptCounter.series == series, AttemptCounter.user_id == user_id,
+           AttemptCounter.operation == operation, AttemptCounter.level == level)
+    bump = update(AttemptCounter).where(*key).values(last_number=AttemptCounter.last_number + 1)
+    if not db.execute(bump).rowcount:
+        highest = db.scalar(
+            select(func.coalesce(func.max(numbered), 0))
+            .where(numbered.class_.user_id == user_id, numbered.class_.operation == operation,
+                   numbered.class_.level == level)
+        )
+        try:
+            with db.begin_nested():
+                db.execute(insert(AttemptCounter).values(
+                    series=series, user_id=user_id, operation=operation, level=level, last_number=highest + 1))
+            return highest + 1
+        except IntegrityError:
+            # a concurrent submission created the counter first
+            db.execute(bump)
+    return db.scalar(select(AttemptCounter.last_number).where(*key))
+
+
+def next_attempt_number(db: Session, user_id: int, operation: str, level: int) -> int:
+    """Reserve the next LevelAttempt.attempt_number; the caller commits it with the attempt.
+
+    Async routes call this through `await db.run_sync(next_attempt_number, ...)`.
+    """
+    return _next_number(db, LevelAttempt.attempt_number, user_id, operation, level)
+
+
+def next_set_number(db: Session, user_id: int, operation: str, level: int) -> int:
+    """Reserve the next UserScore.set_number; the caller commits it with the score."""
+    return _next_number(db, UserScore.set_number, user_id, operation, level)
@@ -0,0 +1,31 @@
+"""
+Recording a level attempt.
+
+Every route that saves a LevelAttempt goes through `record_level_attempt`.
+It stages the attempt together with everything derived from it, in the
+caller's transaction:
+
+  - the user's star totals, stars and title (services/ninja_stars.py);
+  - their points on the leaderboards (services/leaderboards.py);
+  - invalidating their cached progress summary (services/progress.py).
+
+Attempt numbers come from services/attempt_counters.py before the attempt is
+built.
+"""
+from sqlalchemy.orm import Session
+
+from model import LevelAttempt
+from services import ninja_stars
+from services.leaderboards import leaderboards
+from services.progress import invalidate_progress
+
+
+def record_level_attempt(db: Session, attempt: LevelAttempt) -> None:
+    """Stage `attempt` and everything derived from it; the caller commits.
+
+    Async routes call this through `await db.run_sync(record_level_attempt, attempt)`.
+    """
+    db.add(attempt)
+    ninja_stars.add_attempt(db, attempt)
+    leaderboards.record(db, attempt.user_id, attempt.user_name, attempt.operation, attempt.level, attempt.score)
+    invalidate_progress(db, attempt.user_id)
@@ -0,0 +1,31 @@
+"""
+Retiring old generator versions.
+
+Custom papers, mock tests and FMC paper sets store (generator_version, seed,
+params) and their questions. While a row's version is current its questions
+are rebuilt from the seed; once GENERATOR_VERSION moves on, the stored
+questions are all that can serve it. Retiring a version drops those stored
+questions, after which its papers answer 410 Gone. Only versions older than
+the current one can be retired.
+"""
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from generators.seeding import GENERATOR_VERSION
+from model import CustomPaper, FMCPaperSet, MockTest
+
+SNAPSHOT_MODELS = (CustomPaper, MockTest, FMCPaperSet)
+
+
+def retire_generator_version(db: Session, version: int) -> int:
+    """Drop the stored questions of every row built by `version`. Returns how many rows were cleared."""
+    if version >= GENERATOR_VERSION:
+        raise ValueError(f"generator version {version} is not older than the current version {GENERATOR_VERSION}")
+    cleared = 0
+    for model in SNAPSHOT_MODELS:
+        result = db.execute(update(model)
+                            .where(model.generator_version == version, model.questions_json.isnot(None))
+                            .values(questions_json=None))
+        cleared += result.rowcount
+    db.commit()
+    return cleared
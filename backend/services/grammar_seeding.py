@@ -0,0 +1,107 @@
+"""
+Seeding the fixed grammar papers.
+
+Paper n is always generate_exam(..., make_rng(n)), so seeding is a pure
+function of the paper number and can run anywhere: from the CLI
+(`python manage.py seed-grammar`) or as a background task behind
+/grammar/papers/seed. A run:
+
+  1. reads which of the requested numbers already exist, in one query;
+  2. builds the missing papers in a spawn process pool (serially for a
+     handful, where starting processes costs more than it saves);
+  3. inserts them with one executemany per batch, committing per batch so
+     a long run makes progress visible and a crash keeps what it finished;
+  4. hands the new paper numbers to an optional `prerender` callback, which
+     the router uses to warm the PDF render cache.
+
+Two seeders racing for the same numbers is harmless: a batch that hits the
+unique constraint re-checks what is still missing and inserts only that.
+"""
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from generators.mcq_generator import generate_exam
+from generators.seeding import make_rng
+from model import GrammarPaper
+
+logger = logging.getLogger(__name__)
+
+QUESTIONS_PER_PAPER = 50
+GRAMMAR_SEED_WORKERS = int(os.getenv("GRAMMAR_SEED_WORKERS", str(os.cpu_count() or 1)))
+GRAMMAR_SEED_BATCH = int(os.getenv("GRAMMAR_SEED_BATCH", "50"))
+
+
+def paper_title(n: int) -> str:
+    return f"Grammar School Paper {n}"
+
+
+def build_paper(n: int) -> dict:
+    """Row for paper `n`. Runs in the worker processes, so it must stay top-level."""
+    return {
+        'paper_number': n,
+        'title': paper_title(n),
+        'difficulty': 'mixed',
+        'questions_json': generate_exam(QUESTIONS_PER_PAPER, 'mixed', make_rng(n)),
+    }
+
+
+def missing_paper_numbers(db: Session, numbers: Iterable[int]) -> list[int]:
+    numbers = sorted(set(numbers))
+    if not numbers:
+        return []
+    existing = set(db.scalars(
+        select(GrammarPaper.paper_number).where(GrammarPaper.paper_number.between(numbers[0], numbers[-1]))
+    ))
+    return [n for n in numbers if n not in existing]
+
+
+def build_papers(numbers: list[int], workers: int = GRAMMAR_SEED_WORKERS) -> Iterator[dict]:
+    """Rows for `numbers`, in order."""
+    if workers <= 1 or len(numbers) < 2 * workers:
+        yield from map(build_paper, numbers)
+        return
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        yield from executor.map(build_paper, numbers, chunksize=max(1, len(numbers) // (workers * 4)))
+
+
+def _insert_batch(db: Session, rows: list[dict]) -> list[int]:
+    try:
+        db.execute(insert(GrammarPaper), rows)
+        db.commit()
+    except IntegrityError:
+        # another seeder got there first; keep whichever rows are still missing
+        db.rollback()
+        still_missing = set(missing_paper_numbers(db, (row['paper_number'] for row in rows)))
+        rows = [row for row in rows if row['paper_number'] in still_missing]
+        if rows:
+            db.execute(insert(GrammarPaper), rows)
+            db.commit()
+    return [row['paper_number'] for row in rows]
+
+
+def seed_grammar_papers(db: Session, numbers: Iterable[int], workers: int = GRAMMAR_SEED_WORKERS,
+                        batch_size: int = GRAMMAR_SEED_BATCH,
+                        prerender: Optional[Callable[[list[int]], None]] = None) -> list[int]:
+    """Create whichever of `numbers` do not exist yet. Returns the paper numbers created."""
+    numbers = set(numbers)
+    missing = missing_paper_numbers(db, numbers)
+    created: list[int] = []
+    batch: list[dict] = []
+    for row in build_papers(missing, workers):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            created += _insert_batch(db, batch)
+            batch = []
+    if batch:
+        created += _insert_batch(db, batch)
+    logger.info(f"[grammar-seed] created {len(created)} paper(s), {len(numbers) - len(missing)} already existed")
+    if prerender is not None and created:
+        prerender(created)
+    return created
@@ -0,0 +1,256 @@
+"""
+Per-operation, per-level and per-period leaderboards.
+
+Every recorded level attempt adds its score to the user's points on six
+boards: its own level and all levels (-1), each for today, this ISO week and
+all time. The points live in leaderboard_entries and are bumped in the
+attempt's own transaction. That table is exact, shared by every worker, and
+is the snapshot a restarted worker loads from.
+
+Reads are served from an in-memory copy of each board: a SortedList of
+(-points, user_id). Top-N is O(log n + N) and a user's rank is one bisect,
+O(log n). A worker applies its own attempts to its copies once their
+transaction commits. It reloads a board from the table when the copy is
+older than LEADERBOARD_REFRESH_SECONDS, which picks up other workers' writes.
+Equal points share a rank (1, 2, 2, 4).
+
+A board loaded while an attempt was committing may or may not already hold
+that attempt's points. Each board remembers when its load query ran, and
+each commit when it started and finished. A load that ended before the
+commit started gets the points added. A load that began after the commit
+finished already has them and is left alone. A load that overlapped the
+commit is dropped and reloaded on the next read.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional
+
+from sortedcontainers import SortedList
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from model import LeaderboardEntry, LevelAttempt
+
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", "30"))
+LEADERBOARD_MAX_BOARDS = int(os.getenv("LEADERBOARD_MAX_BOARDS", "256"))
+
+ALL_LEVELS = -1
+PERIODS = ("daily", "weekly", "all-time")
+ALL_TIME_START = date(1970, 1, 1)
+
+BoardKey = tuple[str, int, str, date]     # (operation, level, period, period_start)
+
+
+def period_start(period: str, day: date) -> date:
+    if period == "daily":
+        return day
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    if period == "all-time":
+        return ALL_TIME_START
+    raise ValueError(f"unknown period {period!r}")
+
+
+def board_keys(operation: str, level: int, day: date) -> list[BoardKey]:
+    """Every board an attempt on `day` counts towards."""
+    return [(operation, board_level, period, period_start(period, day))
+            for board_level in (level, ALL_LEVELS) for period in PERIODS]
+
+
+class Board:
+    def __init__(self, rows: Iterable[tuple[int, str, int]] = (), loaded_at: Optional[float] = None):
+        self.points: dict[int, int] = {}
+        self.names: dict[int, str] = {}
+        self.ranking = SortedList()
+        # monotonic time before the load query was sent, and after its rows were read
+        self.loaded_at = time.monotonic() if loaded_at is None else loaded_at
+        for user_id, user_name, points in rows:
+            self.add(user_id, user_name, points)
+        self.loaded_until = time.monotonic()
+
+    def __len__(self):
+        return len(self.points)
+
+    def add(self, user_id: int, user_name: str, points: int) -> None:
+        old = self.points.get(user_id)
+        if old is not None:
+            self.ranking.remove((-old, user_id))
+        new = (old or 0) + points
+        self.points[user_id] = new
+        self.names[user_id] = user_name
+        self.ranking.add((-new, user_id))
+
+    def rank(self, user_id: int) -> Optional[int]:
+        points = self.points.get(user_id)
+        if points is None:
+            return None
+        return self.ranking.bisect_left((-points,)) + 1
+
+    def top(self, limit: int) -> list[dict]:
+        return [
+            {"rank": self.ranking.bisect_left((negated,)) + 1, "user_id": user_id,
+             "name": self.names[user_id], "points": -negated}
+            for negated, user_id in self.ranking.islice(0, limit)
+        ]
+
+
+class Leaderboards:
+    def __init__(self, refresh_seconds: float = LEADERBOARD_REFRESH_SECONDS,
+                 max_boards: int = LEADERBOARD_MAX_BOARDS):
+        self.refresh_seconds = refresh_seconds
+        self.max_boards = max_boards
+        self._boards: OrderedDict[BoardKey, Board] = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def record(self, db: Session, user_id: int, user_name: str, operation: str, level: int, points: int,
+               when: Optional[datetime] = None) -> None:
+        """Stage `points` on every board the attempt counts towards; the caller commits."""
+        keys = board_keys(operation, level, (when or datetime.utcnow()).date())
+        for key in keys:
+            self._bump(db, key, user_id, user_name, points)
+        db.info.setdefault(_PENDING, []).extend((self, key, user_id, user_name, points) for key in keys)
+
+    @staticmethod
+    def _bump(db: Session, key: BoardKey, user_id: int, user_name: str, points: int) -> None:
+        operation, level, period, start = key
+        bump = (
+            update(LeaderboardEntry)
+            .where(LeaderboardEntry.operation == operation, LeaderboardEntry.level == level,
+                   LeaderboardEntry.period == period, LeaderboardEntry.period_start == start,
+                   LeaderboardEntry.user_id == user_id)
+            .values(points=LeaderboardEntry.points + points, attempts=LeaderboardEntry.attempts + 1,
+                    user_name=user_name)
+        )
+        if db.execute(bump).rowcount:
+            return
+        try:
+            with db.begin_nested():
+                db.execute(insert(LeaderboardEntry).values(
+                    operation=operation, level=level, period=period, period_start=start,
+                    user_id=user_id, user_name=user_name, points=points, attempts=1))
+        except IntegrityError:
+            # a concurrent attempt by the same user created the row first
+            db.execute(bump)
+
+    def _apply(self, key: BoardKey, user_id: int, user_name: str, points: int,
+               commit_started: float, commit_finished: float) -> None:
+        with self._lock:
+            board = self._boards.get(key)
+            if board is None or board.loaded_at > commit_finished:
+                return   # not loaded, or loaded after the commit and so already counted
+            if board.loaded_until < commit_started:
+                board.add(user_id, user_name, points)
+            else:
+                del self._boards[key]   # the load overlapped the commit; reload on the next read
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def board(self, db: Session, operation: str, level: int = ALL_LEVELS, period: str = "all-time",
+              day: Optional[date] = None) -> Board:
+        key = (operation, level, period, period_start(period, day or datetime.utcnow().date()))
+        with self._lock:
+            board = self._boards.get(key)
+            if board is not None and time.monotonic() - board.loaded_at < self.refresh_seconds:
+                self._boards.move_to_end(key)
+                return board
+        loaded_at = time.monotonic()
+        rows = db.execute(
+            select(LeaderboardEntry.user_id, LeaderboardEntry.user_name, LeaderboardEntry.points)
+            .where(LeaderboardEntry.operation == key[0], LeaderboardEntry.level == key[1],
+                   LeaderboardEntry.period == key[2], LeaderboardEntry.period_start == key[3])
+        )
+        board = Board(rows, loaded_at)
+        with self._lock:
+            self._boards[key] = board
+            self._boards.move_to_end(key)
+            while len(self._boards) > self.max_boards:
+                self._boards.popitem(last=False)
+        return board
+
+    def top(self, db: Session, operation: str, level: int = ALL_LEVELS, period: str = "all-time",
+            limit: int = 10) -> list[dict]:
+        board = self.board(db, operation, level, period)
+        with self._lock:
+            return board.top(limit)
+
+    def rank(self, db: Session, user_id: int, operation: str, level: int = ALL_LEVELS,
+             period: str = "all-time") -> dict:
+        board = self.board(db, operation, level, period)
+        with self._lock:
+            return {"rank": board.rank(user_id), "points": board.points.get(user_id, 0), "players": len(board)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._boards.clear()
+
+
+leaderboards = Leaderboards()
+
+
+# ---------------------------------------------------------------------------
+# Applying staged points once their transaction commits
+# ---------------------------------------------------------------------------
+_PENDING = "leaderboard_pending"
+_COMMIT_STARTED = "leaderboard_commit_started"
+
+
+@event.listens_for(Session, "before_commit")
+def _note_commit_start(session: Session) -> None:
+    if _PENDING in session.info:
+        session.info[_COMMIT_STARTED] = time.monotonic()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    if session.in_nested_transaction():
+        return  # a savepoint; the outer transaction may still roll back
+    commit_finished = time.monotonic()
+    commit_started = session.info.pop(_COMMIT_STARTED, 0.0)
+    for owner, key, user_id, user_name, points in session.info.pop(_PENDING, ()):
+        owner._apply(key, user_id, user_name, points, commit_started, commit_finished)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_rolled_back(session: Session) -> None:
+    if not session.in_nested_transaction():
+        session.info.pop(_PENDING, None)
+        session.info.pop(_COMMIT_STARTED, None)
+
+
+# ---------------------------------------------------------------------------
+# Rebuild
+# ---------------------------------------------------------------------------
+def rebuild_leaderboards(db: Session, batch_size: int = 1000) -> int:
+    """Recompute leaderboard_entries from level_attempts. Returns the rows written. Commits."""
+    totals: dict[tuple, list] = {}
+    per_day = db.execute(
+        select(LevelAttempt.user_id, func.max(LevelAttempt.user_name), LevelAttempt.operation,
+               LevelAttempt.level, func.date(LevelAttempt.timestamp), func.sum(LevelAttempt.score), func.count())
+        .group_by(LevelAttempt.user_id, LevelAttempt.operation, LevelAttempt.level, func.date(LevelAttempt.timestamp))
+    )
+    for user_id, user_name, operation, level, day, points, attempts in per_day:
+        day = date.fromisoformat(day) if isinstance(day, str) else day
+        for key in board_keys(operation, level, day or ALL_TIME_START):
+            entry = totals.setdefault((*key, user_id), [user_name, 0, 0])
+            entry[1] += points
+            entry[2] += attempts
+
+    db.execute(delete(LeaderboardEntry))
+    rows = [
+        {"operation": operation, "level": level, "period": period, "period_start": start, "user_id": user_id,
+         "user_name": user_name, "points": points, "attempts": attempts}
+        for (operation, level, period, start, user_id), (user_name, points, attempts) in totals.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(LeaderboardEntry), rows[start:start + batch_size])
+    db.commit()
+    leaderboards.clear()
+    return len(rows)
@@ -0,0 +1,116 @@
+"""
+Ninja stars and titles from running per-level totals.
+
+A user's stars are the weighted average performance (score / total) over
+their passed level attempts, with level n weighted (n + 1) / 10 for levels
+0-9 and other levels not counting, scaled to 0-5. Instead of rescanning every
+attempt after each save, user_level_stars keeps, per (user, level), how many
+attempts passed and the sum of their performances:
+
+    weighted score = sum(weight(level) * performance_sum)
+    total weight   = sum(weight(level) * passed_attempts)
+
+`add_attempt` bumps the attempt's level row and rewrites the user's stars
+and title in the caller's transaction (services/attempts.py), so the attempt
+and the totals commit or roll back together. That reads at most one row per
+level, however long the history. Weights are applied on read, so changing
+LEVEL_WEIGHTS needs no backfill; `backfill_level_stars` (run by
+`python manage.py backfill-stars`) rebuilds the totals from level_attempts
+for data written before this table existed.
+"""
+from typing import Iterable
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from model import LevelAttempt, User, UserLevelStars
+
+LEVEL_WEIGHTS = {i: (i + 1) * 0.1 for i in range(10)}  # 0.1 to 1.0
+
+TITLES = (
+    (5, "Math Ninja 🥇"),
+    (3, "Confident Solver 🥈"),
+    (1, "Basic Learner 🥉"),
+    (0, "Getting Started"),
+)
+
+
+def stars_and_title(totals: Iterable[tuple[int, int, float]]) -> tuple[int, str]:
+    """(stars, title) from (level, passed_attempts, performance_sum) rows."""
+    total_weight = 0.0
+    weighted_score = 0.0
+    for level, passed_attempts, performance_sum in totals:
+        weight = LEVEL_WEIGHTS.get(level, 0)
+        total_weight += weight * passed_attempts
+        weighted_score += weight * performance_sum
+    average_score = weighted_score / total_weight if total_weight else 0
+    stars = round(average_score * 5)
+    title = next(title for threshold, title in TITLES if stars >= threshold)
+    return stars, title
+
+
+def _add_passed(db: Session, user_id: int, level: int, performance: float) -> None:
+    bump = (
+        update(UserLevelStars)
+        .where(UserLevelStars.user_id == user_id, UserLevelStars.level == level)
+        .values(passed_attempts=UserLevelStars.passed_attempts + 1,
+                performance_sum=UserLevelStars.performance_sum + performance)
+    )
+    if db.execute(bump).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(UserLevelStars).values(
+                user_id=user_id, level=level, passed_attempts=1, performance_sum=performance))
+    except IntegrityError:
+        # a concurrent save created the row between our UPDATE and INSERT
+        db.execute(bump)
+
+
+def refresh_stars(db: Session, user_id: int) -> tuple[int, str]:
+    totals = db.execute(
+        select(UserLevelStars.level, UserLevelStars.passed_attempts, UserLevelStars.performance_sum)
+        .where(UserLevelStars.user_id == user_id)
+    ).all()
+    stars, title = stars_and_title(totals)
+    db.execute(update(User).where(User.id == user_id).values(ninja_stars=stars, awarded_title=title))
+    return stars, title
+
+
+def add_attempt(db: Session, attempt: LevelAttempt) -> None:
+    """Fold `attempt` into its user's star totals and rewrite their stars and title."""
+    if attempt.is_passed and attempt.total_questions:
+        _add_passed(db, attempt.user_id, attempt.level, attempt.score / attempt.total_questions)
+    refresh_stars(db, attempt.user_id)
+
+
+# ---------------------------------------------------------------------------
+# Backfill
+# ---------------------------------------------------------------------------
+def backfill_level_stars(db: Session, batch_size: int = 1000) -> int:
+    """Rebuild user_level_stars from level_attempts and rewrite every attempting user's
+    stars and title. Returns how many users were updated. Commits."""
+    db.execute(delete(UserLevelStars))
+    db.execute(insert(UserLevelStars).from_select(
+        ["user_id", "level", "passed_attempts", "performance_sum"],
+        select(LevelAttempt.user_id, LevelAttempt.level, func.count(),
+               func.sum(LevelAttempt.score * 1.0 / LevelAttempt.total_questions))
+        .where(LevelAttempt.is_passed.is_(True), LevelAttempt.total_questions > 0)
+        .group_by(LevelAttempt.user_id, LevelAttempt.level)
+    ))
+
+    totals: dict[int, list] = {user_id: [] for user_id in db.scalars(select(LevelAttempt.user_id).distinct())}
+    for user_id, level, passed_attempts, performance_sum in db.execute(select(
+            UserLevelStars.user_id, UserLevelStars.level,
+            UserLevelStars.passed_attempts, UserLevelStars.performance_sum)):
+        totals[user_id].append((level, passed_attempts, performance_sum))
+
+    rows = []
+    for user_id, user_totals in totals.items():
+        stars, title = stars_and_title(user_totals)
+        rows.append({"id": user_id, "ninja_stars": stars, "awarded_title": title})
+    for start in range(0, len(rows), batch_size):
+        db.execute(update(User), rows[start:start + batch_size])
+    db.commit()
+    return len(rows)
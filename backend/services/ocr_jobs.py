@@ -0,0 +1,275 @@
+"""
+Background OCR jobs for uploaded answer sheets.
+
+An upload is saved to disk, recorded as an OCRJob and answered immediately
+with the job id. A coordinator thread then OCRs the pages in parallel on a
+process pool. Each page's answers are written to the job row as soon as that
+page finishes, so clients can poll or stream partial results, and a restart
+resumes unfinished jobs from the last completed page.
+
+Every app worker process runs `resume_pending` at start-up, so a job is
+claimed before it is resumed: one conditional UPDATE moves `owner` from the
+value the worker read to its own id, and only the worker whose UPDATE
+matched runs the job. A job is up for grabs when it has no owner (released at
+shutdown before it started, or created before owners existed) or when its
+row has not changed for OCR_JOB_TIMEOUT_SECONDS. By then a live owner would
+have finished or failed it, so the owner must have died.
+
+Once every page is read, the finaliser registered for the job's kind (e.g.
+grading a grammar paper) turns the extracted answers into the job result.
+"""
+import logging
+import multiprocessing
+import os
+import shutil
+import socket
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+from uuid import uuid4
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+from model import OCRJob
+
+logger = logging.getLogger(__name__)
+
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(min(4, os.cpu_count() or 1))))
+OCR_MAX_ACTIVE_JOBS = int(os.getenv("OCR_MAX_ACTIVE_JOBS", "4"))
+OCR_JOB_TIMEOUT_SECONDS = float(os.getenv("OCR_JOB_TIMEOUT_SECONDS", "600"))
+OCR_JOBS_DIR = os.getenv("OCR_JOBS_DIR", os.path.join("uploaded_papers", "jobs"))
+
+UNFINISHED = ("queued", "running")
+
+# kind -> (finaliser(db, job, answers) -> result dict, page reader or None for OCR, keep the upload?)
+_finalisers: dict[str, tuple[Callable[[Session, OCRJob, list], dict], Optional[Callable], bool]] = {}
+
+
+def register_finaliser(kind: str, finaliser: Callable[[Session, OCRJob, list], dict],
+                       page_reader: Optional[Callable[[str, int], list]] = None,
+                       keep_input: bool = False) -> None:
+    """`page_reader(path, page_index)` must be module-level so worker processes can unpickle it."""
+    _finalisers[kind] = (finaliser, page_reader, keep_input)
+
+
+def merge_page_answers(page_results: list) -> list:
+    """Page results arrive in completion order; answers are reported in page order."""
+    answers = []
+    for page in sorted(page_results, key=lambda p: p["page"]):
+        answers.extend(page["answers"])
+    return answers
+
+
+def job_snapshot(job: OCRJob) -> dict:
+    return {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,
+        "pages_total": job.pages_total,
+        "pages_done": job.pages_done,
+        "pages": sorted(job.page_results_json or [], key=lambda p: p["page"]),
+        "result": job.result_json,
+        "error": job.error,
+    }
+
+
+def _default_page_counter(path: str) -> int:
+    from utils.pdf_parser import count_pages
+    return count_pages(path)
+
+
+def _default_page_reader():
+    from utils.pdf_parser import ocr_page
+    return ocr_page
+
+
+class OCRJobRunner:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        page_reader: Optional[Callable[[str, int], list]] = None,
+        page_counter: Callable[[str], int] = _default_page_counter,
+        page_executor: Optional[Executor] = None,
+        max_active_jobs: int = OCR_MAX_ACTIVE_JOBS,
+    ):
+        self.session_factory = session_factory
+        self.page_reader = page_reader
+        self.page_counter = page_counter
+        self.max_active_jobs = max_active_jobs
+        self._page_executor = page_executor
+        self.owner_id = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._coordinators: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _coordinator_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._coordinators is None:
+                self._coordinators = ThreadPoolExecutor(self.max_active_jobs, thread_name_prefix="ocr-job")
+            return self._coordinators
+
+    def _page_pool(self) -> Executor:
+        with self._lock:
+            if self._page_executor is None:
+                self._page_executor = ProcessPoolExecutor(
+                    max_workers=OCR_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+            return self._page_executor
+
+    # -----------------------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------------------
+    def create_job(self, db: Session, kind: str, file_path: str, params: dict,
+                   pages_total: Optional[int] = None) -> OCRJob:
+        """`pages_total`, when the caller already knows it, saves the coordinator reopening the file."""
+        if kind not in _finalisers:
+            raise ValueError(f"No OCR finaliser registered for {kind!r}")
+        job = OCRJob(job_id=uuid4().hex, kind=kind, status="queued", owner=self.owner_id, file_path=file_path,
+                     params_json=params, pages_total=pages_total, page_results_json=[])
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        self.submit(job.job_id)
+        return job
+
+    def submit(self, job_id: str):
+        return self._coordinator_pool().submit(self.run_job, job_id)
+
+    def resume_pending(self) -> int:
+        """Claim and re-queue jobs a previous process left unfinished."""
+        stale_before = datetime.utcnow() - timedelta(seconds=OCR_JOB_TIMEOUT_SECONDS)
+        with self.session_factory() as db:
+            candidates = db.execute(
+                select(OCRJob.job_id, OCRJob.owner)
+                .where(OCRJob.status.in_(UNFINISHED),
+                       or_(OCRJob.owner.is_(None), OCRJob.updated_at.is_(None), OCRJob.updated_at < stale_before))
+            ).all()
+            job_ids = [job_id for job_id, owner in candidates if self._claim(db, job_id, owner)]
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info(f"[ocr] resuming {len(job_ids)} unfinished job(s)")
+        return len(job_ids)
+
+    def _claim(self, db: Session, job_id: str, seen_owner: Optional[str]) -> bool:
+        """Take the job from `seen_owner`; False if another worker claimed it first."""
+        claimed = db.execute(
+            update(OCRJob)
+            .where(OCRJob.job_id == job_id, OCRJob.status.in_(UNFINISHED),
+                   OCRJob.owner.is_(None) if seen_owner is None else OCRJob.owner == seen_owner)
+            .values(owner=self.owner_id, status="queued")   # "running" once its coordinator starts
+        ).rowcount == 1
+        db.commit()
+        return claimed
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self.session_factory() as db:
+            job = db.query(OCRJob).filter_by(job_id=job_id).first()
+            return job_snapshot(job) if job else None
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            coordinators, self._coordinators = self._coordinators, None
+        if coordinators:
+            coordinators.shutdown(wait=wait, cancel_futures=True)
+        self._release_queued()
+        # pages last: running coordinators still submit to the page pool
+        with self._lock:
+            pages, self._page_executor = self._page_executor, None
+        if pages:
+            pages.shutdown(wait=wait, cancel_futures=True)
+
+    def _release_queued(self) -> None:
+        """Hand back jobs this process accepted but never started, so the next worker to start resumes them."""
+        try:
+            with self.session_factory() as db:
+                db.execute(update(OCRJob).where(OCRJob.owner == self.owner_id, OCRJob.status == "queued")
+                           .values(owner=None))
+                db.commit()
+        except Exception as e:
+            logger.error(f"[ocr] could not release queued jobs: {e}", exc_info=True)
+
+    # -----------------------------------------------------------------------
+    # Job execution (coordinator thread)
+    # -----------------------------------------------------------------------
+    def run_job(self, job_id: str) -> None:
+        with self.session_factory() as db:
+            job = db.query(OCRJob).filter_by(job_id=job_id).first()
+            if job is None or job.status not in UNFINISHED or job.owner != self.owner_id:
+                return   # finished, or claimed by another worker
+            try:
+                self._read_pages(db, job)
+                finaliser, _, keep_input = _finalisers[job.kind]
+                job.result_json = finaliser(db, job, merge_page_answers(job.page_results_json))
+                job.status = "done"
+                db.commit()
+                if not keep_input and os.path.exists(job.file_path):
+                    os.unlink(job.file_path)
+            except Exception as e:
+                logger.error(f"[ocr] job {job_id} failed: {e}", exc_info=True)
+                db.rollback()
+                job.status = "failed"
+                job.error = str(e) or type(e).__name__
+                db.commit()
+
+    def _read_pages(self, db: Session, job: OCRJob) -> None:
+        if not job.pages_total:
+            job.pages_total = self.page_counter(job.file_path)
+        job.status = "running"
+        db.commit()
+
+        done = {p["page"] for p in job.page_results_json}
+        todo = [i for i in range(job.pages_total) if i not in done]
+        pages = self._page_pool()
+        reader = self.page_reader or _finalisers[job.kind][1] or _default_page_reader()
+        futures = {pages.submit(reader, job.file_path, i): i for i in todo}
+        try:
+            for future in as_completed(futures, timeout=OCR_JOB_TIMEOUT_SECONDS):
+                page = futures[future]
+                # assign a new list so the JSON column is flagged dirty
+                job.page_results_json = job.page_results_json + [{"page": page, "answers": future.result()}]
+                job.pages_done = len(job.page_results_json)
+                db.commit()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+# ---------------------------------------------------------------------------
+# Uploads (blocking file I/O: call through run_in_threadpool from async routes)
+# ---------------------------------------------------------------------------
+def store_upload(source, filename: Optional[str], default_suffix: str = ".pdf") -> str:
+    """
+    Write an upload (bytes, memoryview or file-like) into the jobs directory
+    under a unique name, keeping its extension. The job outlives the request
+    and page workers are separate processes, so it needs a file of its own.
+    """
+    os.makedirs(OCR_JOBS_DIR, exist_ok=True)
+    suffix = os.path.splitext(filename or "")[1] or default_suffix
+    path = os.path.join(OCR_JOBS_DIR, f"{uuid4().hex}{suffix}")
+    with open(path, "wb") as out:
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            out.write(source)
+        else:
+            source.seek(0)
+            shutil.copyfileobj(source, out)
+    return path
+
+
+def stage_upload(source, filename: Optional[str], default_suffix: str = ".pdf") -> tuple[str, int]:
+    """
+    Read an upload once: count its pages from memory, then persist it for the
+    job. Returns (path, pages_total). Raises ValueError for a file that is
+    neither a PDF nor an image, before anything is written.
+    """
+    from utils.pdf_parser import count_pages, read_source
+    data = read_source(source)
+    try:
+        pages_total = count_pages(data)
+    except RuntimeError as e:   # fitz.FileDataError
+        raise ValueError(f"Could not read the uploaded file: {e}") from e
+    return store_upload(data, filename, default_suffix), pages_total
+
+
+ocr_jobs = OCRJobRunner()
@@ -0,0 +1,90 @@
+"""
+Per-user progress summaries: attempts and best score per (operation, level).
+
+A summary is one GROUP BY over the user's level_attempts, served by the
+(user_id, operation, level, attempt_number) unique index. It is cached as
+JSON in user_progress_cache, so profile and progress pages read a single row
+by primary key.
+
+Recording an attempt bumps that row's `version` in the attempt's own
+transaction (`invalidate_progress`). A summary is fresh while
+`built_version == version`. A stale or missing one is rebuilt on the next
+read and saved only if no attempt landed meanwhile
+(UPDATE ... WHERE version = v), so a slow rebuild never overwrites a newer
+invalidation.
+"""
+from typing import Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from model import LevelAttempt, UserProgressCache
+
+
+def invalidate_progress(db: Session, user_id: int) -> None:
+    """Mark the user's cached summary stale; the caller commits with the attempt."""
+    db.execute(
+        update(UserProgressCache).where(UserProgressCache.user_id == user_id)
+        .values(version=UserProgressCache.version + 1)
+    )
+
+
+def build_summary(db: Session, user_id: int) -> list[dict]:
+    rows = db.execute(
+        select(LevelAttempt.operation, LevelAttempt.level, func.count(), func.max(LevelAttempt.score))
+        .where(LevelAttempt.user_id == user_id)
+        .group_by(LevelAttempt.operation, LevelAttempt.level)
+        .order_by(LevelAttempt.operation, LevelAttempt.level)
+    )
+    return [
+        {"operation": operation, "level": level, "attempts": attempts, "best_score": best_score}
+        for operation, level, attempts, best_score in rows
+    ]
+
+
+def _cached_version(db: Session, user_id: int) -> Optional[int]:
+    """The cache row's version, creating the row (committed, so attempts can invalidate it) if missing."""
+    version = db.scalar(select(UserProgressCache.version).where(UserProgressCache.user_id == user_id))
+    if version is not None:
+        return version
+    try:
+        db.execute(insert(UserProgressCache).values(user_id=user_id, version=0, built_version=-1, summary_json=[]))
+        db.commit()
+    except IntegrityError:
+        # created concurrently, or no such user
+        db.rollback()
+    return db.scalar(select(UserProgressCache.version).where(UserProgressCache.user_id == user_id))
+
+
+def progress_summary(db: Session, user_id: int) -> list[dict]:
+    """The user's summary, from the cache when fresh. Commits when it has to rebuild."""
+    cached = db.execute(
+        select(UserProgressCache.version, UserProgressCache.built_version, UserProgressCache.summary_json)
+        .where(UserProgressCache.user_id == user_id)
+    ).first()
+    if cached is not None and cached.version == cached.built_version:
+        return cached.summary_json
+
+    version = cached.version if cached is not None else _cached_version(db, user_id)
+    summary = build_summary(db, user_id)
+    if version is not None:
+        db.execute(
+            update(UserProgressCache)
+            .where(UserProgressCache.user_id == user_id, UserProgressCache.version == version)
+            .values(built_version=version, summary_json=summary)
+        )
+        db.commit()
+    return summary
+
+
+def by_level(summary: list[dict], operation: Optional[str] = None) -> list[dict]:
+    """Level rows for one operation, or summed over all operations when `operation` is None."""
+    levels: dict[int, dict] = {}
+    for row in summary:
+        if operation and row["operation"] != operation:
+            continue
+        level = levels.setdefault(row["level"], {"level": row["level"], "attempts": 0, "best_score": 0})
+        level["attempts"] += row["attempts"]
+        level["best_score"] = max(level["best_score"], row["best_score"])
+    return list(levels.values())
@@ -0,0 +1,226 @@
+"""
+In-process pools of pre-generated questions.
+
+A pool holds a queue of validated, de-duplicated questions per key (e.g. an
+FMC level). Request handlers pop ready-made items with `take()`; a background
+worker thread tops a key back up to `target_size` whenever it drops below the
+`low_water` mark. If a pool runs dry the missing items are generated
+synchronously, so callers always get an answer.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Hashable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QuestionPool:
+    def __init__(
+        self,
+        name: str,
+        generate: Callable[[Hashable], object],
+        target_size: int = 200,
+        low_water: int = 80,
+        identity: Optional[Callable[[object], Hashable]] = None,
+        validate: Optional[Callable[[object], bool]] = None,
+        max_attempts_factor: int = 25,
+    ):
+        self.name = name
+        self.generate = generate
+        self.target_size = max(1, target_size)
+        self.low_water = min(max(0, low_water), self.target_size)
+        self.identity = identity or (lambda item: item)
+        self.validate = validate or (lambda item: True)
+        self.max_attempts_factor = max_attempts_factor
+
+        self._items: dict[Hashable, deque] = {}
+        self._members: dict[Hashable, set] = {}
+        self._metrics: dict[Hashable, dict] = {}
+        self._pending: set = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    # -----------------------------------------------------------------------
+    # Generation
+    # -----------------------------------------------------------------------
+    def _try_generate(self, key: Hashable):
+        """Generate one item, returning None if it raised or failed validation."""
+        try:
+            item = self.generate(key)
+        except Exception as e:
+            self._metric(key)["errors"] += 1
+            logger.debug(f"[{self.name}] generation failed for {key!r}: {e}")
+            return None
+        if not self.validate(item):
+            self._metric(key)["rejected"] += 1
+            return None
+        return item
+
+    def generate_unique(self, key: Hashable, count: int, seen: Optional[set] = None,
+                        exclude: Optional[Callable[[object], bool]] = None) -> list:
+        """
+        Generate up to `count` items whose identities are not in `seen`.
+        Gives up after count * max_attempts_factor draws so low-entropy keys
+        cannot spin forever.
+        """
+        seen = set() if seen is None else seen
+        items = []
+        attempts = 0
+        max_attempts = max(count, 1) * self.max_attempts_factor
+        while len(items) < count and attempts < max_attempts:
+            attempts += 1
+            item = self._try_generate(key)
+            if item is None:
+                continue
+            ident = self.identity(item)
+            if ident in seen or (exclude is not None and exclude(item)):
+                continue
+            seen.add(ident)
+            items.append(item)
+        if len(items) < count:
+            logger.warning(f"[{self.name}] only {len(items)}/{count} unique items for {key!r} "
+                           f"after {attempts} attempts")
+        return items
+
+    # -----------------------------------------------------------------------
+    # Public API
+    # -----------------------------------------------------------------------
+    def take(self, key: Hashable, count: int,
+             exclude: Optional[Callable[[object], bool]] = None) -> list:
+        """
+        Pop `count` unique items for `key`. Items rejected by `exclude` stay in
+        the pool for other callers. Falls back to synchronous generation for
+        whatever the pool cannot supply.
+        """
+        self._ensure_worker()
+        taken, seen, skipped = [], set(), []
+        with self._lock:
+            queue = self._items.setdefault(key, deque())
+            members = self._members.setdefault(key, set())
+            while queue and len(taken) < count:
+                item = queue.popleft()
+                ident = self.identity(item)
+                members.discard(ident)
+                if ident in seen:
+                    continue
+                if exclude is not None and exclude(item):
+                    skipped.append(item)
+                    continue
+                seen.add(ident)
+                taken.append(item)
+            for item in skipped:
+                queue.append(item)
+                members.add(self.identity(item))
+            depth = len(queue)
+
+        metric = self._metric(key)
+        metric["hits"] += len(taken)
+        if len(taken) < count:
+            fresh = self.generate_unique(key, count - len(taken), seen, exclude)
+            metric["misses"] += len(fresh)
+            taken.extend(fresh)
+
+        if depth < self.low_water:
+            self.request_refill(key)
+        return taken
+
+    def request_refill(self, key: Hashable) -> None:
+        with self._lock:
+            self._pending.add(key)
+        self._wakeup.set()
+
+    def prime(self, keys: Iterable[Hashable]) -> None:
+        """Ask the worker to fill the given keys ahead of the first request."""
+        self._ensure_worker()
+        for key in keys:
+            self.request_refill(key)
+
+    def depth(self, key: Hashable) -> int:
+        with self._lock:
+            return len(self._items.get(key, ()))
+
+    def stats(self) -> dict:
+        with self._lock:
+            depths = {key: len(q) for key, q in self._items.items()}
+        metrics = list(self._metrics.items())
+        return {
+            "pool": self.name,
+            "target_size": self.target_size,
+            "low_water": self.low_water,
+            "worker_running": bool(self._worker and self._worker.is_alive()),
+            "keys": {
+                str(key): {"depth": depths.get(key, 0), **metric}
+                for key, metric in metrics
+            },
+        }
+
+    # -----------------------------------------------------------------------
+    # Background worker
+    # -----------------------------------------------------------------------
+    def _metric(self, key: Hashable) -> dict:
+        metric = self._metrics.get(key)
+        if metric is None:
+            metric = self._metrics.setdefault(key, {
+                "hits": 0, "misses": 0, "refills": 0, "errors": 0, "rejected": 0,
+                "last_refill_seconds": None,
+            })
+        return metric
+
+    def _ensure_worker(self) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker and self._worker.is_alive():
+                return
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name=f"{self.name}-pool", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker:
+            self._worker.join(timeout)
+        self._worker = None
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(timeout=30)
+            self._wakeup.clear()
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            for key in pending:
+                if self._stopping.is_set():
+                    break
+                try:
+                    self._refill(key)
+                except Exception as e:
+                    logger.error(f"[{self.name}] refill failed for {key!r}: {e}", exc_info=True)
+
+    def _refill(self, key: Hashable) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            queue = self._items.setdefault(key, deque())
+            members = self._members.setdefault(key, set())
+            missing = self.target_size - len(queue)
+        attempts = 0
+        max_attempts = max(missing, 1) * self.max_attempts_factor
+        while missing > 0 and attempts < max_attempts and not self._stopping.is_set():
+            attempts += 1
+            item = self._try_generate(key)
+            if item is None:
+                continue
+            ident = self.identity(item)
+            with self._lock:
+                if ident in members:
+                    continue
+                queue.append(item)
+                members.add(ident)
+                missing = self.target_size - len(queue)
+        metric = self._metric(key)
+        metric["refills"] += 1
+        metric["last_refill_seconds"] = round(time.perf_counter() - started, 4)
@@ -0,0 +1,241 @@
+"""
+Content-addressed cache for rendered PDFs.
+
+A paper PDF is a pure function of (template, template version, render context),
+so the sha256 of those is both the cache file name and the HTTP ETag. A hit is
+served straight from disk, and a matching If-None-Match gets a 304 without
+rendering or reading the file at all. Files are evicted least-recently-used
+(by mtime, refreshed on every hit) once the directory exceeds its size cap.
+
+A file is served from a handle opened while its key is pinned against
+eviction, so an eviction triggered by another request can unlink it mid-send
+without breaking the response (the open handle keeps the data readable).
+
+Routes use the async side (`get_or_render`, `serve_cached_pdf`): a miss awaits
+the render pool without holding a threadpool thread, and concurrent misses in
+the event loop share one render. `get_or_create` is the blocking side for
+batch jobs such as pre-rendering.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from typing import Awaitable, BinaryIO, Callable, Iterator, Optional
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", os.path.join("generated_papers", "cache"))
+RENDER_CACHE_MAX_MB = int(os.getenv("RENDER_CACHE_MAX_MB", "512"))
+RENDER_CACHE_LOCK_STRIPES = int(os.getenv("RENDER_CACHE_LOCK_STRIPES", "64"))
+CHUNK_SIZE = 64 * 1024
+
+
+def content_key(template_name: str, template_version: int, context: dict) -> str:
+    payload = json.dumps(
+        {"template": template_name, "version": template_version, "context": context},
+        sort_keys=True, ensure_ascii=False, default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    def __init__(self, directory: str = RENDER_CACHE_DIR, max_bytes: int = RENDER_CACHE_MAX_MB * 1024 * 1024,
+                 lock_stripes: int = RENDER_CACHE_LOCK_STRIPES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._guard = threading.Lock()
+        # misses lock a stripe chosen by key: bounded memory, and two keys rarely share a stripe
+        self._stripes = [threading.Lock() for _ in range(max(1, lock_stripes))]
+        self._pinned: dict[str, int] = {}       # key -> requests currently opening it
+        self._rendering: dict[str, asyncio.Future] = {}   # key -> async render in progress
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        try:
+            os.utime(path)   # mark as recently used
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_or_create(self, key: str, write: Callable[[str], None]) -> str:
+        """
+        Return the cached file for `key`, calling `write(path)` to render it on a
+        miss. Concurrent misses for the same key render once.
+        """
+        path = self.get(key)
+        if path:
+            self.hits += 1
+            return path
+        with self._stripes[hash(key) % len(self._stripes)]:
+            path = self.get(key)
+            if path:
+                self.hits += 1
+                return path
+            self.misses += 1
+            path = self._write_atomic(key, write)
+        self.evict()
+        return path
+
+    async def get_or_render(self, key: str, render: Callable[[str], Awaitable[None]]) -> str:
+        """
+        `get_or_create` for the event loop: awaits `render(path)` on a miss.
+        Concurrent misses for the same key await the same render.
+        """
+        path = self.get(key)
+        if path:
+            self.hits += 1
+            return path
+        pending = self._rendering.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._render_atomic(key, render))
+            self._rendering[key] = pending
+            pending.add_done_callback(lambda _: self._rendering.pop(key, None))
+        # a client that disconnects cancels its own wait, not the render others are waiting on
+        return await asyncio.shield(pending)
+
+    def open(self, key: str, write: Callable[[str], None]) -> BinaryIO:
+        """Like `get_or_create`, but returns the file opened for reading. The key
+        can't be evicted between rendering and opening."""
+        self._pin(key)
+        try:
+            return open(self.get_or_create(key, write), "rb")
+        finally:
+            self._unpin(key)
+
+    async def open_or_render(self, key: str, render: Callable[[str], Awaitable[None]]) -> BinaryIO:
+        """`open` for the event loop, rendering through `get_or_render`."""
+        self._pin(key)
+        try:
+            return open(await self.get_or_render(key, render), "rb")
+        finally:
+            self._unpin(key)
+
+    def _pin(self, key: str) -> None:
+        with self._guard:
+            self._pinned[key] = self._pinned.get(key, 0) + 1
+
+    def _unpin(self, key: str) -> None:
+        with self._guard:
+            if self._pinned[key] == 1:
+                del self._pinned[key]
+            else:
+                self._pinned[key] -= 1
+
+    def _write_atomic(self, key: str, write: Callable[[str], None]) -> str:
+        tmp_path = self._temp_path()
+        try:
+            write(tmp_path)
+            return self._store(key, tmp_path)
+        except BaseException:
+            self._discard(tmp_path)
+            raise
+
+    async def _render_atomic(self, key: str, render: Callable[[str], Awaitable[None]]) -> str:
+        self.misses += 1
+        tmp_path = self._temp_path()
+        try:
+            await render(tmp_path)
+            path = self._store(key, tmp_path)
+        except BaseException:
+            self._discard(tmp_path)
+            raise
+        await run_in_threadpool(self.evict)
+        return path
+
+    def _temp_path(self) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        return tmp_path
+
+    def _store(self, key: str, tmp_path: str) -> str:
+        path = self.path_for(key)
+        os.replace(tmp_path, path)
+        return path
+
+    @staticmethod
+    def _discard(tmp_path: str) -> None:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    def evict(self) -> None:
+        """Delete least-recently-used files until the cache fits in max_bytes."""
+        try:
+            entries = [e for e in os.scandir(self.directory) if e.name.endswith(".pdf")]
+        except FileNotFoundError:
+            return
+        with self._guard:
+            pinned = set(self._pinned)
+        stats = [(e.stat().st_mtime, e.stat().st_size, e.path, e.name[:-4]) for e in entries]
+        total = sum(size for _, size, _, _ in stats)
+        if total <= self.max_bytes:
+            return
+        for _, size, path, key in sorted(stats):
+            if total <= self.max_bytes:
+                break
+            if key in pinned:
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            self.evictions += 1
+            logger.debug(f"[render-cache] evicted {key}")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "max_bytes": self.max_bytes, "directory": self.directory}
+
+
+render_cache = RenderCache()
+
+
+# ---------------------------------------------------------------------------
+# HTTP helpers
+# ---------------------------------------------------------------------------
+def etag_for(key: str) -> str:
+    return f'"{key}"'
+
+
+def etag_matches(request: Request, key: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag_for(key) in tags
+
+
+async def serve_cached_pdf(request: Request, key: str, filename: str, render: Callable[[str], Awaitable[None]],
+                           cache: RenderCache = render_cache) -> Response:
+    """
+    304 if the client already holds this exact PDF, otherwise the cached file
+    (rendered on first request by awaiting `render(path)`).
+    """
+    headers = {"ETag": etag_for(key), "Cache-Control": "private, no-cache"}
+    if etag_matches(request, key):
+        return Response(status_code=304, headers=headers)
+    f = await cache.open_or_render(key, render)
+    headers["Content-Length"] = str(os.fstat(f.fileno()).st_size)
+    headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+    return StreamingResponse(_read_chunks(f), media_type="application/pdf", headers=headers)
+
+
+def _read_chunks(f: BinaryIO) -> Iterator[bytes]:
+    with f:
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
@@ -0,0 +1,171 @@
+"""
+Worker processes for CPU-bound PDF rendering.
+
+WeasyPrint and ReportLab hold the GIL for the whole render, so rendering in a
+request thread stalls every other request on the worker. Renders run in a small
+process pool instead. Each process imports WeasyPrint and renders a throwaway
+page once at start-up, so fonts are loaded before the first real paper.
+
+Admission is bounded: at most `workers` renders run and `queue_size` wait.
+Beyond that callers get a 503 with Retry-After rather than an ever-growing
+queue. A render that exceeds `timeout` is answered with a 504. The job itself
+keeps its slot until the worker finishes it.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+RENDER_QUEUE_SIZE = int(os.getenv("RENDER_QUEUE_SIZE", "16"))
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "60"))
+RENDER_RETRY_AFTER_SECONDS = int(os.getenv("RENDER_RETRY_AFTER_SECONDS", "5"))
+
+
+# ---------------------------------------------------------------------------
+# Functions that run inside the worker processes (must be picklable)
+# ---------------------------------------------------------------------------
+def warm_worker() -> None:
+    try:
+        from weasyprint import HTML
+        HTML(string="<p>warm-up</p>").write_pdf()
+    except Exception as e:   # ReportLab-only jobs still work without WeasyPrint
+        logger.warning(f"[render-pool] WeasyPrint warm-up failed: {e}")
+
+
+def html_to_pdf(html: str, path: str) -> None:
+    from weasyprint import HTML
+    HTML(string=html).write_pdf(path)
+
+
+def _ping() -> None:
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Pool
+# ---------------------------------------------------------------------------
+class RenderPool:
+    def __init__(
+        self,
+        workers: int = RENDER_WORKERS,
+        queue_size: int = RENDER_QUEUE_SIZE,
+        timeout: float = RENDER_TIMEOUT_SECONDS,
+        initializer: Optional[Callable[[], None]] = warm_worker,
+    ):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.timeout = timeout
+        self.initializer = initializer
+
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self.initializer,
+                )
+            return self._executor
+
+    def start(self) -> None:
+        """Spawn and warm every worker now rather than on the first request."""
+        executor = self._get_executor()
+        for _ in range(self.workers):
+            executor.submit(_ping)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    # -----------------------------------------------------------------------
+    # Submission
+    # -----------------------------------------------------------------------
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Queue `fn(*args)` on a worker, or raise 503 if the pool is saturated."""
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="PDF rendering is busy, please retry shortly",
+                    headers={"Retry-After": str(RENDER_RETRY_AFTER_SECONDS)},
+                )
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _failed(self, e: BaseException) -> HTTPException:
+        if isinstance(e, (asyncio.TimeoutError, FutureTimeoutError)):
+            self.timed_out += 1
+            return HTTPException(status_code=504, detail="PDF rendering timed out")
+        # A worker died (e.g. OOM); start a fresh pool for the next request
+        logger.error(f"[render-pool] worker pool broken: {e}")
+        with self._lock:
+            self._executor = None
+        return HTTPException(status_code=503, detail="PDF renderer restarting, please retry",
+                             headers={"Retry-After": str(RENDER_RETRY_AFTER_SECONDS)})
+
+    async def run(self, fn: Callable, *args):
+        """Run `fn(*args)` on a worker without blocking the event loop."""
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except (asyncio.TimeoutError, BrokenProcessPool) as e:
+            raise self._failed(e) from e
+
+    def run_blocking(self, fn: Callable, *args):
+        """Same as `run` for code already on a threadpool thread (sync routes, cache writers)."""
+        future = self.submit(fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except (FutureTimeoutError, BrokenProcessPool) as e:
+            future.cancel()
+            raise self._failed(e) from e
+
+    async def render_html(self, html: str, path: str) -> None:
+        await self.run(html_to_pdf, html, path)
+
+    def render_html_blocking(self, html: str, path: str) -> None:
+        self.run_blocking(html_to_pdf, html, path)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "capacity": self.capacity,
+            "in_flight": self._in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+render_pool = RenderPool()
@@ -0,0 +1,122 @@
+"""
+Per-user "already seen" sets for generated questions.
+
+Each (user, scope) keeps two Bloom filters of normalised question hashes in
+user_seen_filters. New questions go into the current generation. Once it
+holds SEEN_FILTER_CAPACITY questions, it becomes the previous generation and
+a fresh one starts. A question counts as seen if either generation has it,
+so "recent" means the last CAPACITY to 2 × CAPACITY questions. Memory per
+user is fixed (~2.4 KB per generation at the defaults), and a check is k bit
+probes, with no history queries.
+
+Bloom filters never miss a question that was added. They may, at
+SEEN_FILTER_FP_RATE, report an unseen question as seen; that only costs an
+extra draw.
+"""
+import hashlib
+import math
+import os
+import re
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from model import UserSeenFilter
+
+SEEN_FILTER_CAPACITY = int(os.getenv("SEEN_FILTER_CAPACITY", "2000"))
+SEEN_FILTER_FP_RATE = float(os.getenv("SEEN_FILTER_FP_RATE", "0.01"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalise_question(text: str) -> str:
+    """Case and whitespace differences don't make a question new."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def question_hash(text: str) -> tuple[int, int]:
+    digest = hashlib.blake2b(normalise_question(text).encode("utf-8"), digest_size=16).digest()
+    # the second hash must be odd so probes never collapse onto one bit
+    return int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big") | 1
+
+
+def bloom_size(capacity: int, fp_rate: float) -> tuple[int, int]:
+    """(bits, hash count) for `capacity` items at `fp_rate` false positives."""
+    bits = max(64, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2))
+    bits = (bits + 7) // 8 * 8
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+
+class BloomFilter:
+    def __init__(self, num_bits: int, num_hashes: int, data: Optional[bytes] = None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(data) if data is not None else bytearray(num_bits // 8)
+
+    def _positions(self, h: tuple[int, int]):
+        h1, h2 = h
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, h: tuple[int, int]) -> None:
+        for pos in self._positions(h):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, h: tuple[int, int]) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(h))
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.bits)
+
+
+class SeenSet:
+    """Two rotating Bloom generations; `text in seen` / `seen.add(text)` take raw question text."""
+
+    def __init__(self, capacity: int = SEEN_FILTER_CAPACITY, fp_rate: float = SEEN_FILTER_FP_RATE,
+                 current: Optional[bytes] = None, previous: Optional[bytes] = None, count: int = 0):
+        self.capacity = capacity
+        self.num_bits, self.num_hashes = bloom_size(capacity, fp_rate)
+        size = self.num_bits // 8
+        if current is not None and len(current) != size:
+            # capacity or fp rate changed since this row was written; start over
+            current, previous, count = None, None, 0
+        self.current = BloomFilter(self.num_bits, self.num_hashes, current)
+        self.previous = (BloomFilter(self.num_bits, self.num_hashes, previous)
+                         if previous is not None and len(previous) == size else None)
+        self.count = count
+
+    def __contains__(self, text: str) -> bool:
+        h = question_hash(text)
+        return h in self.current or (self.previous is not None and h in self.previous)
+
+    def add(self, text: str) -> None:
+        if self.count >= self.capacity:
+            self.previous = self.current
+            self.current = BloomFilter(self.num_bits, self.num_hashes)
+            self.count = 0
+        self.current.add(question_hash(text))
+        self.count += 1
+
+    def update(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            self.add(text)
+
+
+# ---------------------------------------------------------------------------
+# Persistence
+# ---------------------------------------------------------------------------
+def load_seen(db: Session, user_id: int, scope: str) -> SeenSet:
+    row = db.get(UserSeenFilter, (user_id, scope))
+    if row is None:
+        return SeenSet()
+    return SeenSet(current=row.current_bits, previous=row.previous_bits, count=row.current_count)
+
+
+def save_seen(db: Session, user_id: int, scope: str, seen: SeenSet) -> None:
+    """Stage the filters on the session; the caller commits with the rest of its work."""
+    row = db.get(UserSeenFilter, (user_id, scope))
+    if row is None:
+        row = UserSeenFilter(user_id=user_id, scope=scope)
+        db.add(row)
+    row.current_bits = seen.current.to_bytes()
+    row.previous_bits = seen.previous.to_bytes() if seen.previous is not None else None
+    row.current_count = seen.count
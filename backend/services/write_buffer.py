@@ -0,0 +1,180 @@
+"""
+Write-behind buffer for append-only analytics rows.
+
+Generated word problems and user action logs are written one small commit at
+a time in the request path, and the commit dominates the request's latency.
+Nothing reads these rows back in the same request, so `add(Model, **values)`
+only queues the row. Queued rows are written in one transaction per flush,
+one multi-row INSERT per table. A flush is triggered by:
+
+  * size: `batch_size` rows are waiting (the flusher thread is woken),
+  * time: every `flush_seconds` while rows are waiting,
+  * shutdown: `shutdown()` stops the thread and drains what is left.
+
+If more than `max_pending` rows pile up (the database is slow or down), the
+caller that adds a row flushes inline, which pushes back on the request
+path. A failed flush puts its rows back at the front of the queue for the
+next attempt, dropping the oldest beyond `max_pending` so memory stays
+bounded while the database is unavailable.
+
+Rows become visible to readers up to `flush_seconds` late, and rows still
+queued when the process is killed without a shutdown are lost. Only use this
+for records where that is acceptable. Column defaults are applied at flush
+time, so callers pass event timestamps explicitly.
+`stats()` reports the queue depth and flush latency.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+WRITE_BUFFER_BATCH_SIZE = int(os.getenv("WRITE_BUFFER_BATCH_SIZE", "500"))
+WRITE_BUFFER_FLUSH_SECONDS = float(os.getenv("WRITE_BUFFER_FLUSH_SECONDS", "2"))
+WRITE_BUFFER_MAX_PENDING = int(os.getenv("WRITE_BUFFER_MAX_PENDING", "10000"))
+
+
+class WriteBuffer:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = WRITE_BUFFER_BATCH_SIZE,
+        flush_seconds: float = WRITE_BUFFER_FLUSH_SECONDS,
+        max_pending: int = WRITE_BUFFER_MAX_PENDING,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.max_pending = max(self.batch_size, max_pending)
+
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_seconds: Optional[float] = None
+        self.max_flush_seconds = 0.0
+        self._rows: deque = deque()                  # (model, values)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()          # one flush at a time, so rows keep their order
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    # -----------------------------------------------------------------------
+    # Queueing
+    # -----------------------------------------------------------------------
+    def add(self, model, **values) -> None:
+        """Queue one `model` row for the next flush."""
+        with self._lock:
+            self._rows.append((model, values))
+            depth = len(self._rows)
+        if depth >= self.max_pending or (depth >= self.batch_size and not self.running):
+            self.flush()
+        elif depth >= self.batch_size:
+            self._wakeup.set()
+
+    def depth(self) -> int:
+        with self._lock:
+            return len(self._rows)
+
+    # -----------------------------------------------------------------------
+    # Flushing
+    # -----------------------------------------------------------------------
+    def flush(self) -> int:
+        """Write every queued row now. Returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, deque()
+            if not rows:
+                return 0
+            started = time.perf_counter()
+            try:
+                self._write(rows)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"[write-buffer] flush of {len(rows)} rows failed, will retry: {e}", exc_info=True)
+                with self._lock:
+                    rows.extend(self._rows)
+                    while len(rows) > self.max_pending:
+                        rows.popleft()
+                        self.dropped += 1
+                    self._rows = rows
+                return 0
+            elapsed = time.perf_counter() - started
+            self.flushes += 1
+            self.rows_written += len(rows)
+            self.last_flush_seconds = round(elapsed, 4)
+            self.max_flush_seconds = max(self.max_flush_seconds, self.last_flush_seconds)
+            return len(rows)
+
+    def _write(self, rows: deque) -> None:
+        # executemany with one key set per statement; SQLAlchemy sends it as multi-row INSERT ... VALUES
+        batches: dict[tuple, list] = {}
+        for model, values in rows:
+            batches.setdefault((model, tuple(sorted(values))), []).append(values)
+        with self.session_factory() as db:
+            for (model, _), batch in batches.items():
+                db.execute(insert(model), batch)
+            db.commit()
+
+    # -----------------------------------------------------------------------
+    # Background flusher
+    # -----------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return bool(self._worker and self._worker.is_alive())
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="write-buffer", daemon=True)
+            self._worker.start()
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """Stop the flusher and drain whatever is still queued."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker:
+            self._worker.join(timeout)
+        self._worker = None
+        self.flush()
+        if self.depth():
+            logger.error(f"[write-buffer] {self.depth()} rows could not be written at shutdown")
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(timeout=self.flush_seconds)
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"[write-buffer] flusher error: {e}", exc_info=True)
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth(),
+            "batch_size": self.batch_size,
+            "flush_seconds": self.flush_seconds,
+            "running": self.running,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": self.max_flush_seconds,
+        }
+
+
+write_buffer = WriteBuffer()
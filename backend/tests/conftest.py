@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+from model import Base, User
+
+
+@pytest.fixture
+def db_engine():
+    """A fresh in-memory SQLite database with every table created."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session_factory(db_engine):
+    return sessionmaker(bind=db_engine, autocommit=False, autoflush=False)
+
+
+@pytest.fixture
+def override_get_db(db_session_factory):
+    def _get_db():
+        db = db_session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    return _get_db
+
+
+@pytest.fixture
+def user(db_session_factory):
+    db = db_session_factory()
+    user = User(username="ninja", email="ninja@example.com", password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    return user
+
+
+@pytest.fixture
+def async_db_path(tmp_path):
+    """A file-backed SQLite database, so sync setup code and aiosqlite see the same tables."""
+    path = tmp_path / "test.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def async_db_session_factory(async_db_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{async_db_path}", poolclass=NullPool)
+    return async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+
+
+@pytest.fixture
+def override_get_async_db(async_db_session_factory):
+    async def _get_async_db():
+        async with async_db_session_factory() as db:
+            yield db
+    return _get_async_db
@@ -0,0 +1,65 @@
+import sys
+import os
+from fractions import Fraction
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from generators.answers import (Comparison, Compound, Decimal, FractionAnswer, Integer, Money, Ratio, Text,
+                                as_answer)
+from generators.custom_generators import MODULE_GENERATORS, generate_item, generate_question
+from generators.mcq_generator import DIFFICULTIES
+from generators.seeding import make_rng
+
+EDGE_CASES = [
+    Integer(0), Integer(1), Integer(-7), Integer(123456), Integer(120, step=10),
+    Money(0), Money(1), Decimal(0.01), Decimal(0.5),
+    FractionAnswer(1, 2), FractionAnswer(6, 15), FractionAnswer(1, 1),
+    Ratio(1, 1), Ratio(2, 3),
+    Comparison('1/2', '=', '2/4'), Comparison('3/4', '>', '1/2'),
+    Compound('{0} and {1}', (Money(5), Money(5))),
+    Compound('Estimate: {0} (exact: {1})', (Integer(120, step=10), Integer(117))),
+    Text('no idea'),
+]
+
+
+def test_every_type_gives_unique_wrong_options_for_edge_cases():
+    rng = make_rng(1)
+    for answer in EDGE_CASES:
+        for _ in range(50):
+            wrong = answer.distractors(rng)
+            assert len(wrong) == 3 == len(set(wrong)), answer
+            assert str(answer) not in wrong, answer
+
+
+def test_fraction_distractors_are_never_equal_in_value():
+    rng = make_rng(2)
+    for n, d in [(1, 2), (2, 4), (3, 9), (6, 15)]:
+        for _ in range(20):
+            for wrong in FractionAnswer(n, d).distractors(rng):
+                assert Fraction(wrong) != Fraction(n, d)
+
+
+def test_comparison_distractors_are_all_false():
+    holds = {'<': lambda a, b: a < b, '=': lambda a, b: a == b, '>': lambda a, b: a > b}
+    for answer in (Comparison('3/4', '>', '1/2'), Comparison('1/2', '=', '2/4')):
+        for wrong in answer.distractors(make_rng(3), 4):
+            left, sign, right = wrong.split()
+            assert not holds[sign](Fraction(left), Fraction(right))
+
+
+def test_as_answer_types_plain_values():
+    assert as_answer('3/4') == FractionAnswer(3, 4)
+    assert as_answer('2 : 5') == Ratio(2, 5)
+    assert as_answer('£12') == Money(12)
+    assert as_answer('-4') == Integer(-4)
+    assert as_answer('0.25') == Decimal(0.25)
+    assert as_answer(Fraction(2, 6)) == FractionAnswer(1, 3)
+    assert isinstance(as_answer('Estimate: 120 (exact: 117)'), Text)
+
+
+def test_generators_return_typed_answers_with_unchanged_text():
+    for module_id in MODULE_GENERATORS:
+        for difficulty in DIFFICULTIES:
+            item = generate_item(module_id, difficulty, make_rng(4))
+            question = generate_question(module_id, difficulty, make_rng(4))
+            assert not isinstance(item['answer'], (str, Text))
+            assert question == {**item, 'answer': str(item['answer'])}
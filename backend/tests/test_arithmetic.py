@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from generators.arithmetic import OPERATIONS, generate_arrays, generate_questions
+from generators.seeding import make_np_rng
+from routers import addition_routes, division_routes, multiplication_routes, subtraction_routes
+
+
+@pytest.mark.parametrize("operation", sorted(OPERATIONS))
+@pytest.mark.parametrize("level", range(12))
+def test_batches_stay_in_range_and_answers_are_correct(operation, level):
+    shown, answers = generate_arrays(operation, level, 2000, make_np_rng(level))
+    ranges = OPERATIONS[operation].level(level).ranges
+    if operation == "division":
+        (dlo, dhi), (qlo, qhi) = ranges
+        assert ((shown[:, 1] >= dlo) & (shown[:, 1] <= dhi)).all()
+        assert ((answers >= qlo) & (answers <= qhi)).all()
+        assert (shown[:, 0] == shown[:, 1] * answers).all()
+    else:
+        for column, (lo, hi) in zip(shown.T, ranges):
+            assert lo <= column.min() and column.max() <= hi
+        expected = {"addition": shown.sum(axis=1), "subtraction": shown[:, 0] - shown[:, 1],
+                    "multiplication": shown.prod(axis=1)}[operation]
+        assert np.array_equal(answers, expected)
+        assert (answers >= 0).all()
+
+
+def test_questions_match_the_drill_format():
+    q = generate_questions("addition", 2, 1, seed=7)[0]
+    a, b, c = (int(x) for x in q["question"].rstrip("= ").split(" + "))
+    assert q["answer"] == str(a + b + c)
+    assert q["explanation"] == f"Add {a}, {b}, and {c}"
+
+    q = generate_questions("division", 5, 1, seed=7)[0]
+    dividend, divisor = (int(x) for x in q["question"].rstrip("= ").split(" ÷ "))
+    assert dividend == divisor * int(q["answer"])
+    assert generate_questions("subtraction", 0, 1, seed=7)[0]["question"].endswith(" =")
+
+
+def test_same_seed_same_batch():
+    assert generate_questions("multiplication", 3, 500, seed=11) == generate_questions("multiplication", 3, 500, seed=11)
+    assert generate_questions("multiplication", 3, 500, seed=11) != generate_questions("multiplication", 3, 500, seed=12)
+
+
+@pytest.mark.parametrize("operation", OPERATIONS)
+def test_routes_reject_negative_seeds(operation):
+    app = FastAPI()
+    for module in (addition_routes, subtraction_routes, multiplication_routes, division_routes):
+        app.include_router(module.router)
+    client = TestClient(app)
+    assert client.get(f"/{operation}/questions", params={"level": 1, "seed": -1}).status_code == 422
+    assert client.get(f"/{operation}/questions", params={"level": 1, "seed": 3}).json() == \
+        client.get(f"/{operation}/questions", params={"level": 1, "seed": 3}).json()
@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from database import get_db
+from model import Base, LevelAttempt, User, UserScore
+from routers import attempt_routes, submit_score
+from services.attempt_counters import next_attempt_number, next_set_number
+
+
+def _attempt(user, number, operation="addition", level=1):
+    return LevelAttempt(user_id=user.id, user_name=user.username, operation=operation, level=level,
+                        attempt_number=number, score=5, total_questions=10, is_passed=False)
+
+
+def test_numbers_are_per_user_operation_and_level(db_session_factory, user):
+    with db_session_factory() as db:
+        assert [next_attempt_number(db, user.id, "addition", 1) for _ in range(3)] == [1, 2, 3]
+        assert next_attempt_number(db, user.id, "addition", 2) == 1
+        assert next_attempt_number(db, user.id, "division", 1) == 1
+        assert next_set_number(db, user.id, "addition", 1) == 1
+
+
+def test_counter_continues_existing_history(db_session_factory, user):
+    with db_session_factory() as db:
+        db.add_all([_attempt(user, 1), _attempt(user, 2), _attempt(user, 7)])
+        db.commit()
+        assert next_attempt_number(db, user.id, "addition", 1) == 8
+
+
+def test_rolled_back_number_is_handed_out_again(db_session_factory, user):
+    with db_session_factory() as db:
+        assert next_attempt_number(db, user.id, "addition", 1) == 1
+        db.commit()
+        assert next_attempt_number(db, user.id, "addition", 1) == 2
+        db.rollback()
+        assert next_attempt_number(db, user.id, "addition", 1) == 2
+
+
+def test_duplicate_numbers_are_rejected(db_session_factory, user):
+    with db_session_factory() as db:
+        db.add_all([_attempt(user, 1), _attempt(user, 1)])
+        with pytest.raises(IntegrityError):
+            db.commit()
+
+
+def test_concurrent_submissions_get_distinct_numbers(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'counters.db'}", connect_args={"timeout": 30})
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(User(username="ninja", email="ninja@example.com", password="x"))
+        db.commit()
+        user = db.get(User, 1)
+
+    def submit(_):
+        with Session() as db:
+            number = next_attempt_number(db, user.id, "addition", 1)
+            db.add(_attempt(user, number))
+            db.commit()
+            return number
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        numbers = list(executor.map(submit, range(40)))
+    assert sorted(numbers) == list(range(1, 41))
+    engine.dispose()
+
+
+def test_routes_number_by_user_name(override_get_db, user):
+    app = FastAPI()
+    app.include_router(attempt_routes.router)
+    app.include_router(submit_score.router)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    attempt = {"user_name": "ninja", "operation": "addition", "level": 1, "score": 9,
+               "total_questions": 10, "is_passed": True}
+    assert [client.post("/attempts/record", json=attempt).json()["attempt_number"] for _ in range(2)] == [1, 2]
+    assert client.post("/attempts/record", json={**attempt, "user_name": "nobody"}).status_code == 404
+
+    score = {"user_name": "ninja", "operation": "addition", "level": 1, "score": 10, "total_questions": 10}
+    assert [client.post("/submit-score", json=score).json()["set_number"] for _ in range(2)] == [1, 2]
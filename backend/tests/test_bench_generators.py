@@ -0,0 +1,29 @@
+import sys
+import os
+import json
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_generators import compare, draws_to_collect, main
+
+
+def test_draws_to_collect_walks_segments():
+    assert draws_to_collect(list(range(80)), k=40) == 40
+    # each value drawn twice in a row: the 40th new value arrives on draw 79
+    assert draws_to_collect([i // 2 for i in range(80)], k=40) == 79
+    assert draws_to_collect([None, 1, 2, None, 3], k=3) == 5
+    assert draws_to_collect([1, 2, 1, 2] * 50, k=40) is None
+
+
+def test_report_is_written_and_compared(tmp_path, capsys):
+    out = tmp_path / "bench.json"
+    assert main(["--only", "word_problem operation=addition", "--draws", "200", "--output", str(out)]) == 0
+    report = json.loads(out.read_text())
+    assert report["meta"]["draws"] == 200
+    assert [r["level"] for r in report["results"]] == [1, 2, 3]
+    assert {"us_per_q", "qps", "distinct_ratio", "draws_to_40"} <= set(report["results"][0])
+
+    worse = json.loads(out.read_text())
+    for row in worse["results"]:
+        row["distinct_ratio"] = 0.1
+    assert compare(worse, report)            # entropy drop is flagged
+    assert compare(report, report) == []
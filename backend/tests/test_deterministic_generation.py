@@ -0,0 +1,202 @@
+"""
+Regression suite for seeded question generation.
+
+A paper is (GENERATOR_VERSION, seed, params): for a given seed every generator
+must produce byte-identical output. GOLDEN pins the output digests for the
+current GENERATOR_VERSION; if a change alters generator output, bump
+GENERATOR_VERSION in generators/seeding.py and re-pin the digests.
+"""
+import functools
+import hashlib
+import json
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from generators.seeding import GENERATOR_VERSION, make_rng
+from generators.custom_generators import MODULE_GENERATORS, generate_question
+from generators.mcq_generator import generate_exam
+from routers.fmc_routes import generate_fmc_problem, level_topics
+from routers.addition_routes import get_addition_questions
+from routers.subtraction_routes import get_subtraction_questions
+from routers.multiplication_routes import get_multiplication_questions
+from routers.division_routes import generate_division_questions
+from routers.word_problem_routes import generate_problem
+from routers.reasoning_routes import (get_flow_chain_questions, get_symbolic_shapes_questions,
+                                      get_max_option_questions)
+
+SEED = 20240601
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+
+def _dump(item):
+    if hasattr(item, "model_dump"):
+        return item.model_dump()
+    return item
+
+
+def _digest(items) -> str:
+    payload = json.dumps([_dump(i) for i in items], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _draw(fn, n):
+    out = []
+    for _ in range(n):
+        try:
+            out.append(fn())
+        except Exception as e:   # some generator/level combos raise; that is part of the output
+            out.append(type(e).__name__)
+    return out
+
+
+def fmc_output(level, seed=SEED, n=200):
+    rng = make_rng(seed)
+    return _draw(lambda: generate_fmc_problem(level, rng), n)
+
+
+def custom_output(module_id, difficulty, seed=SEED, n=100):
+    rng = make_rng(seed)
+    return _draw(lambda: generate_question(module_id, difficulty, rng), n)
+
+
+def exam_output(difficulty='mixed', seed=SEED):
+    return generate_exam(50, difficulty, make_rng(seed))
+
+
+def router_outputs(seed=SEED):
+    rng = make_rng(seed)
+    return {
+        'addition': [get_addition_questions(level, seed) for level in range(4)],
+        'subtraction': [get_subtraction_questions(level, seed) for level in range(3)],
+        'multiplication': [get_multiplication_questions(level, seed) for level in range(4)],
+        'division': [generate_division_questions(level, seed) for level in range(11)],
+        'word_problem': [generate_problem(op, level, rng)
+                         for op in ('addition', 'subtraction', 'multiplication', 'division')
+                         for level in range(1, 4)],
+        'reasoning': [get_flow_chain_questions(seed), get_symbolic_shapes_questions(seed),
+                      get_max_option_questions(seed)],
+    }
+
+
+@functools.lru_cache(maxsize=None)
+def all_digests(seed=SEED) -> dict:
+    digests = {f'fmc:{level}': _digest(fmc_output(level, seed)) for level in sorted(level_topics)}
+    for module_id in MODULE_GENERATORS:
+        for difficulty in DIFFICULTIES:
+            digests[f'custom:{module_id}:{difficulty}'] = _digest(custom_output(module_id, difficulty, seed))
+    for difficulty in DIFFICULTIES + ['mixed']:
+        digests[f'exam:{difficulty}'] = _digest(exam_output(difficulty, seed))
+    for name, batches in router_outputs(seed).items():
+        digests[f'router:{name}'] = _digest([[_dump(q) for q in batch] if isinstance(batch, list) else batch
+                                             for batch in batches])
+    return digests
+
+
+GOLDEN = {
+    1: {
+        'fmc:0': '25a85f34aa0e29d3',
+        'fmc:1': '37aef7c925f08dee',
+        'fmc:2': '03e0427d22360552',
+        'fmc:3': '7c3712b33de74047',
+        'fmc:4': '07e0f75760f282c4',
+        'fmc:5': '943b36b8c0645fed',
+        'fmc:6': 'e1e5d4402ba673fd',
+        'fmc:7': '6fc0647518fa9c89',
+        'fmc:8': '6fc0647518fa9c89',
+        'fmc:9': '6fc0647518fa9c89',
+        'fmc:10': '6fc0647518fa9c89',
+        'custom:four-operations:easy': '1de3192a4fb2e04b',
+        'custom:four-operations:medium': 'b2ff884bb746badf',
+        'custom:four-operations:hard': '4e71b57ed2accdeb',
+        'custom:fractions-decimals:easy': 'b27e22a9f51bde97',
+        'custom:fractions-decimals:medium': 'b27e22a9f51bde97',
+        'custom:fractions-decimals:hard': 'b27e22a9f51bde97',
+        'custom:ratios:easy': 'c990377cee7b027a',
+        'custom:ratios:medium': 'c990377cee7b027a',
+        'custom:ratios:hard': 'ad63111d970e95ac',
+        'custom:percentages:easy': '3fba1ea67334278f',
+        'custom:percentages:medium': '461aa59ad4abe7db',
+        'custom:percentages:hard': '4bca70bb1c3258e9',
+        'custom:multi-step-word-problems:easy': '8dea58c16354569a',
+        'custom:multi-step-word-problems:medium': '8dea58c16354569a',
+        'custom:multi-step-word-problems:hard': '8dea58c16354569a',
+        'custom:mental-arithmetic:easy': '6139c3bb0fef44c9',
+        'custom:mental-arithmetic:medium': '5723a1bd143919d4',
+        'custom:mental-arithmetic:hard': '5723a1bd143919d4',
+        'custom:speed-based-calculation:easy': 'b0edbc7fddb5c5a2',
+        'custom:speed-based-calculation:medium': '88098b4892ad95ad',
+        'custom:speed-based-calculation:hard': 'a81b0b196c1583db',
+        'custom:logical-number-puzzles:easy': 'a4de0ea97b5befc3',
+        'custom:logical-number-puzzles:medium': 'a4de0ea97b5befc3',
+        'custom:logical-number-puzzles:hard': '5831e47271f88177',
+        'exam:easy': 'e31f80778e4e43b2',
+        'exam:medium': 'c26abd59bc5f320e',
+        'exam:hard': '6a039fa5efc2c318',
+        'exam:mixed': 'a3d9c68bb1d78b8a',
+        'router:addition': 'eb264fa4069ae4e4',
+        'router:subtraction': '331c5c247338c89d',
+        'router:multiplication': '67678cc435e22ce5',
+        'router:division': '9dad68fd773eb90c',
+        'router:word_problem': '9ee8b6ec3d0439e6',
+        'router:reasoning': '59a2e1f60733b565',
+    },
+}
+# 2: the arithmetic drill routers draw from the numpy batch engine
+GOLDEN[2] = {
+    **GOLDEN[1],
+    'router:addition': 'cc87f0e15d0db120',
+    'router:subtraction': '25d96479639531be',
+    'router:multiplication': '2e37a8b38fe4c33d',
+    'router:division': '0c6ddc569a2a8216',
+}
+# 3: FMC number puzzles sample from precomputed solution tables
+GOLDEN[3] = {
+    **GOLDEN[2],
+    'fmc:0': '6ea1929ac474c348',
+    'fmc:1': '476cb80115a303f4',
+}
+# 4: mock exams follow an exact module/difficulty blueprint
+GOLDEN[4] = {
+    **GOLDEN[3],
+    'exam:easy': '6f4357e73e66b7d1',
+    'exam:hard': '7e6a54b9d5f5b4b3',
+    'exam:medium': '5b3b7f3e35444172',
+    'exam:mixed': 'a3aa9e64be0346d4',
+}
+# 5: MCQ distractors come from typed answers
+GOLDEN[5] = {
+    **GOLDEN[4],
+    'exam:easy': '6ee38b4e2cc719e9',
+    'exam:hard': '0203c9d90a7789c3',
+    'exam:medium': '2a4044adabaca1b6',
+    'exam:mixed': 'd2795527218c37f3',
+}
+
+
+def test_same_seed_gives_identical_output():
+    assert all_digests.__wrapped__(SEED) == all_digests.__wrapped__(SEED)
+
+
+def test_different_seeds_give_different_output():
+    first, second = all_digests(SEED), all_digests(SEED + 1)
+    changed = [key for key in first if first[key] != second[key]]
+    # Only fully fixed generators may ignore the seed
+    assert len(changed) > len(first) * 0.9
+
+
+def test_seeded_generation_ignores_global_random_state():
+    import random
+    random.seed(1)
+    first = _digest(exam_output())
+    random.seed(2)
+    assert _digest(exam_output()) == first
+
+
+@pytest.mark.parametrize("key", sorted(all_digests(SEED)))
+def test_output_matches_golden_digest(key):
+    golden = GOLDEN.get(GENERATOR_VERSION)
+    assert golden, f"no golden digests pinned for GENERATOR_VERSION={GENERATOR_VERSION}"
+    assert all_digests(SEED)[key] == golden[key]
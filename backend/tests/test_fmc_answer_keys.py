@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database import get_db
+from model import User
+from routers import fmc_routes
+from services.answer_keys import answer_key_cache
+
+
+def _client(override_get_db):
+    app = FastAPI()
+    app.include_router(fmc_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def test_evaluate_grades_against_issued_paper(override_get_db, user):
+    client = _client(override_get_db)
+    res = client.get("/fmc/questions", params={"level": 3, "user_id": user.id})
+    assert res.status_code == 200
+    token = res.headers["X-Paper-Token"]
+    answers = [q["answer"] for q in res.json()]
+    answers[0] = "definitely wrong"
+
+    res = client.post("/fmc/evaluate", params={"user_name": user.username, "level": 3, "paper_token": token},
+                      json=answers)
+    assert res.status_code == 200
+    assert res.json()["score"] == len(answers) - 1
+    assert res.json()["correct"][0] is False
+
+
+def test_answer_key_survives_cache_loss(override_get_db, user):
+    client = _client(override_get_db)
+    res = client.get("/fmc/questions", params={"level": 3, "user_id": user.id})
+    token = res.headers["X-Paper-Token"]
+    answers = [q["answer"].upper() + " " for q in res.json()]
+
+    answer_key_cache._entries.pop(token)
+    res = client.post("/fmc/evaluate", params={"user_name": user.username, "level": 3, "paper_token": token},
+                      json=answers)
+    assert res.json()["score"] == len(answers)
+
+
+def test_unknown_token_is_rejected(override_get_db, user):
+    client = _client(override_get_db)
+    res = client.post("/fmc/evaluate", params={"user_name": user.username, "level": 3, "paper_token": "nope"},
+                      json=["1"])
+    assert res.status_code == 404
+
+
+def test_paper_cannot_be_scored_against_another_user(override_get_db, db_session_factory, user):
+    with db_session_factory() as db:
+        db.add(User(username="other", email="other@example.com", password="x"))
+        db.commit()
+    client = _client(override_get_db)
+    token = client.get("/fmc/questions", params={"level": 3, "user_id": user.id}).headers["X-Paper-Token"]
+    res = client.post("/fmc/evaluate", params={"user_name": "other", "level": 3, "paper_token": token}, json=["1"])
+    assert res.status_code == 403
+
+
+def test_anonymous_paper_is_graded_on_another_worker(override_get_db, user):
+    client = _client(override_get_db)
+    res = client.get("/fmc/questions", params={"level": 3})
+    token = res.headers["X-Paper-Token"]
+    answers = [q["answer"] for q in res.json()]
+
+    answer_key_cache._entries.clear()                    # a restart, or a worker that never saw the paper
+    res = client.post("/fmc/evaluate", params={"user_name": user.username, "level": 3, "paper_token": token},
+                      json=answers)
+    assert res.status_code == 200 and res.json()["score"] == len(answers)
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from generators.fmc_generator import (COIN_COMBOS, DIGIT_SUM_DIFFS, DIGIT_SUM_YEARS, FEWEST_COINS,
+                                      LOGIC_PATTERNS, SUM_PRODUCT_PAIRS, TOPICS, generate_fmc_problem,
+                                      level_topics, reset_topic_stats, topic_stats)
+from generators.seeding import make_rng
+
+
+def test_every_level_topic_is_registered():
+    listed = {t for topics in level_topics.values() for t in topics}
+    # "images" has no templates yet and still falls back to the invalid-operation placeholder
+    assert listed - set(TOPICS) == {"images"}
+
+
+def test_topic_stats_report_cost_errors_and_entropy():
+    reset_topic_stats()
+    rng = make_rng(5)
+    for _ in range(400):
+        try:
+            generate_fmc_problem(0, rng)
+        except Exception:
+            pass
+    stats = topic_stats()
+    assert set(stats) == set(level_topics[0])
+    assert sum(s["calls"] for s in stats.values()) == 400
+    assert stats["division"]["errors"] == stats["division"]["calls"]   # level 0 division has no answer
+    assert stats["logicpattern"]["distinct_ratio"] > 0.5
+    assert stats["multiplication"]["distinct_ratio"] > 0.5
+    assert all(s["mean_us"] > 0 for s in stats.values())
+
+
+def test_puzzle_tables_have_exactly_one_answer():
+    digit_sum = lambda n: sum(map(int, str(n)))
+    for year, next_year in DIGIT_SUM_YEARS:
+        later = [y for y in range(year + 1, next_year + 1) if digit_sum(y) == digit_sum(year)]
+        assert later[0] == next_year
+    for tens, ones in DIGIT_SUM_DIFFS:
+        matches = [n for n in range(10, 100)
+                   if n // 10 > n % 10 and n // 10 + n % 10 == tens + ones and n // 10 - n % 10 == tens - ones]
+        assert matches == [10 * tens + ones]
+    for x, y in SUM_PRODUCT_PAIRS:
+        assert [(a, x + y - a) for a in range(1, x + y) if a < x + y - a and a * (x + y - a) == x * y] == [(x, y)]
+    for coins, num_5p in COIN_COMBOS:
+        total = 5 * num_5p + 2 * (coins - num_5p)
+        assert [a for a in range(coins + 1) if 5 * a + 2 * (coins - a) == total] == [num_5p]
+    for target, parts in FEWEST_COINS:
+        assert sum(parts) == target
+
+
+def test_fewest_coins_matches_exhaustive_search():
+    coins = (1, 2, 5, 10, 20, 50)
+    best = [0] + [None] * 99
+    for amount in range(1, 100):
+        best[amount] = 1 + min(best[amount - c] for c in coins if c <= amount)
+    assert all(len(parts) == best[target] for target, parts in FEWEST_COINS)
+
+
+def test_logic_patterns_no_longer_fail_or_repeat():
+    rng = make_rng(11)
+    for build in LOGIC_PATTERNS.values():
+        questions = {build(rng, "Ava")[0] for _ in range(200)}
+        assert len(questions) > 20
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database import get_db
+from generators.mcq_generator import generate_exam
+from generators.seeding import make_rng
+from model import GrammarPaper
+from routers import grammar_paper_routes
+from services.grammar_seeding import QUESTIONS_PER_PAPER, build_papers, seed_grammar_papers
+
+
+def test_seeding_is_idempotent_and_reproducible(db_session_factory):
+    rendered = []
+    with db_session_factory() as db:
+        assert seed_grammar_papers(db, range(1, 6), workers=1, batch_size=2, prerender=rendered.append) == [1, 2, 3, 4, 5]
+        assert seed_grammar_papers(db, range(1, 8), workers=1, prerender=rendered.append) == [6, 7]
+        assert seed_grammar_papers(db, range(1, 8), workers=1, prerender=rendered.append) == []
+        paper = db.query(GrammarPaper).filter_by(paper_number=3).one()
+        assert paper.title == "Grammar School Paper 3"
+        assert paper.questions_json == generate_exam(QUESTIONS_PER_PAPER, 'mixed', make_rng(3))
+    assert rendered == [[1, 2, 3, 4, 5], [6, 7]]
+
+
+def test_parallel_build_matches_serial():
+    numbers = list(range(1, 9))
+    assert list(build_papers(numbers, workers=2)) == list(build_papers(numbers, workers=1))
+
+
+def test_seed_endpoint_schedules_missing_papers(override_get_db):
+    app = FastAPI()
+    app.include_router(grammar_paper_routes.router, prefix="/grammar")
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    res = client.get("/grammar/papers/seed", params={"count": 3, "render": False})
+    assert res.status_code == 202
+    assert res.json()["scheduled"] == [1, 2, 3]
+    # TestClient runs background tasks before returning
+    assert [p["paper_number"] for p in client.get("/grammar/papers").json()] == [1, 2, 3]
+    assert client.get("/grammar/papers/seed", params={"count": 4, "render": False}).json()["scheduled"] == [4]
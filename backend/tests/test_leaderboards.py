@@ -0,0 +1,130 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import date
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from database import get_db
+from model import LeaderboardEntry, User
+from routers import attempt_routes
+from services.leaderboards import (ALL_LEVELS, Board, Leaderboards, board_keys, leaderboards, period_start,
+                                   rebuild_leaderboards)
+
+
+def _users(db_session_factory, count):
+    with db_session_factory() as db:
+        db.add_all(User(username=f"user{i}", email=f"user{i}@example.com", password="x") for i in range(1, count + 1))
+        db.commit()
+
+
+def _entries(db):
+    return sorted(tuple(row) for row in db.execute(select(
+        LeaderboardEntry.operation, LeaderboardEntry.level, LeaderboardEntry.period, LeaderboardEntry.period_start,
+        LeaderboardEntry.user_id, LeaderboardEntry.points, LeaderboardEntry.attempts)))
+
+
+def test_board_ranks_ties_together():
+    board = Board([(1, "a", 10), (2, "b", 30), (3, "c", 10)])
+    board.add(4, "d", 5)
+    board.add(4, "d", 25)
+    assert [(e["rank"], e["user_id"], e["points"]) for e in board.top(10)] == [(1, 2, 30), (1, 4, 30), (3, 1, 10),
+                                                                             (3, 3, 10)]
+    assert board.rank(3) == 3 and board.rank(99) is None
+    assert [e["user_id"] for e in board.top(2)] == [2, 4]
+
+
+def test_periods_and_boards_for_an_attempt():
+    wednesday = date(2026, 10, 14)
+    assert period_start("weekly", wednesday) == date(2026, 10, 12)
+    assert period_start("daily", wednesday) == wednesday
+    assert {(level, period) for _, level, period, _ in board_keys("addition", 3, wednesday)} == {
+        (level, period) for level in (3, ALL_LEVELS) for period in ("daily", "weekly", "all-time")}
+
+
+def test_commit_updates_loaded_boards_and_rollback_does_not(db_session_factory):
+    _users(db_session_factory, 2)
+    boards = Leaderboards(refresh_seconds=3600)
+    with db_session_factory() as db:
+        assert boards.top(db, "addition") == []           # loaded (empty) and cached
+        boards.record(db, 1, "user1", "addition", 2, 8)
+        boards.record(db, 2, "user2", "addition", 3, 5)
+        db.commit()
+        boards.record(db, 2, "user2", "addition", 3, 9)
+        db.rollback()
+
+        assert [(e["name"], e["points"]) for e in boards.top(db, "addition")] == [("user1", 8), ("user2", 5)]
+        assert boards.rank(db, 2, "addition", level=3, period="daily") == {"rank": 1, "points": 5, "players": 1}
+        assert len(_entries(db)) == 12
+
+
+def test_other_workers_see_writes_after_refresh(db_session_factory):
+    _users(db_session_factory, 2)
+    worker_a, worker_b = Leaderboards(refresh_seconds=3600), Leaderboards(refresh_seconds=0)
+    with db_session_factory() as db:
+        assert worker_b.top(db, "addition") == []
+        worker_a.record(db, 2, "user2", "addition", 1, 7)
+        db.commit()
+        assert [e["user_id"] for e in worker_b.top(db, "addition")] == [2]
+
+
+def test_rebuild_matches_incremental_totals(db_session_factory):
+    _users(db_session_factory, 3)
+    with db_session_factory() as db:
+        for user, level, score in [(1, 1, 8), (2, 1, 10), (1, 2, 6), (3, 4, 9), (1, 1, 3)]:
+            attempt = {"user_name": f"user{user}", "operation": "addition", "level": level, "score": score,
+                       "total_questions": 10, "is_passed": score >= 8}
+            attempt_routes.record_attempt(attempt_routes.AttemptInput(**attempt), db)
+        incremental = _entries(db)
+        assert rebuild_leaderboards(db, batch_size=4) == len(incremental)
+        assert _entries(db) == incremental
+
+
+def test_leaderboard_routes_are_mounted_on_the_app(override_get_db, db_session_factory, monkeypatch):
+    import main
+
+    _users(db_session_factory, 2)
+    leaderboards.clear()
+    monkeypatch.setitem(main.app.dependency_overrides, get_db, override_get_db)
+    client = TestClient(main.app)                        # no `with`: the startup hooks need the real database
+
+    for name, score in [("user1", 6), ("user2", 9), ("user1", 7)]:
+        client.post("/attempts/record", json={"user_name": name, "operation": "addition", "level": 2,
+                                              "score": score, "total_questions": 10, "is_passed": False})
+    top = client.get("/leaderboard", params={"operation": "addition", "period": "weekly"}).json()
+    assert [(e["name"], e["points"]) for e in top] == [("user1", 13), ("user2", 9)]
+    assert client.get("/leaderboard/rank/2", params={"level": 2}).json() == {
+        "user_id": 2, "rank": 2, "points": 9, "players": 2}
+    assert client.get("/leaderboard", params={"period": "monthly"}).status_code == 422
+
+
+def test_board_reloaded_between_commit_and_apply_is_not_double_counted(db_session_factory, monkeypatch):
+    _users(db_session_factory, 1)
+    boards = Leaderboards(refresh_seconds=0)
+    apply = Leaderboards._apply
+
+    def reload_first(self, key, *args):
+        with db_session_factory() as other:              # another request reads the board mid-hook
+            self.board(other, key[0], key[1], key[2])
+        apply(self, key, *args)
+
+    monkeypatch.setattr(Leaderboards, "_apply", reload_first)
+    with db_session_factory() as db:
+        boards.top(db, "addition")
+        boards.record(db, 1, "user1", "addition", 2, 8)
+        db.commit()
+        boards.refresh_seconds = 3600
+        assert [(e["user_id"], e["points"]) for e in boards.top(db, "addition")] == [(1, 8)]
+
+
+def test_board_loaded_during_a_commit_is_dropped():
+    boards = Leaderboards()
+    key = board_keys("addition", 1, date(2026, 10, 14))[0]
+    boards._boards[key] = Board([(1, "a", 5)], loaded_at=10.0)
+    boards._boards[key].loaded_until = 12.0
+    boards._apply(key, 1, "a", 3, commit_started=20.0, commit_finished=21.0)     # loaded before: add
+    assert boards._boards[key].points[1] == 8
+    boards._apply(key, 1, "a", 3, commit_started=11.0, commit_finished=13.0)     # overlapped: reload later
+    assert key not in boards._boards
@@ -0,0 +1,109 @@
+import sys
+import os
+from collections import Counter
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from database import get_async_db
+from generators.mcq_generator import MODULES, assemble_exam, exam_blueprint, generate_mcq
+from generators.seeding import GENERATOR_VERSION, make_rng
+from model import MockTest
+from services.generator_retirement import retire_generator_version
+from routers import mock_test_routes
+from services.seen_filter import SeenSet
+
+
+def test_mixed_blueprint_hits_exact_split_and_even_modules():
+    for n in (50, 10, 7):
+        slots = exam_blueprint(n, 'mixed', make_rng(n))
+        levels = Counter(d for _, d in slots)
+        assert sum(levels.values()) == n
+        assert abs(levels['easy'] - 0.3 * n) < 1 and abs(levels['medium'] - 0.4 * n) < 1
+        modules = Counter(m for m, _ in slots)
+        assert max(modules.values()) - min(modules.values()) <= 1
+    assert set(d for _, d in exam_blueprint(50, 'hard')) == {'hard'}
+
+
+def test_assemble_exam_copies_and_numbers_items():
+    item = generate_mcq(MODULES[0], 'easy', make_rng(1))
+    exam = assemble_exam(lambda mod, d, count: [item] * count, 16, 'easy', make_rng(2))
+    assert [q['question_id'] for q in exam] == [f'q{i}' for i in range(1, 17)]
+    assert 'question_number' not in item
+
+
+def test_build_exam_skips_questions_the_user_has_seen():
+    try:
+        first, _ = mock_test_routes.build_exam('mixed')
+        seen = SeenSet()
+        seen.update(q['question'] for q in first)
+        second, _ = mock_test_routes.build_exam('mixed', seen)
+        assert len(second) == mock_test_routes.NUM_QUESTIONS
+        assert all(mock_test_routes._is_valid_item(q) for q in second)
+        assert not {q['question'] for q in first} & {q['question'] for q in second}
+    finally:
+        mock_test_routes.mcq_item_pool.stop()
+
+
+def _client(override_get_async_db):
+    app = FastAPI()
+    app.include_router(mock_test_routes.router, prefix="/test")
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    return TestClient(app)
+
+
+def test_rebuild_exam_returns_the_pooled_exam():
+    try:
+        seen = SeenSet()
+        for seed in (1, 2):
+            questions, params = mock_test_routes.build_exam('mixed', seen, seed)
+            seen.update(q['question'] for q in questions)
+            assert mock_test_routes.rebuild_exam(seed, params) == questions
+    finally:
+        mock_test_routes.mcq_item_pool.stop()
+
+
+def test_generate_does_not_repeat_questions_for_the_same_user(override_get_async_db):
+    client = _client(override_get_async_db)
+    try:
+        papers = [client.post("/test/generate", json={"user_id": 1}).json() for _ in range(2)]
+        first, second = ({q['question'] for q in p['questions']} for p in papers)
+        assert len(first) == len(second) == mock_test_routes.NUM_QUESTIONS
+        assert not first & second
+        assert client.get("/test/pool/stats").json()["pool"] == "mcq"
+    finally:
+        mock_test_routes.mcq_item_pool.stop()
+
+
+def test_tests_are_rebuilt_from_their_seed_until_the_generator_moves_on(override_get_async_db, async_db_path):
+    client = _client(override_get_async_db)
+    Session = sessionmaker(bind=create_engine(f"sqlite:///{async_db_path}"))
+    try:
+        paper = client.post("/test/generate", json={"user_id": 1, "difficulty": "hard"}).json()
+        with Session() as db:
+            stored = db.query(MockTest).one()
+            assert (stored.seed, stored.generator_version) == (paper["seed"], GENERATOR_VERSION)
+            assert mock_test_routes.exam_questions(stored) == stored.questions_json
+            answers = {q["question_id"]: q["correct_option"] for q in stored.questions_json}
+        assert all("seed" not in q and "correct_option" not in q for q in paper["questions"])
+        assert client.get(f"/test/{paper['test_id']}").json()["questions"] == paper["questions"]
+
+        with Session() as db:                           # the generator changed while the test was in flight
+            db.execute(update(MockTest).values(generator_version=GENERATOR_VERSION - 1, seed=paper["seed"] + 1))
+            db.commit()
+        assert client.get(f"/test/{paper['test_id']}").json()["questions"] == paper["questions"]
+        result = client.post(f"/test/{paper['test_id']}/submit", json={"user_id": 1, "answers": answers}).json()
+        assert result["score"] == result["total"] == mock_test_routes.NUM_QUESTIONS
+
+        with Session() as db:
+            assert retire_generator_version(db, GENERATOR_VERSION - 1) == 1
+            with pytest.raises(ValueError):
+                retire_generator_version(db, GENERATOR_VERSION)
+        assert client.get(f"/test/{paper['test_id']}").status_code == 410
+    finally:
+        mock_test_routes.mcq_item_pool.stop()
@@ -0,0 +1,178 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import MetaData, UniqueConstraint, create_engine, func, insert, inspect, select
+from sqlalchemy.pool import StaticPool
+
+from migrations import applied_versions, discover, index_names, migrate, schema_migrations
+from model import (AttemptCounter, Base, GeneratedProblem, LevelAttempt, MockTest, MockTestResult, QuizSession, User,
+                   UserProgress, UserScore)
+
+OPERATIONS = ("addition", "subtraction", "multiplication", "division")
+
+
+def _engine():
+    return create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+# columns that later migrations add to existing tables, or change from NOT NULL to nullable
+ADDED_COLUMNS = {
+    "ocr_jobs": ("owner",),
+    "custom_papers": ("seed", "generator_version"),
+    "mock_tests": ("seed", "generator_version", "params_json"),
+    "fmc_paper_sets": ("seed", "generator_version"),
+}
+RELAXED_COLUMNS = {
+    "custom_papers": ("questions_json",),
+    "mock_tests": ("questions_json",),
+    "quiz_sessions": ("user_id",),
+}
+
+
+def _legacy_schema(engine):
+    """The tables as create_all made them before migrations: no composite or unique indexes, no new tables
+    or added columns."""
+    legacy = MetaData()
+    for table in Base.metadata.sorted_tables:
+        if table.name in ("user_level_stars", "attempt_counters"):
+            continue
+        copy = table.to_metadata(legacy)
+        copy.indexes.clear()
+        copy.constraints = {c for c in copy.constraints if not isinstance(c, UniqueConstraint)}
+        for column in RELAXED_COLUMNS.get(table.name, ()):
+            copy.c[column].nullable = False
+    legacy.create_all(engine)
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            for column in columns:
+                conn.exec_driver_sql(f"ALTER TABLE {table} DROP COLUMN {column}")
+
+
+def test_fresh_database_matches_the_models_and_reruns_are_no_ops():
+    migrated, expected = _engine(), _engine()
+    assert migrate(migrated) == [name for _, name in discover()]
+    assert migrate(migrated) == []
+    assert applied_versions(migrated) == {version for version, _ in discover()}
+
+    Base.metadata.create_all(expected)
+    with migrated.connect() as a, expected.connect() as b:
+        for table in Base.metadata.tables:
+            assert index_names(a, table) == index_names(b, table), table
+
+
+def test_legacy_database_gets_indexes_and_duplicate_numbers_are_renumbered():
+    engine = _engine()
+    _legacy_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [{"username": "ninja", "email": "n@example.com", "password": "x"}])
+        conn.execute(insert(LevelAttempt), [
+            {"user_id": 1, "user_name": "ninja", "operation": "addition", "level": 1, "attempt_number": n,
+             "score": 5, "total_questions": 10} for n in (1, 2, 2, 3, 3, 3)
+        ])
+
+    migrate(engine, target=2)
+    with engine.connect() as conn:
+        assert "ix_quiz_sessions_user_operation_start" in index_names(conn, "quiz_sessions")
+        assert "uq_level_attempts_attempt_number" not in index_names(conn, "level_attempts")
+        conn.execute(insert(AttemptCounter).values(
+            series="level_attempts", user_id=1, operation="addition", level=1, last_number=3))
+        conn.commit()
+
+    migrate(engine)
+    with engine.connect() as conn:
+        numbers = conn.scalars(select(LevelAttempt.attempt_number).order_by(LevelAttempt.id)).all()
+        assert numbers == [1, 2, 4, 3, 5, 6]
+        assert conn.scalar(select(func.count()).select_from(AttemptCounter)) == 0
+        assert "uq_level_attempts_attempt_number" in index_names(conn, "level_attempts")
+        assert "uq_user_scores_set_number" in index_names(conn, "user_scores")
+        assert conn.scalar(select(func.count()).select_from(schema_migrations)) == len(discover())
+        for table, columns in ADDED_COLUMNS.items():
+            assert set(columns) <= {c["name"] for c in inspect(conn).get_columns(table)}, table
+
+
+def test_stored_questions_become_optional_and_legacy_rows_survive():
+    engine = _engine()
+    _legacy_schema(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(MockTest.__table__).values(test_id="t1", user_id=1, questions_json=[{"question": "1+1"}]))
+        conn.execute(insert(MockTestResult).values(test_id="t1", user_id=1, score=1, total=1, time_taken=5,
+                                                   answers_json={}))
+
+    migrate(engine)
+    with engine.connect() as conn:
+        for table, columns in RELAXED_COLUMNS.items():
+            nullable = {c["name"]: c["nullable"] for c in inspect(conn).get_columns(table)}
+            assert all(nullable[column] for column in columns), table
+        assert conn.execute(select(MockTest.test_id, MockTest.questions_json, MockTest.seed)).all() == [
+            ("t1", [{"question": "1+1"}], None)]
+        assert "mock_tests" in {fk["referred_table"] for fk in inspect(conn).get_foreign_keys("mock_test_results")}
+        assert "ix_quiz_sessions_user_operation_start" in index_names(conn, "quiz_sessions")   # rebuilt table
+
+
+# ---------------------------------------------------------------------------
+# Query plans
+# ---------------------------------------------------------------------------
+HOT_QUERIES = {
+    "attempt number seed": select(func.max(LevelAttempt.attempt_number))
+        .where(LevelAttempt.user_id == 3, LevelAttempt.operation == "addition", LevelAttempt.level == 2),
+    "set number seed": select(func.max(UserScore.set_number))
+        .where(UserScore.user_id == 3, UserScore.operation == "addition", UserScore.level == 2),
+    "fmc history": select(GeneratedProblem).filter_by(user_name="user3")
+        .order_by(GeneratedProblem.created_at.desc()),
+    "mock test results": select(MockTestResult).filter_by(user_id=3)
+        .order_by(MockTestResult.submitted_at.desc()).limit(20),
+    "progress": select(UserProgress).filter_by(user_name="user3", operation="addition"),
+    "progress summary": select(LevelAttempt.operation, LevelAttempt.level, func.count(), func.max(LevelAttempt.score))
+        .where(LevelAttempt.user_id == 3).group_by(LevelAttempt.operation, LevelAttempt.level),
+    "quiz results": select(QuizSession).where(QuizSession.user_id == 3, QuizSession.operation == "addition")
+        .order_by(QuizSession.start_time),
+}
+
+
+@pytest.fixture(scope="module")
+def seeded_engine():
+    engine = _engine()
+    migrate(engine)
+    start = datetime(2025, 1, 1)
+    users = range(1, 41)
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"id": u, "username": f"user{u}", "email": f"user{u}@example.com", "password": "x"} for u in users])
+        conn.execute(insert(LevelAttempt), [
+            {"user_id": u, "user_name": f"user{u}", "operation": op, "level": level, "attempt_number": n,
+             "score": 8, "total_questions": 10}
+            for u in users for op in OPERATIONS for level in range(5) for n in range(1, 4)])
+        conn.execute(insert(UserScore), [
+            {"user_id": u, "operation": op, "level": level, "set_number": 1, "score": 8, "total_questions": 10}
+            for u in users for op in OPERATIONS for level in range(5)])
+        conn.execute(insert(GeneratedProblem), [
+            {"user_name": f"user{u}", "question": "1 + 1", "answer": "2", "operation": "fmc",
+             "created_at": start + timedelta(minutes=i)} for u in users for i in range(20)])
+        conn.execute(insert(MockTestResult), [
+            {"test_id": f"t{u}-{i}", "user_id": u, "score": 30, "total": 50, "time_taken": 600,
+             "answers_json": {}, "submitted_at": start + timedelta(days=i)} for u in users for i in range(10)])
+        conn.execute(insert(UserProgress), [
+            {"user_id": u, "user_name": f"user{u}", "operation": op, "level_completed": 1, "dojo_points": 0}
+            for u in users for op in OPERATIONS])
+        conn.execute(insert(QuizSession), [
+            {"user_id": u, "operation": op, "level": 0, "session_id": f"s{u}-{op}-{i}", "question_data": {},
+             "start_time": start + timedelta(hours=i)} for u in users for op in OPERATIONS for i in range(10)])
+        conn.exec_driver_sql("ANALYZE")
+    yield engine
+    engine.dispose()
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_queries_use_an_index(seeded_engine, name):
+    sql = str(HOT_QUERIES[name].compile(seeded_engine, compile_kwargs={"literal_binds": True}))
+    with seeded_engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    # a walk over the whole table shows up as SCAN, or as a SEARCH with no USING INDEX (min/max);
+    # an unindexed ORDER BY shows up as a temp b-tree
+    full_scans = [step for step in plan if step.startswith("SCAN") or "TEMP B-TREE" in step
+                  or (step.startswith("SEARCH") and " USING " not in step)]
+    assert not full_scans, plan
@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import itertools
+import random
+
+from model import LevelAttempt, User, UserLevelStars
+from services.attempts import record_level_attempt
+from services.ninja_stars import LEVEL_WEIGHTS, backfill_level_stars, stars_and_title
+
+
+def _rescan_stars(attempts):
+    """The old full-history computation, for comparison."""
+    total_weight = weighted_score = 0
+    for a in attempts:
+        if a.is_passed:
+            weight = LEVEL_WEIGHTS.get(a.level, 0)
+            total_weight += weight
+            weighted_score += a.score / a.total_questions * weight
+    return round(weighted_score / total_weight * 5) if total_weight else 0
+
+
+_numbers = itertools.count(1)
+
+
+def _attempt(user, level, score, total=10):
+    return LevelAttempt(user_id=user.id, user_name=user.username, operation="addition", level=level,
+                        attempt_number=next(_numbers), score=score, total_questions=total, is_passed=score >= 0.8 * total)
+
+
+def test_titles_follow_star_thresholds():
+    assert stars_and_title([]) == (0, "Getting Started")
+    assert stars_and_title([(2, 1, 1.0)]) == (5, "Math Ninja 🥇")
+    assert stars_and_title([(2, 2, 1.2)]) == (3, "Confident Solver 🥈")
+    assert stars_and_title([(12, 3, 3.0)]) == (0, "Getting Started")     # unweighted level
+
+
+def test_running_totals_match_a_full_rescan(db_session_factory, user):
+    rng = random.Random(7)
+    attempts = []
+    with db_session_factory() as db:
+        for _ in range(200):
+            attempt = _attempt(user, rng.randint(0, 11), rng.randint(0, 10))
+            attempts.append(attempt)
+            record_level_attempt(db, attempt)
+            db.commit()
+            assert db.get(User, user.id).ninja_stars == _rescan_stars(attempts)
+        assert db.query(UserLevelStars).count() <= 12
+
+
+def test_rolled_back_attempt_leaves_totals_unchanged(db_session_factory, user):
+    with db_session_factory() as db:
+        record_level_attempt(db, _attempt(user, 3, 10))
+        db.commit()
+        record_level_attempt(db, _attempt(user, 3, 8))
+        db.rollback()
+        row = db.get(UserLevelStars, (user.id, 3))
+        assert (row.passed_attempts, row.performance_sum) == (1, 1.0)
+        assert db.query(LevelAttempt).count() == 1
+
+
+def test_backfill_rebuilds_totals_from_attempts(db_session_factory, user):
+    with db_session_factory() as db:
+        db.add_all([_attempt(user, 1, 10), _attempt(user, 1, 8), _attempt(user, 4, 2)])
+        db.commit()
+        assert backfill_level_stars(db) == 1
+        row = db.get(UserLevelStars, (user.id, 1))
+        assert (row.passed_attempts, row.performance_sum) == (2, 1.8)
+        assert db.get(UserLevelStars, (user.id, 4)) is None
+        assert db.get(User, user.id).ninja_stars == 4
+        # running it again is a no-op
+        assert backfill_level_stars(db) == 1
+        assert db.query(UserLevelStars).count() == 1
@@ -0,0 +1,203 @@
+import sys
+import asyncio
+import os
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import fitz
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from reportlab.pdfgen import canvas
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import get_db
+from model import GrammarPaper, OCRJob
+from routers import ocr_job_routes
+from services import ocr_jobs as ocr_jobs_module
+from services.ocr_jobs import OCRJobRunner, register_finaliser, stage_upload
+from utils.pdf_parser import count_pages, parse_answers
+
+register_finaliser("test-sheet", lambda db, job, answers: {"answers": answers, **job.params_json})
+
+PAGES = [["Q1: A", "Q2: B"], ["Q3: C"], ["Q4: D", "Q5: A"]]
+
+
+def read_text_layer(path, page_index):
+    """Stands in for Tesseract: the test PDFs carry a text layer."""
+    with fitz.open(path) as doc:
+        return parse_answers(doc[page_index].get_text())
+
+
+@pytest.fixture
+def sheet(tmp_path):
+    path = str(tmp_path / "sheet.pdf")
+    c = canvas.Canvas(path)
+    for lines in PAGES:
+        for i, line in enumerate(lines):
+            c.drawString(50, 800 - 30 * i, line)
+        c.showPage()
+    c.save()
+    return path
+
+
+@pytest.fixture
+def session_factory(async_db_path):
+    return sessionmaker(bind=create_engine(f"sqlite:///{async_db_path}"))
+
+
+def _runner(session_factory, reader=read_text_layer):
+    return OCRJobRunner(session_factory, page_reader=reader, page_counter=count_pages,
+                        page_executor=ThreadPoolExecutor(2))
+
+
+def test_job_reads_every_page_and_finalises(session_factory, sheet):
+    runner = _runner(session_factory)
+    with session_factory() as db:
+        job_id = runner.create_job(db, "test-sheet", sheet, {"paper_number": 3}).job_id
+    runner.shutdown(wait=True)
+
+    snapshot = runner.get(job_id)
+    assert snapshot["status"] == "done"
+    assert snapshot["pages_done"] == snapshot["pages_total"] == 3
+    assert [a["question_number"] for a in snapshot["result"]["answers"]] == [1, 2, 3, 4, 5]
+    assert snapshot["result"]["paper_number"] == 3
+    assert not os.path.exists(sheet)   # input is removed unless the kind keeps it
+
+
+def test_unfinished_job_resumes_from_last_page(session_factory, sheet):
+    with session_factory() as db:
+        db.add(OCRJob(job_id="resume-me", kind="test-sheet", status="running", file_path=sheet,
+                      params_json={}, pages_total=3, pages_done=1,
+                      page_results_json=[{"page": 0, "answers": read_text_layer(sheet, 0)}]))
+        db.commit()
+
+    read = []
+    runner = _runner(session_factory, reader=lambda path, i: read.append(i) or read_text_layer(path, i))
+    assert runner.resume_pending() == 1
+    runner.shutdown(wait=True)
+
+    assert sorted(read) == [1, 2]
+    assert len(runner.get("resume-me")["result"]["answers"]) == 5
+
+
+def test_failed_page_marks_job_failed(session_factory, sheet):
+    def broken(path, i):
+        raise RuntimeError("tesseract exploded")
+
+    runner = _runner(session_factory, reader=broken)
+    with session_factory() as db:
+        job_id = runner.create_job(db, "test-sheet", sheet, {}).job_id
+    runner.shutdown(wait=True)
+
+    snapshot = runner.get(job_id)
+    assert snapshot["status"] == "failed"
+    assert "tesseract exploded" in snapshot["error"]
+
+
+def test_stream_emits_pages_then_outcome(session_factory, sheet, monkeypatch):
+    runner = _runner(session_factory)
+    monkeypatch.setattr(ocr_job_routes, "ocr_jobs", runner)
+    app = FastAPI()
+    app.include_router(ocr_job_routes.router)
+    client = TestClient(app)
+
+    with session_factory() as db:
+        job_id = runner.create_job(db, "test-sheet", sheet, {}).job_id
+    res = client.get(f"/ocr/jobs/{job_id}/stream")
+    events = [json.loads(line) for line in res.text.splitlines()]
+    assert [e["event"] for e in events] == ["page", "page", "page", "done"]
+    assert sorted(e["page"] for e in events[:3]) == [0, 1, 2]
+    assert client.get("/ocr/jobs/missing").status_code == 404
+    runner.shutdown(wait=True)
+
+
+def test_stage_upload_counts_pages_before_persisting(sheet, tmp_path, monkeypatch):
+    import io
+    monkeypatch.setattr(ocr_jobs_module, "OCR_JOBS_DIR", str(tmp_path / "jobs"))
+    data = open(sheet, "rb").read()
+    path, pages_total = stage_upload(io.BytesIO(data), "scan.pdf")
+    assert pages_total == 3
+    assert path.endswith(".pdf") and open(path, "rb").read() == data
+
+    with pytest.raises(ValueError):
+        stage_upload(b"not a pdf", "scan.pdf")
+    assert os.listdir(tmp_path / "jobs") == [os.path.basename(path)]
+
+
+def test_only_one_worker_resumes_a_job(session_factory, sheet):
+    stale = datetime.utcnow() - timedelta(seconds=ocr_jobs_module.OCR_JOB_TIMEOUT_SECONDS + 60)
+    with session_factory() as db:
+        db.add_all([
+            OCRJob(job_id="orphan", kind="test-sheet", status="running", file_path=sheet, params_json={},
+                   page_results_json=[]),
+            OCRJob(job_id="dead-owner", kind="test-sheet", status="running", owner="gone:1:x", file_path=sheet,
+                   params_json={}, page_results_json=[], updated_at=stale),
+            OCRJob(job_id="live-owner", kind="test-sheet", status="running", owner="busy:2:y", file_path=sheet,
+                   params_json={}, page_results_json=[]),
+        ])
+        db.commit()
+
+    read = []
+    workers = [_runner(session_factory, reader=lambda path, i: read.append(i) or read_text_layer(path, i))
+               for _ in range(2)]
+    assert sum(worker.resume_pending() for worker in workers) == 2
+    for worker in workers:
+        worker.shutdown(wait=True)
+
+    assert sorted(read) == [0, 0, 1, 1, 2, 2]        # each claimed job read once
+    assert [workers[0].get(j)["status"] for j in ("orphan", "dead-owner", "live-owner")] == ["done", "done",
+                                                                                            "running"]
+
+
+def test_unstarted_jobs_are_released_at_shutdown(session_factory, sheet):
+    runner = _runner(session_factory)
+    runner.submit = lambda job_id: None               # accepted, but shut down before it starts
+    with session_factory() as db:
+        job_id = runner.create_job(db, "test-sheet", sheet, {}).job_id
+    runner.shutdown(wait=True)
+
+    with session_factory() as db:
+        assert db.query(OCRJob).filter_by(job_id=job_id).one().owner is None
+    successor = _runner(session_factory)
+    assert successor.resume_pending() == 1
+    successor.shutdown(wait=True)
+    assert successor.get(job_id)["status"] == "done"
+
+
+def test_check_upload_does_its_blocking_work_off_the_event_loop(session_factory, sheet, tmp_path, monkeypatch):
+    from routers import grammar_paper_routes
+    on_loop = []
+
+    def creating(db, *args, **kwargs):        # commits, like the paper lookup before it blocks
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return create_job(db, *args, **kwargs)
+
+    def get_test_db():
+        with session_factory() as db:
+            yield db
+
+    runner = _runner(session_factory)
+    runner.submit = lambda job_id: None
+    create_job, runner.create_job = runner.create_job, creating
+    monkeypatch.setattr(grammar_paper_routes, "ocr_jobs", runner)
+    monkeypatch.setattr(ocr_jobs_module, "OCR_JOBS_DIR", str(tmp_path / "jobs"))
+    with session_factory() as db:
+        db.add(GrammarPaper(paper_number=1, title="Paper 1", questions_json=[]))
+        db.commit()
+    app = FastAPI()
+    app.include_router(grammar_paper_routes.router, prefix="/grammar")
+    app.dependency_overrides[get_db] = get_test_db
+
+    with open(sheet, "rb") as f:
+        res = TestClient(app).post("/grammar/papers/1/check-upload", files={"file": ("scan.pdf", f)})
+    assert res.status_code == 202 and runner.get(res.json()["job_id"])["kind"] == "grammar-check"
+    assert on_loop == [False]
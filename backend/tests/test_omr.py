@@ -0,0 +1,80 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cv2
+import numpy as np
+import pytest
+
+from utils.omr import GRAMMAR_SHEET, find_registration_marks, read_answer_sheet
+
+PX_PER_MM = 150 / 25.4    # a 150 DPI scan
+
+
+def draw_sheet(marked: dict, layout=GRAMMAR_SHEET) -> np.ndarray:
+    """Render the sheet layout as a scan would see it, with `marked` {question: [labels]} filled in."""
+    w, h = (int(v * PX_PER_MM) for v in layout.page_mm)
+    img = np.full((h, w), 255, np.uint8)
+    px = lambda mm: int(round(mm * PX_PER_MM))
+    for x, y in layout.mark_origins():
+        cv2.rectangle(img, (px(x), px(y)), (px(x + layout.mark_mm), px(y + layout.mark_mm)), 0, -1)
+    # QR-style hollow finder pattern near the top-right mark must not be mistaken for one
+    cv2.rectangle(img, (px(160), px(22)), (px(166), px(28)), 0, px(0.8))
+    cv2.rectangle(img, (px(162), px(24)), (px(164), px(26)), 0, -1)
+
+    radius = px(layout.bubble_mm / 2)
+    for q, row in enumerate(layout.bubble_centres()):
+        for label, (cx, cy) in zip(layout.options, row):
+            centre = (px(cx), px(cy))
+            cv2.circle(img, centre, radius, 120, 1)
+            cv2.putText(img, label, (centre[0] - radius // 2, centre[1] + radius // 2),
+                        cv2.FONT_HERSHEY_PLAIN, 0.8, 170, 1)
+            if label in marked.get(q + 1, []):
+                cv2.circle(img, centre, radius - 2, 30, -1)
+    return img
+
+
+def skew(img: np.ndarray, angle=2.5, seed=0) -> np.ndarray:
+    h, w = img.shape
+    rotation = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 0.97)
+    img = cv2.warpAffine(img, rotation, (w, h), borderValue=255)
+    src = np.float32([[0, 0], [w, 0], [0, h], [w, h]])
+    dst = np.float32([[8, 4], [w - 2, 10], [0, h - 6], [w - 12, h]])
+    img = cv2.warpPerspective(img, cv2.getPerspectiveTransform(src, dst), (w, h), borderValue=255)
+    noise = np.random.default_rng(seed).normal(0, 12, img.shape)
+    return np.clip(img + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture(scope="module")
+def expected():
+    rng = np.random.default_rng(7)
+    return {q: [str(rng.choice(GRAMMAR_SHEET.options))] for q in range(1, 51) if q not in (13, 27)}
+
+
+def test_reads_skewed_scan(expected):
+    scan = skew(draw_sheet(expected))
+    assert find_registration_marks(scan) is not None
+
+    result = read_answer_sheet(scan)
+    assert result.registered
+    answers = {a["question_number"]: a["answer"] for a in result.answers}
+    assert all(answers[q] == labels[0] for q, labels in expected.items())
+    assert answers[13] == answers[27] == ""
+    assert min(a["confidence"] for a in result.answers) > 0.5
+
+
+def test_double_mark_has_low_confidence(expected):
+    marked = {**expected, 5: ["A", "C"]}
+    result = read_answer_sheet(skew(draw_sheet(marked), angle=-1.5, seed=3))
+    q5 = result.answers[4]
+    assert q5["answer"] in ("A", "C")
+    assert q5["confidence"] < 0.3
+
+
+def test_template_places_bubbles_from_layout():
+    from routers.grammar_paper_routes import ANSWER_SHEET_TEMPLATE
+    html = ANSWER_SHEET_TEMPLATE.render(title="Paper 1", sheet=GRAMMAR_SHEET, qr_img="")
+    assert html.count('class="bubble"') == GRAMMAR_SHEET.num_questions * len(GRAMMAR_SHEET.options)
+    assert html.count('class="mark"') == 4
+    first = GRAMMAR_SHEET.template_rows()[0]["bubbles"][0]
+    assert f'left: {first["x"]}mm; top: {first["y"]}mm;' in html
@@ -0,0 +1,114 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+from datetime import datetime, timedelta
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database import get_db
+from model import GeneratedProblem, User, UserLog
+from routers import attempt_routes, fmc_routes, user_routes
+
+
+def _client(override_get_db, *routers):
+    app = FastAPI()
+    for router in routers:
+        app.include_router(router.router)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def _pages(client, url, **params):
+    seen, cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return seen
+
+
+def _logs(db_session_factory, count):
+    with db_session_factory() as db:
+        db.add_all(UserLog(user_id=1, action=f"action{i}") for i in range(count))
+        db.commit()
+
+
+def test_pages_cover_every_row_newest_first(override_get_db, db_session_factory):
+    _logs(db_session_factory, 23)
+    client = _client(override_get_db, user_routes)
+
+    first = client.get("/admin/user-logs", params={"limit": 10})
+    assert len(first.json()) == 10 and "X-Next-Cursor" in first.headers
+    ids = [log["id"] for log in _pages(client, "/admin/user-logs", limit=10)]
+    assert ids == list(range(23, 0, -1))
+
+
+def test_rows_inserted_while_paging_do_not_shift_pages(override_get_db, db_session_factory):
+    _logs(db_session_factory, 6)
+    client = _client(override_get_db, user_routes)
+
+    first = client.get("/admin/user-logs", params={"limit": 3})
+    _logs(db_session_factory, 4)
+    rest = _pages(client, "/admin/user-logs", limit=3, cursor=first.headers["X-Next-Cursor"])
+    assert [log["id"] for log in first.json() + rest] == [6, 5, 4, 3, 2, 1]
+
+
+def test_composite_key_breaks_timestamp_ties(override_get_db, db_session_factory):
+    created = datetime(2026, 10, 1, 12, 0)
+    with db_session_factory() as db:
+        db.add_all(GeneratedProblem(user_name="ana", question=f"q{i}", answer="1", operation="fmc",
+                                    created_at=created - timedelta(minutes=i // 3)) for i in range(8))
+        db.add(GeneratedProblem(user_name="ben", question="other", answer="1", operation="fmc", created_at=created))
+        db.commit()
+    client = _client(override_get_db, fmc_routes)
+
+    history = _pages(client, "/fmc/history/ana", limit=2)
+    assert sorted(p["question"] for p in history) == sorted(f"q{i}" for i in range(8))
+    assert [p["created_at"] for p in history] == sorted((p["created_at"] for p in history), reverse=True)
+
+
+def test_ndjson_streams_everything_after_the_cursor(override_get_db, db_session_factory):
+    _logs(db_session_factory, 7)
+    client = _client(override_get_db, user_routes)
+
+    everything = client.get("/admin/user-logs", params={"format": "ndjson"})
+    assert everything.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in everything.text.splitlines()] == [7, 6, 5, 4, 3, 2, 1]
+
+    cursor = client.get("/admin/user-logs", params={"limit": 2}).headers["X-Next-Cursor"]
+    rest = client.get("/admin/user-logs", params={"format": "ndjson", "cursor": cursor})
+    assert [json.loads(line)["id"] for line in rest.text.splitlines()] == [5, 4, 3, 2, 1]
+
+
+def test_inactive_users_hide_passwords_and_reject_bad_cursors(override_get_db, db_session_factory):
+    with db_session_factory() as db:
+        db.add_all(User(username=f"user{i}", email=f"user{i}@example.com", password="secret", is_active=i % 2 == 0)
+                   for i in range(5))
+        db.commit()
+    client = _client(override_get_db, user_routes)
+
+    users = _pages(client, "/admin/inactive-users", limit=1)
+    assert [u["username"] for u in users] == ["user1", "user3"]
+    assert all("password" not in u for u in users)
+    assert client.get("/admin/inactive-users", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/admin/inactive-users", params={"limit": 0}).status_code == 422
+
+
+def test_attempt_stats_are_newest_first_and_filtered_on_the_server(override_get_db, db_session_factory):
+    with db_session_factory() as db:
+        db.add_all(User(username=name, email=f"{name}@example.com", password="x") for name in ("Ana", "ben"))
+        db.commit()
+    client = _client(override_get_db, attempt_routes)
+    for name, operation in [("Ana", "addition"), ("ben", "addition"), ("Ana", "division"), ("Ana", "addition")]:
+        client.post("/attempts/record", json={"user_name": name, "operation": operation, "level": 1, "score": 5,
+                                              "total_questions": 10, "is_passed": False})
+
+    newest = client.get("/attempts/stats", params={"limit": 2})
+    assert [(a["user_name"], a["operation"]) for a in newest.json()] == [("Ana", "addition"), ("Ana", "division")]
+    filtered = _pages(client, "/attempts/stats", user_name="an", operation="addition", limit=1)
+    assert [(a["user_name"], a["attempt_number"]) for a in filtered] == [("Ana", 2), ("Ana", 1)]
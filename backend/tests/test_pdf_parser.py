@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+from utils.pdf_parser import count_pages, iter_page_images, parse_answers, render_page_gray
+
+
+def _pdf(path, pages=3):
+    c = canvas.Canvas(str(path), pagesize=A4)
+    for i in range(pages):
+        c.setFont("Helvetica", 40)
+        c.drawString(100, 700, f"Q{i + 1}: B")
+        c.showPage()
+    c.save()
+    return str(path)
+
+
+def test_pages_stream_as_grayscale_arrays(tmp_path):
+    path = _pdf(tmp_path / "sheet.pdf")
+    pages = iter_page_images(path, dpi=100)
+    index, first = next(pages)          # later pages are not rendered yet
+    assert index == 0
+    assert first.dtype == np.uint8 and first.ndim == 2
+    assert np.allclose(first.shape, (297 / 25.4 * 100, 210 / 25.4 * 100), atol=1)
+    assert first.min() < 128 < first.max()   # the text is there
+    assert [i for i, _ in pages] == [1, 2]
+
+
+def test_single_page_render_matches_stream(tmp_path):
+    path = _pdf(tmp_path / "sheet.pdf")
+    assert count_pages(path) == 3
+    streamed = dict(iter_page_images(path, dpi=72))
+    assert np.array_equal(render_page_gray(path, 2, dpi=72), streamed[2])
+
+
+def test_parse_answers():
+    assert parse_answers("Q1: b\n2. C\nq3-d") == [
+        {"question_number": 1, "answer": "B"},
+        {"question_number": 2, "answer": "C"},
+        {"question_number": 3, "answer": "D"},
+    ]
+
+
+def test_upload_sources_need_no_temp_file(tmp_path):
+    import io
+    import tempfile
+    data = open(_pdf(tmp_path / "sheet.pdf", pages=2), "rb").read()
+    spooled = tempfile.SpooledTemporaryFile()     # what UploadFile.file is
+    spooled.write(data)
+    expected = render_page_gray(data, 1, dpi=72)
+    for source in (memoryview(data), io.BytesIO(data), spooled):
+        assert count_pages(source) == 2
+        assert np.array_equal(render_page_gray(source, 1, dpi=72), expected)
@@ -0,0 +1,119 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import random
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database import get_db
+from model import LevelAttempt, UserProgressCache
+from routers import progress_routes, results, user_routes
+from services import progress
+from services.attempt_counters import next_attempt_number
+from services.attempts import record_level_attempt
+from services.progress import by_level, progress_summary
+
+
+def _record(db, user, operation, level, score):
+    record_level_attempt(db, LevelAttempt(
+        user_id=user.id, user_name=user.username, operation=operation, level=level,
+        attempt_number=next_attempt_number(db, user.id, operation, level),
+        score=score, total_questions=10, is_passed=score >= 8))
+    db.commit()
+
+
+def _statements(engine):
+    executed = []
+    event.listen(engine, "before_cursor_execute", lambda *args: executed.append(args[2]))
+    return executed
+
+
+def test_summary_matches_attempts_and_is_served_from_cache(db_engine, db_session_factory, user):
+    rng = random.Random(3)
+    expected = {}
+    with db_session_factory() as db:
+        for _ in range(60):
+            key = (rng.choice(["addition", "division"]), rng.randint(0, 3))
+            score = rng.randint(0, 10)
+            _record(db, user, *key, score)
+            attempts, best = expected.get(key, (0, 0))
+            expected[key] = (attempts + 1, max(best, score))
+
+        summary = progress_summary(db, user.id)
+        assert {(r["operation"], r["level"]): (r["attempts"], r["best_score"]) for r in summary} == expected
+
+        executed = _statements(db_engine)
+        assert progress_summary(db, user.id) == summary
+        assert len(executed) == 1 and "user_progress_cache" in executed[0]
+
+
+def test_recording_an_attempt_invalidates_the_summary(db_session_factory, user):
+    with db_session_factory() as db:
+        _record(db, user, "addition", 1, 5)
+        assert progress_summary(db, user.id)[0]["attempts"] == 1
+        _record(db, user, "addition", 1, 9)
+        assert progress_summary(db, user.id) == [
+            {"operation": "addition", "level": 1, "attempts": 2, "best_score": 9}]
+
+
+def test_rebuild_racing_an_attempt_is_not_cached(db_session_factory, user, monkeypatch):
+    build_summary = progress.build_summary
+
+    def build_then_attempt(db, user_id):
+        summary = build_summary(db, user_id)
+        with db_session_factory() as other:
+            _record(other, user, "addition", 2, 7)
+        return summary
+
+    with db_session_factory() as db:
+        _record(db, user, "addition", 1, 5)
+        monkeypatch.setattr(progress, "build_summary", build_then_attempt)
+        assert len(progress_summary(db, user.id)) == 1
+        monkeypatch.setattr(progress, "build_summary", build_summary)
+
+        cache = db.get(UserProgressCache, user.id)
+        assert cache.built_version != cache.version
+        assert len(progress_summary(db, user.id)) == 2
+
+
+def test_by_level_merges_operations():
+    summary = [{"operation": "addition", "level": 1, "attempts": 2, "best_score": 6},
+               {"operation": "division", "level": 1, "attempts": 1, "best_score": 9},
+               {"operation": "division", "level": 2, "attempts": 4, "best_score": 3}]
+    assert by_level(summary) == [{"level": 1, "attempts": 3, "best_score": 9},
+                                 {"level": 2, "attempts": 4, "best_score": 3}]
+    assert by_level(summary, "addition") == [{"level": 1, "attempts": 2, "best_score": 6}]
+
+
+def test_progress_and_profile_routes(override_get_db, db_session_factory, user):
+    with db_session_factory() as db:
+        _record(db, user, "addition", 0, 8)
+        _record(db, user, "subtraction", 0, 6)
+    app = FastAPI()
+    app.include_router(progress_routes.router)
+    app.include_router(user_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    assert client.get(f"/progress/{user.id}").json() == {"progress": [{"level": 0, "attempts": 2, "best_score": 8}]}
+    assert client.get(f"/progress/{user.id}", params={"operation": "subtraction"}).json()["progress"][0][
+        "best_score"] == 6
+    profile = client.get(f"/user/profile/{user.id}").json()
+    assert [(p["operation"], p["attempts"]) for p in profile["progress"]] == [("addition", 1), ("subtraction", 1)]
+
+
+def test_results_progress_keeps_per_attempt_rows(override_get_db, db_session_factory, user):
+    with db_session_factory() as db:
+        _record(db, user, "addition", 0, 8)
+        _record(db, user, "addition", 0, 6)
+    app = FastAPI()
+    app.include_router(results.router)
+    app.dependency_overrides[get_db] = override_get_db
+
+    account = TestClient(app).get(f"/progress/{user.id}").json()
+    assert [(a["attempt_number"], a["score"]) for a in account["attempts"]] == [(1, 8), (2, 6)]
+    assert all(a["date"] for a in account["attempts"])
+    assert account["summary"] == [{"operation": "addition", "level": 0, "attempts": 2, "best_score": 8}]
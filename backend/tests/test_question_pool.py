@@ -0,0 +1,72 @@
+import sys
+import os
+import itertools
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from services.question_pool import QuestionPool
+
+
+def _counter_generator():
+    counter = itertools.count()
+    return lambda key: f"{key}-{next(counter)}"
+
+
+def _wait_for_depth(pool, key, depth, timeout=5.0):
+    deadline = time.time() + timeout
+    while pool.depth(key) < depth and time.time() < deadline:
+        time.sleep(0.01)
+    return pool.depth(key)
+
+
+def test_take_falls_back_to_sync_generation_when_empty():
+    pool = QuestionPool("test", _counter_generator(), target_size=50, low_water=20)
+    try:
+        items = pool.take("a", 10)
+        assert len(items) == 10
+        assert len(set(items)) == 10
+        assert pool.stats()["keys"]["a"]["misses"] == 10
+    finally:
+        pool.stop()
+
+
+def test_background_refill_serves_from_pool():
+    pool = QuestionPool("test", _counter_generator(), target_size=50, low_water=20)
+    try:
+        pool.prime(["a"])
+        assert _wait_for_depth(pool, "a", 50) == 50
+        items = pool.take("a", 40)
+        assert len(set(items)) == 40
+        assert pool.stats()["keys"]["a"]["hits"] == 40
+        # dropped below the low-water mark, so the worker tops it back up
+        assert _wait_for_depth(pool, "a", 50) == 50
+    finally:
+        pool.stop()
+
+
+def test_low_entropy_generator_does_not_spin_forever():
+    pool = QuestionPool("test", lambda key: "same", target_size=10, low_water=5, max_attempts_factor=5)
+    try:
+        assert pool.take("a", 40) == ["same"]
+    finally:
+        pool.stop()
+
+
+def test_invalid_and_failing_items_are_skipped():
+    counter = itertools.count()
+
+    def flaky(key):
+        n = next(counter)
+        if n % 3 == 0:
+            raise ValueError("boom")
+        return "" if n % 3 == 1 else f"q{n}"
+
+    pool = QuestionPool("test", flaky, target_size=10, low_water=5, validate=bool)
+    try:
+        items = pool.take("a", 5)
+        assert len(items) == 5
+        assert all(items)
+        metrics = pool.stats()["keys"]["a"]
+        assert metrics["errors"] > 0 and metrics["rejected"] > 0
+    finally:
+        pool.stop()
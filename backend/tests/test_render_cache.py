@@ -0,0 +1,156 @@
+import sys
+import os
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+
+from services.render_cache import RenderCache, content_key, serve_cached_pdf
+
+
+def _writer(calls, size=100):
+    def write(path):
+        calls.append(path)
+        with open(path, "wb") as f:
+            f.write(b"%PDF" + b"x" * (size - 4))
+    return write
+
+
+def _renderer(calls, size=100):
+    write = _writer(calls, size)
+
+    async def render(path):
+        write(path)
+    return render
+
+
+def test_key_depends_on_template_version_and_content():
+    context = {"title": "Paper 1", "questions": [{"q": "1+1"}]}
+    key = content_key("grammar/question", 1, context)
+    assert key == content_key("grammar/question", 1, dict(reversed(list(context.items()))))
+    assert key != content_key("grammar/question", 2, context)
+    assert key != content_key("grammar/question", 1, {**context, "title": "Paper 2"})
+
+
+def test_second_request_is_served_from_disk(tmp_path):
+    cache = RenderCache(str(tmp_path), max_bytes=10_000)
+    calls = []
+    first = cache.get_or_create("abc", _writer(calls))
+    second = cache.get_or_create("abc", _writer(calls))
+    assert first == second and len(calls) == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["abc.pdf"]
+
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    cache = RenderCache(str(tmp_path), max_bytes=250)
+    calls = []
+    for key in ("a", "b"):
+        cache.get_or_create(key, _writer(calls))
+        old = time.time() - 100
+        os.utime(cache.path_for(key), (old, old))
+    cache.get_or_create("a", _writer(calls))       # hit refreshes "a"
+    cache.get_or_create("c", _writer(calls))       # over the cap: "b" goes
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.pdf", "c.pdf"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_matching_etag_gets_304_without_rendering(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    calls = []
+    app = FastAPI()
+
+    @app.get("/paper.pdf")
+    async def paper(request: Request):
+        return await serve_cached_pdf(request, "k1", "paper.pdf", _renderer(calls), cache=cache)
+
+    client = TestClient(app)
+    res = client.get("/paper.pdf")
+    assert res.status_code == 200 and res.content.startswith(b"%PDF")
+    etag = res.headers["etag"]
+
+    res = client.get("/paper.pdf", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    res = client.get("/paper.pdf", headers={"If-None-Match": '"other"'})
+    assert res.status_code == 200
+    assert len(calls) == 1
+
+
+def test_served_file_survives_eviction_mid_response(tmp_path):
+    cache = RenderCache(str(tmp_path), max_bytes=150)
+    app = FastAPI()
+
+    @app.get("/{key}.pdf")
+    async def paper(request: Request, key: str):
+        response = await serve_cached_pdf(request, key, "paper.pdf", _renderer([]), cache=cache)
+        for other in ("x", "y"):                     # other requests push the cache over its cap
+            cache.get_or_create(other, _writer([]))
+        return response
+
+    res = TestClient(app).get("/k1.pdf")
+    assert res.status_code == 200 and len(res.content) == 100 and res.content.startswith(b"%PDF")
+    assert not os.path.exists(cache.path_for("k1"))
+    assert "paper.pdf" in res.headers["content-disposition"]
+
+
+def test_pinned_key_is_not_evicted(tmp_path):
+    cache = RenderCache(str(tmp_path), max_bytes=50)
+    with cache.open("a", _writer([])) as f:
+        assert f.read(4) == b"%PDF"
+    assert os.path.exists(cache.path_for("a"))      # the only file, kept while it was being opened
+    cache.evict()
+    assert not os.path.exists(cache.path_for("a"))
+
+
+def test_concurrent_misses_render_once_and_failures_leave_nothing_behind(tmp_path):
+    cache = RenderCache(str(tmp_path), lock_stripes=4)
+    calls = []
+
+    def slow_write(path):
+        time.sleep(0.05)
+        _writer(calls)(path)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        paths = set(executor.map(lambda _: cache.get_or_create("same", slow_write), range(4)))
+    assert len(paths) == 1 and len(calls) == 1
+
+    def failing_write(path):
+        raise RuntimeError("render failed")
+
+    for i in range(100):
+        with pytest.raises(RuntimeError):
+            cache.get_or_create(f"broken{i}", failing_write)
+    assert len(cache._stripes) == 4 and sorted(p.name for p in tmp_path.iterdir()) == ["same.pdf"]
+
+
+def test_concurrent_async_misses_share_one_render_and_errors_reach_the_client(tmp_path):
+    cache = RenderCache(str(tmp_path))
+    calls = []
+
+    async def slow_render(path):
+        await asyncio.sleep(0.05)
+        _writer(calls)(path)
+
+    async def open_twice():
+        files = await asyncio.gather(*(cache.open_or_render("k", slow_render) for _ in range(3)))
+        for f in files:
+            f.close()
+
+    asyncio.run(open_twice())
+    assert len(calls) == 1 and cache.stats()["misses"] == 1 and not cache._rendering
+
+    app = FastAPI()
+
+    async def busy(path):
+        raise HTTPException(status_code=503, detail="PDF rendering is busy, please retry shortly")
+
+    @app.get("/busy.pdf")
+    async def paper(request: Request):
+        return await serve_cached_pdf(request, "busy", "paper.pdf", busy, cache=cache)
+
+    assert TestClient(app).get("/busy.pdf").status_code == 503
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["k.pdf"]
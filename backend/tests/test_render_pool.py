@@ -0,0 +1,47 @@
+import sys
+import os
+import asyncio
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+from fastapi import HTTPException
+
+from services.render_pool import RenderPool
+from utils.generate_pdf import draw_fmc_paper
+
+
+@pytest.fixture
+def pool():
+    pool = RenderPool(workers=1, queue_size=0, timeout=30, initializer=None)
+    yield pool
+    pool.shutdown()
+
+
+def test_reportlab_paper_renders_in_worker(pool, tmp_path):
+    path = str(tmp_path / "paper.pdf")
+    questions = [{"number": i + 1, "question": f"{i} + 1", "answer": str(i + 1)} for i in range(30)]
+    asyncio.run(pool.run(draw_fmc_paper, path, "p1", questions, True))
+    with open(path, "rb") as f:
+        assert f.read(4) == b"%PDF"
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_saturated_pool_returns_503_with_retry_after(pool):
+    busy = pool.submit(time.sleep, 1)
+    with pytest.raises(HTTPException) as exc:
+        pool.submit(time.sleep, 0)
+    assert exc.value.status_code == 503
+    assert "Retry-After" in exc.value.headers
+    busy.result()
+    pool.run_blocking(time.sleep, 0)   # slot is free again
+    assert pool.stats()["rejected"] == 1
+
+
+def test_slow_render_times_out_with_504(pool):
+    pool.start()
+    pool.timeout = 0.2
+    with pytest.raises(HTTPException) as exc:
+        pool.run_blocking(time.sleep, 2)
+    assert exc.value.status_code == 504
+    assert pool.stats()["timed_out"] == 1
@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from database import get_db
+from model import UserSeenFilter
+from routers import fmc_routes
+from services.seen_filter import SeenSet, load_seen, save_seen
+
+
+def test_added_questions_are_seen_with_few_false_positives():
+    seen = SeenSet(capacity=1000, fp_rate=0.01)
+    seen.update(f"Question {i}" for i in range(1000))
+    assert all(f"Question {i}" in seen for i in range(1000))
+    assert "  question 7 " in seen                      # normalised
+    false_positives = sum(f"Other {i}" in seen for i in range(10_000))
+    assert false_positives < 300                         # ~1% expected
+
+
+def test_generations_rotate_so_memory_stays_bounded():
+    seen = SeenSet(capacity=100)
+    size = len(seen.current.to_bytes())
+    seen.update(f"old {i}" for i in range(100))
+    seen.update(f"new {i}" for i in range(100))
+    assert "old 5" in seen and "new 5" in seen           # previous generation still counts
+    seen.add("newest")                                   # third generation pushes "old" out
+    assert "old 5" not in seen and "new 5" in seen
+    assert len(seen.current.to_bytes()) == len(seen.previous.to_bytes()) == size
+
+
+def test_round_trip_through_the_database(db_session_factory, user):
+    with db_session_factory() as db:
+        seen = load_seen(db, user.id, "fmc")
+        seen.update(["What is 2 + 2?", "What is 3 + 3?"])
+        save_seen(db, user.id, "fmc", seen)
+        db.commit()
+    with db_session_factory() as db:
+        assert "What is 2 + 2?" in load_seen(db, user.id, "fmc")
+        assert "What is 2 + 2?" not in load_seen(db, user.id, "other")
+        assert db.query(UserSeenFilter).count() == 1
+
+
+def test_consecutive_fmc_papers_do_not_repeat(override_get_db, user):
+    app = FastAPI()
+    app.include_router(fmc_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    first = client.get("/fmc/questions", params={"level": 1, "user_id": user.id}).json()
+    second = client.get("/fmc/questions", params={"level": 1, "user_id": user.id}).json()
+    assert len(first) == len(second) == fmc_routes.FMC_PAPER_SIZE
+    assert not {q["question"] for q in first} & {q["question"] for q in second}
@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+
+from database import get_db
+from model import GeneratedProblem, User, UserLog
+from routers import user_routes, word_problem_routes
+from services import write_buffer as write_buffer_module
+from services.write_buffer import WriteBuffer
+
+
+def _count(db_session_factory, model):
+    with db_session_factory() as db:
+        return db.scalar(select(func.count()).select_from(model))
+
+
+def _log(buffer, i):
+    buffer.add(UserLog, user_id=1, action=f"action{i}", timestamp=datetime(2026, 10, 18, 12, 0))
+
+
+def test_size_trigger_writes_one_insert_per_table(db_engine, db_session_factory):
+    buffer = WriteBuffer(session_factory=db_session_factory, batch_size=5, flush_seconds=3600)
+    inserts = []
+    event.listen(db_engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: inserts.append(statement) if statement.startswith("INSERT") else None)
+
+    for i in range(4):
+        _log(buffer, i)
+    assert _count(db_session_factory, UserLog) == 0 and buffer.depth() == 4
+    _log(buffer, 4)                                     # no flusher thread: the caller flushes
+    assert _count(db_session_factory, UserLog) == 5 and buffer.depth() == 0
+    assert len(inserts) == 1
+    assert buffer.stats()["flushes"] == 1 and buffer.stats()["rows_written"] == 5
+
+
+def test_flusher_thread_writes_on_the_timer_and_shutdown_drains(db_session_factory):
+    buffer = WriteBuffer(session_factory=db_session_factory, batch_size=1000, flush_seconds=0.05)
+    buffer.start()
+    _log(buffer, 0)
+    deadline = time.monotonic() + 5
+    # depth() drops to 0 as soon as the flush takes the rows, before its INSERT commits
+    while buffer.stats()["rows_written"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _count(db_session_factory, UserLog) == 1
+
+    buffer.flush_seconds = 3600
+    buffer.shutdown()
+    buffer.start()                                      # waits an hour before its first flush
+    _log(buffer, 1)
+    buffer.shutdown()
+    assert not buffer.running
+    assert _count(db_session_factory, UserLog) == 2 and buffer.stats()["last_flush_seconds"] is not None
+
+
+def test_failed_flush_keeps_rows_for_the_next_attempt(db_session_factory):
+    broken = True
+
+    def session_factory():
+        if broken:
+            raise RuntimeError("database unavailable")
+        return db_session_factory()
+
+    buffer = WriteBuffer(session_factory=session_factory, batch_size=2, flush_seconds=3600, max_pending=3)
+    for i in range(5):
+        _log(buffer, i)
+    stats = buffer.stats()
+    assert stats["failures"] >= 1 and stats["depth"] <= 3 and stats["dropped"] == 5 - stats["depth"]
+
+    broken = False
+    assert buffer.flush() == stats["depth"]
+    with db_session_factory() as db:
+        assert db.scalars(select(UserLog.action).order_by(UserLog.id)).all() == ["action2", "action3", "action4"]
+
+
+def test_routes_queue_rows_instead_of_committing(override_get_db, db_session_factory, monkeypatch):
+    buffer = WriteBuffer(session_factory=db_session_factory, batch_size=1000, flush_seconds=3600)
+    monkeypatch.setattr(word_problem_routes, "write_buffer", buffer)
+    monkeypatch.setattr(user_routes, "write_buffer", buffer)
+    with db_session_factory() as db:
+        db.add(User(username="ana", email="ana@example.com", password="x"))
+        db.commit()
+    app = FastAPI()
+    app.include_router(word_problem_routes.router)
+    app.include_router(user_routes.router)
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    problems = client.get("/word-problem", params={"user_name": "ana", "count": 4, "seed": 7}).json()["problems"]
+    assert client.delete("/user/delete/1").status_code == 200
+    assert buffer.depth() == 5 and _count(db_session_factory, GeneratedProblem) == 0
+
+    buffer.shutdown()
+    with db_session_factory() as db:
+        assert db.scalars(select(GeneratedProblem.question)).all() == [p["question"] for p in problems]
+        assert db.scalars(select(UserLog.action)).all() == ["deactivated"]
+
+
+def test_module_singleton_is_not_started_on_import():
+    assert not write_buffer_module.write_buffer.running
@@ -33,3 +33,21 @@ def create_pdf(file_path, questions):
             c.showPage()
             y = height - 50
     c.save()
+
+
+def draw_fmc_paper(pdf_path, paper_id, questions, show_answers=False):
+    """Module-level so the render worker processes can unpickle it."""
+    c = canvas.Canvas(pdf_path)
+    y = 800
+    c.drawString(50, y, f"Maths Challenge Paper ID: {paper_id}")
+    y -= 40
+    for q in questions:
+        c.drawString(50, y, f"{q['number']}. {q['question']}")
+        y -= 30
+        if show_answers:
+            c.drawString(70, y, f"Answer: {q['answer']}")
+            y -= 20
+        if y < 100:
+            c.showPage()
+            y = 800
+    c.save()
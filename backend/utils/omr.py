@@ -0,0 +1,204 @@
+"""
+Optical mark recognition for the grammar answer sheet.
+
+The sheet is printed from a fixed layout (SheetLayout, in millimetres from the
+page's top-left corner) with a solid registration square in each corner. To
+read a scan we:
+
+  1. find the four registration squares,
+  2. warp the page onto the layout's coordinate system (deskew + perspective),
+  3. measure the dark-pixel ratio inside every bubble at once with array
+     indexing, and
+  4. pick the darkest bubble per question, with a confidence from how clearly
+     it beats the runner-up.
+
+The same layout object drives the answer-sheet template, so printing and
+reading can't drift apart.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+import cv2
+import numpy as np
+
+# Warped sheet resolution; 4 px/mm (~100 DPI) is plenty for 6 mm bubbles
+PX_PER_MM = 4.0
+# Fraction of a bubble that must be dark to count as filled
+FILL_THRESHOLD = 0.45
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    page_mm: tuple = (210.0, 297.0)           # A4
+    mark_mm: float = 8.0                      # registration square side
+    mark_margin_mm: float = 10.0              # page edge -> square
+    num_questions: int = 50
+    rows_per_column: int = 25
+    column_x_mm: tuple = (25.0, 115.0)        # left edge of each column's question number
+    first_row_y_mm: float = 72.0
+    row_pitch_mm: float = 8.0
+    bubble_offset_mm: float = 16.0            # question number -> first bubble centre
+    bubble_pitch_mm: float = 12.0
+    bubble_mm: float = 6.0                    # bubble diameter
+    options: tuple = ('A', 'B', 'C', 'D')
+
+    def mark_origins(self) -> list[tuple[float, float]]:
+        """Top-left corner of each registration square: TL, TR, BL, BR."""
+        w, h = self.page_mm
+        near, far_x, far_y = self.mark_margin_mm, w - self.mark_margin_mm - self.mark_mm, h - self.mark_margin_mm - self.mark_mm
+        return [(near, near), (far_x, near), (near, far_y), (far_x, far_y)]
+
+    def mark_centres(self) -> np.ndarray:
+        return np.array(self.mark_origins()) + self.mark_mm / 2
+
+    def bubble_centres(self) -> np.ndarray:
+        """(num_questions, len(options), 2) array of bubble centres in mm as (x, y)."""
+        q = np.arange(self.num_questions)
+        col, row = np.divmod(q, self.rows_per_column)
+        x0 = np.asarray(self.column_x_mm)[col] + self.bubble_offset_mm
+        y = self.first_row_y_mm + row * self.row_pitch_mm
+        xs = x0[:, None] + np.arange(len(self.options))[None, :] * self.bubble_pitch_mm
+        ys = np.broadcast_to(y[:, None], xs.shape)
+        return np.stack([xs, ys], axis=-1)
+
+    def template_rows(self) -> list[dict]:
+        """Positions for the answer-sheet template (all in mm)."""
+        centres = self.bubble_centres()
+        r = self.bubble_mm / 2
+        return [
+            {
+                'number': i + 1,
+                'x': round(float(centres[i, 0, 0]) - self.bubble_offset_mm, 2),
+                'y': round(float(centres[i, 0, 1]) - r, 2),
+                'bubbles': [
+                    {'label': label, 'x': round(float(cx) - r, 2), 'y': round(float(cy) - r, 2)}
+                    for label, (cx, cy) in zip(self.options, centres[i])
+                ],
+            }
+            for i in range(self.num_questions)
+        ]
+
+
+GRAMMAR_SHEET = SheetLayout()
+
+
+@dataclass
+class OMRResult:
+    answers: list            # [{question_number, answer ('' if blank), confidence}]
+    fill: np.ndarray         # (num_questions, len(options)) dark-pixel ratios
+    registered: bool         # False if the marks weren't found and the page was only scaled
+
+
+# ---------------------------------------------------------------------------
+# Registration
+# ---------------------------------------------------------------------------
+def find_registration_marks(gray: np.ndarray, layout: SheetLayout = GRAMMAR_SHEET) -> Optional[np.ndarray]:
+    """
+    Centres (TL, TR, BL, BR) of the four solid corner squares in image pixels,
+    or None if any is missing. QR finder patterns are hollow, so the
+    dark-pixel check rules them out.
+    """
+    h, w = gray.shape
+    px_per_mm = w / layout.page_mm[0]
+    expected_area = (layout.mark_mm * px_per_mm) ** 2
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    candidates = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if not 0.4 * expected_area <= area <= 2.5 * expected_area:
+            continue
+        (cx, cy), (rw, rh), _ = cv2.minAreaRect(contour)
+        if min(rw, rh) == 0 or max(rw, rh) / min(rw, rh) > 1.3 or area / (rw * rh) < 0.85:
+            continue
+        # share of dark pixels inside the outline (contourArea ignores holes)
+        x, y, bw, bh = cv2.boundingRect(contour)
+        mask = np.zeros((bh, bw), np.uint8)
+        cv2.drawContours(mask, [contour - [x, y]], -1, 1, thickness=-1)
+        if (binary[y:y + bh, x:x + bw][mask == 1] > 0).mean() < 0.85:
+            continue
+        candidates.append((cx, cy))
+    if len(candidates) < 4:
+        return None
+
+    points = np.array(candidates)
+    corners = np.array([[0, 0], [w, 0], [0, h], [w, h]], dtype=float)
+    # nearest candidate to each page corner
+    distances = np.linalg.norm(points[None, :, :] - corners[:, None, :], axis=-1)
+    chosen = distances.argmin(axis=1)
+    if len(set(chosen.tolist())) < 4:
+        return None
+    return points[chosen]
+
+
+def register_sheet(gray: np.ndarray, layout: SheetLayout = GRAMMAR_SHEET) -> tuple[np.ndarray, bool]:
+    """Warp a scan onto the layout grid at PX_PER_MM. Falls back to plain scaling without marks."""
+    size = (int(round(layout.page_mm[0] * PX_PER_MM)), int(round(layout.page_mm[1] * PX_PER_MM)))
+    marks = find_registration_marks(gray, layout)
+    if marks is None:
+        return cv2.resize(gray, size, interpolation=cv2.INTER_AREA), False
+    target = (layout.mark_centres() * PX_PER_MM).astype(np.float32)
+    matrix = cv2.getPerspectiveTransform(marks.astype(np.float32), target)
+    warped = cv2.warpPerspective(gray, matrix, size, flags=cv2.INTER_AREA, borderValue=255)
+    return warped, True
+
+
+# ---------------------------------------------------------------------------
+# Bubble sampling
+# ---------------------------------------------------------------------------
+def _disk_offsets(radius_px: float) -> np.ndarray:
+    r = int(np.ceil(radius_px))
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    inside = dx ** 2 + dy ** 2 <= radius_px ** 2
+    return np.stack([dx[inside], dy[inside]], axis=-1)    # (k, 2)
+
+
+def bubble_fill(warped: np.ndarray, layout: SheetLayout = GRAMMAR_SHEET) -> np.ndarray:
+    """Dark-pixel ratio inside each bubble, shape (num_questions, len(options))."""
+    _, dark = cv2.threshold(warped, 0, 1, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    # sample inside the printed outline so the ring itself doesn't count
+    offsets = _disk_offsets(layout.bubble_mm / 2 * PX_PER_MM * 0.75)
+    centres = np.rint(layout.bubble_centres() * PX_PER_MM).astype(int)            # (q, o, 2)
+    points = centres[:, :, None, :] + offsets[None, None, :, :]                     # (q, o, k, 2)
+    xs = np.clip(points[..., 0], 0, dark.shape[1] - 1)
+    ys = np.clip(points[..., 1], 0, dark.shape[0] - 1)
+    return dark[ys, xs].mean(axis=-1)
+
+
+def decide(fill: np.ndarray, layout: SheetLayout = GRAMMAR_SHEET, threshold: float = FILL_THRESHOLD) -> list[dict]:
+    order = np.argsort(fill, axis=1)
+    best = order[:, -1]
+    rows = np.arange(len(fill))
+    top, runner_up = fill[rows, best], fill[rows, order[:, -2]]
+    marked = top >= threshold
+    # clear winner -> 1.0; two equally dark bubbles -> 0.0
+    confidence = np.where(marked, (top - runner_up) / np.maximum(top, 1e-6),
+                          1.0 - top / threshold)
+    options = np.asarray(layout.options)
+    return [
+        {
+            'question_number': i + 1,
+            'answer': str(options[best[i]]) if marked[i] else '',
+            'confidence': round(float(np.clip(confidence[i], 0.0, 1.0)), 3),
+        }
+        for i in range(len(fill))
+    ]
+
+
+def read_answer_sheet(gray: np.ndarray, layout: SheetLayout = GRAMMAR_SHEET,
+                      threshold: float = FILL_THRESHOLD) -> OMRResult:
+    """Read every bubble on a grayscale (uint8) scan of the answer sheet."""
+    # Contour search on a 300 DPI scan is wasted work; ~8 px/mm keeps the marks crisp
+    scale = layout.page_mm[0] * PX_PER_MM * 2 / gray.shape[1]
+    if scale < 1:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    warped, registered = register_sheet(gray, layout)
+    fill = bubble_fill(warped, layout)
+    return OMRResult(decide(fill, layout, threshold), fill, registered)
+
+
+def read_sheet_page(path: str, page_index: int) -> list[dict]:
+    """OCR-job page reader: rasterise one page of an upload and read its bubbles."""
+    from utils.pdf_parser import render_page_gray
+    return read_answer_sheet(render_page_gray(path, page_index, dpi=150)).answers
@@ -0,0 +1,127 @@
+"""
+Keyset pagination and NDJSON streaming for list endpoints.
+
+A list is ordered by a key of indexed columns that ends in the primary key,
+e.g. (created_at, id) or just (id,). The next page starts strictly after the
+last row's key values, so every page is a single index range read at any
+depth, and rows inserted while a client pages don't shift or repeat rows it
+has already seen. The key values travel as an opaque cursor (base64 JSON).
+
+The body stays a plain JSON array, so existing clients keep working and just
+get the first page. The cursor for the next page is sent in the
+X-Next-Cursor header and is absent on the last page:
+
+    GET /admin/user-logs?limit=100
+    GET /admin/user-logs?limit=100&cursor=<X-Next-Cursor>
+
+For exports, `format=ndjson` streams every row after the cursor, one JSON
+object per line. Rows are read from a server-side cursor in yield_per
+batches, so memory stays flat however large the table is.
+"""
+import base64
+import binascii
+import json
+import os
+from datetime import date, datetime
+from typing import Any, Callable, Iterator, Literal, Optional, Sequence
+
+from fastapi import HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, and_, inspect, or_
+from sqlalchemy.orm import Session
+
+PAGE_LIMIT_DEFAULT = int(os.getenv("PAGE_LIMIT_DEFAULT", "100"))
+PAGE_LIMIT_MAX = int(os.getenv("PAGE_LIMIT_MAX", "1000"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+ListFormat = Literal["json", "ndjson"]
+
+
+class PageParams:
+    """Query parameters shared by every paginated list: `page: PageParams = Depends()`."""
+
+    def __init__(self, cursor: Optional[str] = None,
+                 limit: int = Query(PAGE_LIMIT_DEFAULT, ge=1, le=PAGE_LIMIT_MAX),
+                 format: ListFormat = "json"):
+        self.cursor = cursor
+        self.limit = limit
+        self.format = format
+
+
+def row_dict(row, exclude: Sequence[str] = ()) -> dict:
+    """An ORM row's columns, JSON-ready."""
+    return jsonable_encoder({
+        attr.key: getattr(row, attr.key) for attr in inspect(row).mapper.column_attrs if attr.key not in exclude
+    })
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    plain = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(plain).encode()).decode()
+
+
+def decode_cursor(cursor: str, key: Sequence) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(key):
+            raise ValueError(cursor)
+        return [
+            datetime.fromisoformat(v) if v is not None and column.type.python_type is datetime else v
+            for column, v in zip(key, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, NotImplementedError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _after(key: Sequence, values: Sequence, descending: bool):
+    """Rows strictly after `values` in key order, as an OR of prefixes (index-friendly on MySQL and SQLite)."""
+    alternatives = []
+    for i, column in enumerate(key):
+        beyond = column < values[i] if descending else column > values[i]
+        alternatives.append(and_(*(key[j] == values[j] for j in range(i)), beyond))
+    return or_(*alternatives)
+
+
+def _ordered(stmt: Select, key: Sequence, cursor: Optional[str], descending: bool) -> Select:
+    if cursor:
+        stmt = stmt.where(_after(key, decode_cursor(cursor, key), descending))
+    return stmt.order_by(*(column.desc() if descending else column for column in key))
+
+
+def keyset_page(db: Session, stmt: Select, key: Sequence, response: Response, cursor: Optional[str] = None,
+                limit: int = PAGE_LIMIT_DEFAULT, descending: bool = False,
+                serialise: Callable[[Any], dict] = row_dict) -> list[dict]:
+    """One page of `stmt` (a select of one ORM entity); sets X-Next-Cursor when more rows follow."""
+    limit = max(1, min(limit, PAGE_LIMIT_MAX))
+    rows = db.scalars(_ordered(stmt, key, cursor, descending).limit(limit + 1)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor([getattr(rows[-1], column.key) for column in key])
+    return [serialise(row) for row in rows]
+
+
+def stream_ndjson(db: Session, stmt: Select, key: Sequence, cursor: Optional[str] = None,
+                  descending: bool = False, serialise: Callable[[Any], dict] = row_dict) -> StreamingResponse:
+    """Every row of `stmt` after `cursor`, streamed as NDJSON."""
+    stmt = _ordered(stmt, key, cursor, descending).execution_options(yield_per=STREAM_BATCH_SIZE)
+    bind = db.get_bind()
+
+    def lines() -> Iterator[str]:
+        # own session: the request's one is closed once the endpoint returns
+        with Session(bind=bind) as stream_db:
+            for row in stream_db.scalars(stmt):
+                yield json.dumps(serialise(row), ensure_ascii=False) + "\n"
+                stream_db.expunge(row)
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def list_response(db: Session, stmt: Select, key: Sequence, response: Response, page: PageParams,
+                  descending: bool = False, serialise: Callable[[Any], dict] = row_dict):
+    """A keyset page, or with format=ndjson a stream of everything after the cursor."""
+    if page.format == "ndjson":
+        return stream_ndjson(db, stmt, key, page.cursor, descending, serialise)
+    return keyset_page(db, stmt, key, response, page.cursor, page.limit, descending, serialise)
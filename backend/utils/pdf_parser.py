@@ -1,39 +1,79 @@
 import fitz  # PyMuPDF
-from pdf2image import convert_from_path
 import pytesseract
-import cv2
 import os
-import tempfile
-from PIL import Image
 import re
 import numpy as np
 import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-def extract_answers_from_pdf(pdf_path):
-    answers = []
+# Raster resolution for OCR. Pages are rendered one at a time, so peak memory is
+# a single grayscale page (~8.7 MB for A4 at 300 DPI) whatever the upload size.
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+
+# Extract pattern like: "Q1: Answer", "1. Answer", etc.
+ANSWER_PATTERN = re.compile(r'(?:Q|q)?\s?(\d+)[\:\.\-]?\s*([A-Ea-e])')
+
+
+def parse_answers(text):
+    return [
+        {'question_number': int(qno), 'answer': ans.upper()}
+        for qno, ans in ANSWER_PATTERN.findall(text)
+    ]
+
+
+def read_source(source):
+    """Bytes of an upload given as bytes, a memoryview or a file-like object (e.g. UploadFile.file)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    source.seek(0)
+    return source.read()
+
+
+def open_document(source):
+    """Open a PDF or image from a path, bytes, a memoryview or a file-like object."""
+    if isinstance(source, (str, os.PathLike)):
+        return fitz.open(source)
+    return fitz.open(stream=read_source(source))
+
+
+def count_pages(source):
+    with open_document(source) as doc:
+        return doc.page_count
+
 
-    with tempfile.TemporaryDirectory() as path:
-        # Convert PDF pages to images
-        pages = convert_from_path(pdf_path, dpi=300, output_folder=path)
-        
-        for page_num, page_image in enumerate(pages):
-            # Convert PIL image to OpenCV format
-            open_cv_image = cv2.cvtColor(np.array(page_image), cv2.COLOR_RGB2BGR)
-
-            # Optional: Preprocess image (blur, threshold etc.)
-            gray = cv2.cvtColor(open_cv_image, cv2.COLOR_BGR2GRAY)
-
-            # OCR to extract text
-            text = pytesseract.image_to_string(gray)
-
-            # Extract pattern like: "Q1: Answer", "1. Answer", etc.
-            matches = re.findall(r'(?:Q|q)?\s?(\d+)[\:\.\-]?\s*([A-Ea-e])', text)
-            for qno, ans in matches:
-                answers.append({
-                    'question_number': int(qno),
-                    'answer': ans.upper()
-                })
-
-    return answers
\ No newline at end of file
+def _page_to_gray(page, dpi):
+    """Rasterise straight into an 8-bit grayscale buffer — no RGB page, no PIL image."""
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+
+
+def render_page_gray(source, page_index, dpi=OCR_DPI):
+    """Rasterise one page (PDF or image) into a grayscale uint8 array."""
+    with open_document(source) as doc:
+        return _page_to_gray(doc[page_index], dpi)
+
+
+def iter_page_images(source, dpi=OCR_DPI):
+    """Yield (page_index, grayscale array) one page at a time, rendering the next only when asked."""
+    with open_document(source) as doc:
+        for page_index, page in enumerate(doc):
+            yield page_index, _page_to_gray(page, dpi)
+
+
+def ocr_image(gray):
+    return parse_answers(pytesseract.image_to_string(gray))
+
+
+def ocr_page(pdf_path, page_index, dpi=OCR_DPI):
+    """OCR a single page (0-based). Runs in the OCR worker processes, so keep it module-level."""
+    return ocr_image(render_page_gray(pdf_path, page_index, dpi))
+
+
+def extract_answers_from_pdf(source, dpi=OCR_DPI):
+    """`source` may be a path or the upload itself (bytes, memoryview, file-like) — no temp file needed."""
+    answers = []
+    # OCR starts on page 1 while later pages are still unrendered
+    for _, gray in iter_page_images(source, dpi):
+        answers.extend(ocr_image(gray))
+    return answers
@@ -3,6 +3,7 @@ import { CommonModule } from '@angular/common';
 import { FormsModule } from '@angular/forms';
 import { ProgressService, LevelAttempt } from '../../progress/progress.service';
 import { ActivatedRoute, Router, RouterModule } from '@angular/router';
+import { Subscription } from 'rxjs';
 
 @Component({
   selector: 'app-admin-dashboard',
@@ -11,27 +12,33 @@ import { ActivatedRoute, Router, RouterModule } from '@angular/router';
   templateUrl: './admin-dashboard.component.html'
 })
 export class AdminDashboardComponent implements OnInit {
-  allAttempts: LevelAttempt[] = [];
   filtered: LevelAttempt[] = [];
   filterUser: string = '';
   filterOp: string = '';
   operations: string[] = [];
+  nextCursor: string | null = null;
+  private loading?: Subscription;
 
   constructor(private progressService: ProgressService, private route: ActivatedRoute ) {}
 
   ngOnInit() {
-    this.progressService.getAllAttempts().subscribe(res => {
-      this.allAttempts = res;
-      this.filtered = res;
-      this.operations = [...new Set(res.map(a => a.operation))];  // ✅ unique ops
-    });
-    
+    this.applyFilter();
   }
 
+  // Filtering happens on the server, so it covers every attempt rather than the pages loaded so far
   applyFilter() {
-    this.filtered = this.allAttempts.filter(a =>
-      (!this.filterUser || a.user_name.toLowerCase().includes(this.filterUser.toLowerCase())) &&
-      (!this.filterOp || a.operation.toLowerCase() === this.filterOp.toLowerCase())
-    );
+    this.loading?.unsubscribe();   // typing fires a request per keystroke; only the latest may land
+    this.filtered = [];
+    this.nextCursor = null;
+    this.loadMore();
+  }
+
+  loadMore() {
+    const filters = { user_name: this.filterUser.trim(), operation: this.filterOp };
+    this.loading = this.progressService.getAllAttempts(filters, this.nextCursor).subscribe(page => {
+      this.filtered = [...this.filtered, ...page.items];
+      this.nextCursor = page.nextCursor;
+      this.operations = [...new Set([...this.operations, ...page.items.map(a => a.operation)])];  // ✅ unique ops seen so far
+    });
   }
 }
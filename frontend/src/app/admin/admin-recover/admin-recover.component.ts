@@ -2,6 +2,7 @@ import { Component, OnInit } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
 import { FormsModule } from '@angular/forms';
 import { CommonModule } from '@angular/common';
+import { getPage } from '../../services/paged';
 
 @Component({
   selector: 'app-admin-recover',
@@ -12,6 +13,7 @@ import { CommonModule } from '@angular/common';
 })
 export class AdminRecoverComponent implements OnInit {
   inactiveUsers: any[] = [];
+  nextCursor: string | null = null;
 
   constructor(private http: HttpClient) {}
 
@@ -20,9 +22,18 @@ export class AdminRecoverComponent implements OnInit {
   }
 
   loadInactiveUsers(): void {
-    this.http.get<any[]>('http://localhost:8000/admin/inactive-users')
+    this.inactiveUsers = [];
+    this.nextCursor = null;
+    this.loadMore();
+  }
+
+  loadMore(): void {
+    getPage<any>(this.http, 'http://localhost:8000/admin/inactive-users', {}, this.nextCursor)
       .subscribe({
-        next: data => this.inactiveUsers = data,
+        next: page => {
+          this.inactiveUsers = [...this.inactiveUsers, ...page.items];
+          this.nextCursor = page.nextCursor;
+        },
         error: err => console.error('❌ Failed to load users:', err)
       });
   }
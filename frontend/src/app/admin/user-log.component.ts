@@ -3,6 +3,7 @@ import { HttpClient } from '@angular/common/http';
 import { FormsModule } from '@angular/forms';
 import { CommonModule } from '@angular/common';
 import { ConfigService } from '../services/config.service';
+import { getPage } from '../services/paged';
 
 @Component({
   selector: 'app-user-log',
@@ -13,6 +14,7 @@ import { ConfigService } from '../services/config.service';
 })
 export class UserLogComponent implements OnInit {
   logs: any[] = [];
+  nextCursor: string | null = null;
   constructor(private http: HttpClient, private config: ConfigService) {}
   baseUrl = '';
   // baseUrl = environment.apiBaseUrl;
@@ -21,8 +23,16 @@ export class UserLogComponent implements OnInit {
   ngOnInit(): void {
       this.baseUrl = `${this.config.apiBaseUrl}`;
 
-    this.http.get<any[]>(`${this.baseUrl}/admin/user-logs`).subscribe({
-      next: data => this.logs = data,
+    this.loadMore();
+  }
+
+  // newest first, one page at a time
+  loadMore(): void {
+    getPage<any>(this.http, `${this.baseUrl}/admin/user-logs`, {}, this.nextCursor).subscribe({
+      next: page => {
+        this.logs = [...this.logs, ...page.items];
+        this.nextCursor = page.nextCursor;
+      },
       error: err => console.error('Error fetching logs', err)
     });
   }
@@ -1,6 +1,7 @@
 import { Injectable } from '@angular/core';
 import { HttpClient } from '@angular/common/http';
 import { Observable } from 'rxjs';
+import { getPage, Page } from '../services/paged';
 
 export interface UserProgress {
   operation: string;
@@ -11,6 +12,7 @@ export interface UserProgress {
 }
 
 export interface LevelAttempt {
+  user_name: string;
   level: number;
   operation: string;
   score: number;
@@ -34,8 +36,10 @@ export class ProgressService {
     return this.http.get<LevelAttempt[]>(`${this.baseUrl}/attempts/by-user/${user_name}`);
   }
 
-  getAllAttempts(): Observable<LevelAttempt[]> {
-    return this.http.get<LevelAttempt[]>(`${this.baseUrl}/attempts/stats`);
+  // newest first; pass the previous page's nextCursor to load older attempts
+  getAllAttempts(filters: { user_name?: string; operation?: string } = {},
+                 cursor: string | null = null): Observable<Page<LevelAttempt>> {
+    return getPage<LevelAttempt>(this.http, `${this.baseUrl}/attempts/stats`, filters, cursor);
   }
 }
 export interface LevelAttempt {
@@ -0,0 +1,33 @@
+// src/app/services/paged.ts
+import { HttpClient, HttpParams } from '@angular/common/http';
+import { Observable } from 'rxjs';
+import { map } from 'rxjs/operators';
+
+// Keyset-paginated list endpoints return a plain JSON array and put the
+// cursor for the next page in the X-Next-Cursor header (absent on the last page).
+export const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export function getPage<T>(
+  http: HttpClient,
+  url: string,
+  query: Record<string, string | number | undefined> = {},
+  cursor: string | null = null
+): Observable<Page<T>> {
+  let params = new HttpParams();
+  for (const [key, value] of Object.entries(query)) {
+    if (value !== undefined && value !== '') {
+      params = params.set(key, String(value));
+    }
+  }
+  if (cursor) {
+    params = params.set('cursor', cursor);
+  }
+  return http.get<T[]>(url, { params, observe: 'response' }).pipe(
+    map(res => ({ items: res.body ?? [], nextCursor: res.headers.get(NEXT_CURSOR_HEADER) }))
+  );
+}